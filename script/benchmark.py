@@ -0,0 +1,295 @@
+"""
+Banc d'essai des commandes du Gestionnaire d'Inventaire.
+
+Génère un inventaire synthétique déterministe (même schéma que required_columns),
+chronomètre chaque commande de InventoryManager pour plusieurs tailles et écrit
+les résultats en JSON. Deux exécutions peuvent être comparées: une commande plus
+lente que la référence au-delà du seuil fait échouer le banc (code de sortie 1).
+
+Usage:
+    python benchmark.py --tailles 10000 1000000 10000000 --sortie resultats.json
+    python benchmark.py --tailles 10000 --comparer reference.json --seuil 0.2
+    python benchmark.py --demarrage --repetitions 10   # Temps de démarrage de la CLI
+    python benchmark.py --large 50 --tailles 1000000   # Lecture de fichiers larges, par moteur
+"""
+import argparse     # Pour gérer les arguments en ligne de commande
+import contextlib
+import json
+import os
+import platform
+import resource     # Pour le pic de mémoire résidente (Unix)
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Variantes d'orthographe pour exercer la normalisation des catégories
+BASE_CATEGORIES = ['Électronique', 'Alimentaire', 'Vêtements', 'Maison', 'Jardin', 'Sport', 'Jouets', 'Beauté']
+COMMANDES = ['charger', 'chercher', 'chercher_commun', 'chercher_prix', 'chercher_quantite', 'chercher_categorie',
+             'rapport', 'afficher']
+# Cas mesurés avec la méthode d'une autre commande: chercher_commun cherche un terme peu sélectif (~10% des lignes)
+METHODES = {'chercher_commun': 'chercher'}
+# Lanceur de la CLI: script.py importé, donc compilé une seule fois
+SCRIPT = Path(__file__).with_name('gestionnaire_inventaire.py')
+# Scénarios de démarrage: (nom, arguments de l'interpréteur, entrée standard)
+DEMARRAGES = [
+    ('import', ['-c', 'import script'], None),
+    ('--help', [str(SCRIPT), '--help'], None),
+    ('aide', [str(SCRIPT)], 'aide\nquitter\n'),
+]
+
+
+def generer_categories(cardinalite: int) -> List[str]:
+    """Liste déterministe de `cardinalite` catégories."""
+    return [BASE_CATEGORIES[i % len(BASE_CATEGORIES)] + (f" {i // len(BASE_CATEGORIES)}" if i >= len(BASE_CATEGORIES) else "")
+            for i in range(cardinalite)]
+
+
+def generer_inventaire(dossier: Path, lignes: int, fichiers: int = 10, categories: int = 20,
+                       encodage: str = 'utf-8', graine: int = 42, colonnes_extra: int = 0) -> List[Path]:
+    """
+    Écrire un inventaire synthétique réparti en `fichiers` CSV.
+    Le contenu ne dépend que des paramètres: deux appels identiques produisent les mêmes fichiers.
+    colonnes_extra ajoute des colonnes inutiles, comme dans les exports des magasins.
+    """
+    rng = np.random.default_rng(graine)
+    noms_categories = np.array(generer_categories(categories), dtype=object)
+    dossier.mkdir(parents=True, exist_ok=True)
+    chemins = []
+    par_fichier = -(-lignes // fichiers)  # Division arrondie au supérieur
+    for i in range(fichiers):
+        n = min(par_fichier, lignes - i * par_fichier)
+        if n <= 0:
+            break
+        # Noms uniques dans un fichier (un doublon serait mis en quarantaine), répétés d'un magasin à l'autre
+        numeros = rng.permutation(max(lignes // 4, n))[:n]
+        data = pd.DataFrame({
+            'nom du produit': pd.Series(numeros).map(lambda k: f"Produit {k}"),
+            'catégorie': noms_categories[rng.integers(0, categories, n)],
+            'quantité': rng.integers(0, 1000, n),
+            'prix unitaire': np.round(rng.uniform(0.5, 2000, n), 2),
+        })
+        for j in range(colonnes_extra):
+            data[f'extra {j}'] = rng.integers(0, 10 ** 6, n)
+        chemin = dossier / f"magasin_{i:04d}.csv"
+        data.to_csv(chemin, index=False, encoding=encodage)
+        chemins.append(chemin)
+    return chemins
+
+
+def _pic_rss_mo() -> float:
+    """Pic de mémoire résidente du processus, en Mo (ru_maxrss est en Ko sous Linux)."""
+    pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pic / 1024 / (1024 if sys.platform == 'darwin' else 1)
+
+
+def mesurer(dossier: Path, commandes: List[str], repetitions: int = 1) -> List[Dict]:
+    """
+    Chronométrer chaque commande sur l'inventaire du dossier (meilleur temps sur les répétitions).
+    La sortie des commandes est jetée; le pic RSS est celui du processus après la commande.
+    Ni cache, ni instantané: la quarantaine et le rapport sont écrits dans un dossier temporaire supprimé à la fin.
+    """
+    from script import InventoryManager
+
+    travail = Path(tempfile.mkdtemp())
+    manager = InventoryManager()
+    manager.use_cache = False
+    manager.snapshots_kept = 0
+    manager.cache_dir = travail
+    manager.quarantine_path = travail / "quarantaine.csv"
+    export = travail / "rapport.csv"
+    arguments = {
+        'charger': str(dossier),
+        'chercher': "Produit 12",
+        'chercher_commun': "duit 1 --limit 20",  # Limité: on mesure la recherche, pas le rendu
+        'chercher_prix': "100 200",
+        'chercher_quantite': "10 50",
+        'chercher_categorie': "electronique",
+        'rapport': str(export),
+        'afficher': "",
+    }
+
+    resultats = []
+    try:
+        for commande in ['charger'] + [c for c in commandes if c != 'charger']:
+            temps = []
+            for _ in range(repetitions if commande in commandes else 1):
+                with open(os.devnull, 'w') as nul, contextlib.redirect_stdout(nul):
+                    debut = time.perf_counter()
+                    getattr(manager, f"do_{METHODES.get(commande, commande)}")(arguments[commande])
+                    temps.append(time.perf_counter() - debut)
+            if commande in commandes:
+                resultats.append({'commande': commande, 'secondes': min(temps),
+                                  'rss_pic_mo': round(_pic_rss_mo(), 1)})
+    finally:
+        shutil.rmtree(travail, ignore_errors=True)
+    return resultats
+
+
+def _modules_importes(arguments: List[str], entree: Optional[str]) -> List[Dict]:
+    """Modules importés par une commande, du plus coûteux au moins coûteux (python -X importtime)."""
+    sortie = subprocess.run([sys.executable, '-X', 'importtime', *arguments], input=entree, text=True,
+                            capture_output=True, cwd=SCRIPT.parent).stderr
+    modules = []
+    for ligne in sortie.splitlines():
+        if ligne.startswith('import time:') and '|' in ligne and 'cumulative' not in ligne:
+            _, cumul, nom = ligne.split('|')
+            modules.append({'module': nom.strip(), 'ms': int(cumul) / 1000})
+    return sorted(modules, key=lambda m: -m['ms'])
+
+
+def mesurer_demarrage(repetitions: int = 5) -> List[Dict]:
+    """
+    Chronométrer le démarrage de la CLI (meilleur temps sur les répétitions) et lister
+    les imports les plus coûteux. `pandas_importe` doit rester faux pour --help et aide.
+    """
+    resultats = []
+    for nom, arguments, entree in DEMARRAGES:
+        temps = []
+        for _ in range(repetitions):
+            debut = time.perf_counter()
+            subprocess.run([sys.executable, *arguments], input=entree, text=True, cwd=SCRIPT.parent,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+            temps.append(time.perf_counter() - debut)
+        modules = _modules_importes(arguments, entree)
+        resultats.append({
+            'commande': f"demarrage {nom}", 'lignes': 0, 'secondes': min(temps),
+            'rss_pic_mo': round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+            'pandas_importe': any(m['module'] == 'pandas' for m in modules),
+            'imports': [m for m in modules if m['module'] != 'script'][:5],
+        })
+    return resultats
+
+
+def mesurer_lecture(lignes: int, colonnes_extra: int, repetitions: int = 1,
+                    encodage: str = 'utf-8', graine: int = 42) -> List[Dict]:
+    """
+    Comparer la lecture d'un fichier large: toutes les colonnes avec types inférés (ancienne lecture),
+    puis seulement les colonnes requises avec types déclarés, moteur C et pyarrow.
+    """
+    import script
+
+    colonnes = ['nom du produit', 'catégorie', 'quantité', 'prix unitaire']
+    strategies = {
+        'lecture inferee': lambda f: pd.read_csv(f, encoding=encodage)[colonnes],
+        'lecture c': lambda f: script._lire_colonnes(f, encodage, colonnes, moteur='c'),
+    }
+    if script.PYARROW_DISPONIBLE:
+        strategies['lecture pyarrow'] = lambda f: script._lire_colonnes(f, encodage, colonnes, moteur='pyarrow')
+
+    resultats = []
+    with tempfile.TemporaryDirectory() as dossier:
+        fichier = generer_inventaire(Path(dossier), lignes, 1, encodage=encodage, graine=graine,
+                                     colonnes_extra=colonnes_extra)[0]
+        for nom, lire in strategies.items():
+            temps = []
+            for _ in range(repetitions):
+                debut = time.perf_counter()
+                lire(fichier)
+                temps.append(time.perf_counter() - debut)
+            resultats.append({'commande': f"{nom} ({colonnes_extra} colonnes en plus)", 'lignes': lignes,
+                              'secondes': min(temps), 'rss_pic_mo': round(_pic_rss_mo(), 1)})
+    return resultats
+
+
+def comparer(resultats: List[Dict], reference: List[Dict], seuil: float) -> List[str]:
+    """Lister les commandes plus lentes que la référence de plus de `seuil` (0.2 = 20%)."""
+    anciens = {(r['lignes'], r['commande']): r['secondes'] for r in reference}
+    regressions = []
+    for r in resultats:
+        ancien = anciens.get((r['lignes'], r['commande']))
+        if ancien and r['secondes'] > ancien * (1 + seuil):
+            regressions.append(f"{r['commande']} ({r['lignes']} lignes): "
+                               f"{ancien:.3f}s -> {r['secondes']:.3f}s (+{r['secondes'] / ancien - 1:.0%})")
+    return regressions
+
+
+def _executer_taille(args: argparse.Namespace, lignes: int) -> List[Dict]:
+    """Mesurer une taille dans un sous-processus, pour que le pic RSS ne dépende que d'elle."""
+    commande = [sys.executable, __file__, '--interne', str(lignes),
+                '--fichiers', str(args.fichiers), '--categories', str(args.categories),
+                '--encodage', args.encodage, '--graine', str(args.graine),
+                '--repetitions', str(args.repetitions), '--commandes', *args.commandes]
+    sortie = subprocess.run(commande, check=True, capture_output=True, text=True).stdout
+    return json.loads(sortie.strip().splitlines()[-1])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Banc d'essai du Gestionnaire d'Inventaire")
+    parser.add_argument("--tailles", nargs='+', type=int, default=[10_000, 1_000_000, 10_000_000],
+                        help="Nombres de lignes à tester")
+    parser.add_argument("--fichiers", type=int, default=20, help="Nombre de fichiers CSV générés")
+    parser.add_argument("--categories", type=int, default=20, help="Nombre de catégories distinctes")
+    parser.add_argument("--encodage", default='utf-8', help="Encodage des CSV générés (utf-8, cp1252, latin1)")
+    parser.add_argument("--graine", type=int, default=42, help="Graine du générateur")
+    parser.add_argument("--repetitions", type=int, default=1, help="Répétitions par commande (meilleur temps)")
+    parser.add_argument("--commandes", nargs='+', default=COMMANDES, choices=COMMANDES,
+                        help="Commandes à chronométrer")
+    parser.add_argument("--sortie", help="Fichier JSON des résultats")
+    parser.add_argument("--comparer", help="Fichier JSON de référence")
+    parser.add_argument("--seuil", type=float, default=0.2, help="Ralentissement toléré (0.2 = 20%%)")
+    parser.add_argument("--demarrage", action="store_true",
+                        help="Mesurer le temps de démarrage de la CLI plutôt que les commandes")
+    parser.add_argument("--large", type=int, metavar="COLONNES",
+                        help="Comparer les moteurs de lecture sur un fichier avec COLONNES colonnes en plus")
+    parser.add_argument("--interne", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.interne:
+        # Sous-processus: génère, mesure et écrit les résultats en JSON sur la dernière ligne
+        with tempfile.TemporaryDirectory() as dossier:
+            generer_inventaire(Path(dossier), args.interne, args.fichiers, args.categories,
+                               args.encodage, args.graine)
+            resultats = mesurer(Path(dossier), args.commandes, args.repetitions)
+        print(json.dumps(resultats))
+        return 0
+
+    resultats = []
+    if args.demarrage:
+        for mesure in mesurer_demarrage(max(args.repetitions, 5)):
+            resultats.append(mesure)
+            imports = ", ".join(f"{m['module']} {m['ms']:.0f} ms" for m in mesure['imports'][:3])
+            print(f"{mesure['commande']:20} {mesure['secondes'] * 1000:8.1f} ms  "
+                  f"pandas {'importé' if mesure['pandas_importe'] else 'non importé'}  ({imports})")
+    if args.large is not None:
+        for lignes in args.tailles:
+            for mesure in mesurer_lecture(lignes, args.large, args.repetitions, args.encodage, args.graine):
+                resultats.append(mesure)
+                print(f"{lignes:>10} lignes  {mesure['commande']:40} {mesure['secondes']:9.3f}s  "
+                      f"{lignes / max(mesure['secondes'], 1e-9):12.0f} lignes/s")
+    for lignes in ([] if args.demarrage or args.large is not None else args.tailles):
+        for mesure in _executer_taille(args, lignes):
+            mesure['lignes'] = lignes
+            resultats.append(mesure)
+            print(f"{lignes:>10} lignes  {mesure['commande']:20} {mesure['secondes']:9.3f}s  "
+                  f"{mesure['rss_pic_mo']:9.1f} Mo")
+
+    document = {
+        'meta': {'python': platform.python_version(), 'pandas': pd.__version__,
+                 'machine': platform.machine(), 'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                 'parametres': {k: v for k, v in vars(args).items() if k not in ('interne', 'sortie', 'comparer')}},
+        'resultats': resultats,
+    }
+    if args.sortie:
+        Path(args.sortie).write_text(json.dumps(document, indent=2), encoding='utf-8')
+
+    if args.comparer:
+        reference = json.loads(Path(args.comparer).read_text(encoding='utf-8'))['resultats']
+        regressions = comparer(resultats, reference, args.seuil)
+        if regressions:
+            print("Régressions détectées:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("Aucune régression au-delà du seuil.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
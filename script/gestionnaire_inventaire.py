@@ -0,0 +1,9 @@
+"""
+Point d'entrée de la CLI du gestionnaire d'inventaire.
+Exécuté directement, script.py serait recompilé à chaque démarrage (le module __main__
+n'est jamais mis en cache): ce lanceur l'importe pour réutiliser son bytecode.
+"""
+from script import main
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,1839 @@
-import pandas as pd  # Pour la manipulation des données
+from __future__ import annotations  # Annotations non évaluées: pandas n'est pas importé pour les lire
 import argparse     # Pour gérer les arguments en ligne de commande
 from cmd import Cmd # Pour créer une interface en ligne de commande
-from colorama import Fore, Style, init  # Pour colorer la sortie console
-from typing import List, Optional       # Pour le typage
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union  # Pour le typage
 from pathlib import Path               # Pour la gestion des chemins de fichiers
+from collections import OrderedDict, deque  # Cache LRU et fenêtre de tâches en cours
+from itertools import chain, count
+import codecs
+import gzip
+import contextlib
+import cProfile                        # Pour le profil détaillé optionnel
+import hashlib                         # Pour l'empreinte du contenu des fichiers
+import importlib.util
+import json
+import os
+import re
+import shlex
+import sys
+import threading
+import time
+import unicodedata
+import urllib.parse
+from datetime import datetime
+from io import StringIO
 
-init(autoreset=True)
+
+class _ModuleDiffere:
+    """
+    Module importé au premier accès à l'un de ses attributs, pour que `--help` et `aide`
+    ne paient pas l'import de pandas. Le nom global est alors remplacé par le vrai module:
+    les accès suivants ne passent plus par ici.
+    """
+
+    def __init__(self, nom: str, alias: str):
+        self._nom, self._alias = nom, alias
+
+    def __getattr__(self, attribut: str):
+        module = importlib.import_module(self._nom)
+        globals()[self._alias] = module
+        return getattr(module, attribut)
+
+
+pd = _ModuleDiffere('pandas', 'pd')            # Pour la manipulation des données
+np = _ModuleDiffere('numpy', 'np')             # Pour les index triés
+asyncio = _ModuleDiffere('asyncio', 'asyncio')  # Pour le serveur de requêtes
+colorama = _ModuleDiffere('colorama', 'colorama')  # Pour colorer la sortie console
+futures = _ModuleDiffere('concurrent.futures', 'futures')  # Pools de threads et de processus
 
 # mets les messsages d'erreur en couleur
 class ColorLogger:
     @staticmethod
     def error(message: str) -> None:
-        print(Fore.RED + str(message) + Style.RESET_ALL)
+        print(colorama.Fore.RED + str(message) + colorama.Style.RESET_ALL)
 
     @staticmethod
     def success(message: str) -> None:
-        print(Fore.GREEN + str(message) + Style.RESET_ALL)
+        print(colorama.Fore.GREEN + str(message) + colorama.Style.RESET_ALL)
 
     @staticmethod
     def info(message: str) -> None:
-        print(Fore.BLUE + str(message) + Style.RESET_ALL)
+        print(colorama.Fore.BLUE + str(message) + colorama.Style.RESET_ALL)
+
+    @staticmethod
+    def flux(parties: Iterable[str], couleur: bool = True) -> None:
+        """Écrire un texte produit morceau par morceau, sans jamais le construire en entier."""
+        sortie = sys.stdout
+        if couleur:
+            sortie.write(colorama.Fore.BLUE)
+        for partie in parties:
+            sortie.write(partie if partie.endswith("\n") else partie + "\n")
+            sortie.flush()
+        if couleur:
+            sortie.write(colorama.Style.RESET_ALL)
+
+class JournalMemoire(ColorLogger):
+    """Logger qui garde les messages au lieu de les afficher (chargements en arrière-plan)."""
+
+    def __init__(self):
+        self.messages: List[Tuple[str, str]] = []
+
+    def error(self, message: str) -> None:
+        self.messages.append(('erreur', str(message)))
+
+    def success(self, message: str) -> None:
+        self.messages.append(('succes', str(message)))
+
+    def info(self, message: str) -> None:
+        self.messages.append(('info', str(message)))
+
+    def flux(self, parties: Iterable[str], couleur: bool = True) -> None:
+        self.messages.extend(('info', partie) for partie in parties)
+
+def _colonnes_manquantes(data: pd.DataFrame, required_columns: List[str]) -> List[str]:
+    """Lister les colonnes requises absentes du DataFrame."""
+    return [col for col in required_columns if col not in data.columns]
+
+
+def _stat_fichier(file_path: Path) -> Dict[str, int]:
+    """Taille et date de modification d'un fichier, pour le manifeste."""
+    stat = file_path.stat()
+    return {'taille': stat.st_size, 'mtime': stat.st_mtime_ns}
+
+
+def _hash_fichier(file_path: Path, bloc: int = 1 << 20) -> str:
+    """Empreinte du contenu d'un fichier, lu par blocs."""
+    empreinte = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for morceau in iter(lambda: f.read(bloc), b''):
+            empreinte.update(morceau)
+    return empreinte.hexdigest()
+
+
+# Encodages essayés dans l'ordre: latin1 accepte tous les octets et sert de dernier recours
+ENCODINGS = ('utf-8-sig', 'cp1252', 'latin1')
+
+
+# Agrégats partiels par orthographe de catégorie, combinables entre fichiers
+PARTIAL_AGGREGATIONS = {
+    'lignes': 'sum', 'quantite_somme': 'sum', 'quantite_nombre': 'sum',
+    'prix_somme': 'sum', 'prix_nombre': 'sum', 'prix_min': 'min', 'prix_max': 'max',
+}
+REPORT_COLUMNS = ['quantité_sum', 'quantité_mean', 'quantité_count',
+                  'prix unitaire_mean', 'prix unitaire_min', 'prix unitaire_max']
+
+
+def _agreger_partiel(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calculer les agrégats partiels (somme, nombre, min, max) d'un morceau d'inventaire,
+    par orthographe de catégorie, dans l'ordre d'apparition.
+    Les prix sont agrégés en float64 quel que soit leur type de stockage (float32).
+    """
+    cles = data['catégorie'].astype(object)
+    groupes = data.groupby(cles, sort=False)
+    prix = data['prix unitaire'].astype(np.float64).groupby(cles, sort=False)
+    return pd.DataFrame({
+        'lignes': groupes.size(),
+        'quantite_somme': groupes['quantité'].sum(),
+        'quantite_nombre': groupes['quantité'].count(),
+        'prix_somme': prix.sum(),
+        'prix_nombre': prix.count(),
+        'prix_min': prix.min(),
+        'prix_max': prix.max(),
+    })
+
+
+def _regrouper_partiels(partiels: List[pd.DataFrame]) -> pd.DataFrame:
+    """Combiner des agrégats partiels par orthographe, en gardant l'ordre d'apparition."""
+    return pd.concat(partiels).groupby(level=0, sort=False).agg(PARTIAL_AGGREGATIONS)
+
+
+def _fusionner_partiels(partiels: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Fusionner des agrégats partiels en rapport par catégorie normalisée,
+    avec les mêmes colonnes que le groupby complet (avant arrondi).
+    """
+    partiels = [partiel for partiel in partiels if not partiel.empty]
+    if not partiels:
+        return pd.DataFrame(columns=REPORT_COLUMNS).rename_axis('catégorie')
+
+    par_orthographe = _regrouper_partiels(partiels)
+    libelles = _choisir_libelles(list(par_orthographe.index), par_orthographe['lignes'].tolist())
+    par_categorie = par_orthographe.groupby(par_orthographe.index.map(libelles)).agg(PARTIAL_AGGREGATIONS)
+
+    report = pd.DataFrame({
+        'quantité_sum': par_categorie['quantite_somme'],
+        'quantité_mean': par_categorie['quantite_somme'] / par_categorie['quantite_nombre'],
+        'quantité_count': par_categorie['quantite_nombre'],
+        'prix unitaire_mean': par_categorie['prix_somme'] / par_categorie['prix_nombre'],
+        'prix unitaire_min': par_categorie['prix_min'],
+        'prix unitaire_max': par_categorie['prix_max'],
+    })
+    return report.rename_axis('catégorie')
+
+
+def _agreger_colonnes(codes: np.ndarray, quantites: np.ndarray, prix: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Agrégats partiels par code de catégorie (codes >= 0), dans l'ordre d'apparition.
+    Comme _agreger_partiel, les prix sont agrégés en float64.
+    """
+    lignes = np.flatnonzero(codes >= 0)  # Les catégories manquantes ne forment pas de groupe
+    ordre = lignes[np.argsort(codes[lignes], kind='stable')]
+    codes_tries = codes[ordre]
+    debuts = np.flatnonzero(np.r_[True, codes_tries[1:] != codes_tries[:-1]])
+    if not len(ordre):
+        debuts = debuts[:0]
+    quantites, prix = quantites[ordre], prix[ordre].astype(np.float64, copy=False)
+    flottant = quantites.dtype.kind == 'f'
+
+    def reduire(operation, valeurs, type_resultat):
+        if not len(ordre):
+            return np.zeros(0, type_resultat)
+        return operation.reduceat(valeurs, debuts, dtype=type_resultat)
+
+    resultat = {
+        'codes': codes_tries[debuts],
+        'lignes': np.diff(np.r_[debuts, len(ordre)]).astype(np.int64),
+        'quantite_somme': reduire(np.add, np.nan_to_num(quantites), np.float64 if flottant else np.int64),
+        'quantite_nombre': reduire(np.add, ~np.isnan(quantites) if flottant else np.ones(len(ordre), bool), np.int64),
+        'prix_somme': reduire(np.add, np.nan_to_num(prix), np.float64),
+        'prix_nombre': reduire(np.add, ~np.isnan(prix), np.int64),
+        'prix_min': reduire(np.fmin, prix, prix.dtype),  # fmin/fmax ignorent les prix manquants
+        'prix_max': reduire(np.fmax, prix, prix.dtype),
+    }
+    apparition = np.argsort(ordre[debuts], kind='stable')
+    return {nom: valeurs[apparition] for nom, valeurs in resultat.items()}
+
+
+def _agreger_tranche(segments: Dict[str, Tuple[str, str, int]], debut: int, fin: int) -> Dict[str, np.ndarray]:
+    """
+    Agrégats partiels des lignes [debut, fin), exécutée dans un processus.
+    Les colonnes sont lues sans copie dans la mémoire partagée
+    (segments: nom du segment, type et longueur de chaque colonne).
+    """
+    from multiprocessing import shared_memory
+    memoires = {col: shared_memory.SharedMemory(name=nom) for col, (nom, _, _) in segments.items()}
+    try:
+        return _agreger_colonnes(*(
+            np.ndarray((segments[col][2],), dtype=segments[col][1], buffer=memoires[col].buf)[debut:fin]
+            for col in ('codes', 'quantite', 'prix')))
+    finally:
+        for memoire in memoires.values():
+            memoire.close()
+
+
+def _agreger_partiels_paralleles(data: pd.DataFrame, jobs: int) -> Dict[str, pd.DataFrame]:
+    """
+    Agrégats partiels par fichier source, calculés par tranches de lignes dans un pool de processus.
+    Les colonnes numériques et les codes de catégorie sont copiés une fois en mémoire partagée;
+    chaque processus n'en reçoit que le nom. Les tranches d'un même fichier sont ensuite
+    combinées dans l'ordre: le résultat est celui de _agreger_partiel fichier par fichier.
+    """
+    from multiprocessing import shared_memory
+    categories = data['catégorie']
+    if isinstance(categories.dtype, pd.CategoricalDtype):
+        codes, libelles = categories.cat.codes.to_numpy(), categories.cat.categories
+    else:
+        codes, libelles = pd.factorize(categories)
+    colonnes = {'codes': codes, 'quantite': data['quantité'].to_numpy(),
+                'prix': data['prix unitaire'].to_numpy()}
+    if colonnes['quantite'].dtype.kind not in 'iuf' or colonnes['prix'].dtype.kind != 'f':
+        raise ValueError("Les colonnes quantité et prix unitaire doivent être numériques.")
+
+    # Blocs contigus de chaque fichier, découpés en tranches pour occuper tous les processus
+    if 'Fichier Source' in data.columns:
+        sources = data['Fichier Source'].astype('category')
+        codes_sources = sources.cat.codes.to_numpy()
+        bornes = np.r_[0, np.flatnonzero(codes_sources[1:] != codes_sources[:-1]) + 1, len(data)]
+        noms = [str(sources.cat.categories[codes_sources[debut]]) for debut in bornes[:-1]]
+    else:
+        bornes, noms = np.array([0, len(data)]), ['']
+    taille = max(len(data) // (jobs * 4), 1)
+    tranches = [(nom, debut, min(debut + taille, fin))
+                for nom, bloc_debut, fin in zip(noms, bornes[:-1], bornes[1:])
+                for debut in range(bloc_debut, fin, taille)]
+
+    memoires = {}
+    try:
+        for col, valeurs in colonnes.items():
+            memoire = memoires[col] = shared_memory.SharedMemory(create=True, size=max(valeurs.nbytes, 1))
+            np.ndarray(valeurs.shape, dtype=valeurs.dtype, buffer=memoire.buf)[:] = valeurs
+        segments = {col: (memoires[col].name, valeurs.dtype.str, len(valeurs)) for col, valeurs in colonnes.items()}
+        with futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+            resultats = list(pool.map(_agreger_tranche, [segments] * len(tranches),
+                                      [debut for _, debut, _ in tranches], [fin for _, _, fin in tranches]))
+    finally:
+        for memoire in memoires.values():
+            memoire.close()
+            memoire.unlink()
+
+    par_fichier: Dict[str, List[pd.DataFrame]] = {}
+    for (nom, _, _), resultat in zip(tranches, resultats):
+        index = pd.Index(libelles[resultat.pop('codes')].astype(object), name='catégorie')
+        par_fichier.setdefault(nom, []).append(pd.DataFrame(resultat, index=index))
+    return {nom: partiels[0] if len(partiels) == 1 else _regrouper_partiels(partiels)
+            for nom, partiels in par_fichier.items()}
+
+
+def _detecter_encodage(file_path: Path, bloc: int = 1 << 20, encodings: Tuple[str, ...] = ENCODINGS) -> str:
+    """Détecter l'encodage d'un fichier en le décodant par blocs, sans le charger en mémoire."""
+    for encoding in encodings[:-1]:
+        decodeur = codecs.getincrementaldecoder(encoding)()
+        try:
+            with open(file_path, 'rb') as f:
+                for morceau in iter(lambda: f.read(bloc), b''):
+                    decodeur.decode(morceau)
+            decodeur.decode(b'', final=True)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return encodings[-1]
+
+
+def _empreinte_et_encodage(file_path: Path, bloc: int = 1 << 20) -> Tuple[str, str]:
+    """
+    Empreinte et encodage d'un fichier en une seule lecture dans le cas courant (UTF-8).
+    Les autres encodages ne sont essayés, par une seconde lecture, que si l'UTF-8 échoue.
+    """
+    empreinte = hashlib.blake2b(digest_size=16)
+    decodeur = codecs.getincrementaldecoder(ENCODINGS[0])()
+    utf8 = True
+    with open(file_path, 'rb') as f:
+        for morceau in iter(lambda: f.read(bloc), b''):
+            empreinte.update(morceau)
+            if utf8:
+                try:
+                    decodeur.decode(morceau)
+                except UnicodeDecodeError:
+                    utf8 = False
+    if utf8:
+        try:
+            decodeur.decode(b'', final=True)
+        except UnicodeDecodeError:
+            utf8 = False
+    encoding = ENCODINGS[0] if utf8 else _detecter_encodage(file_path, bloc, ENCODINGS[1:])
+    return empreinte.hexdigest(), encoding
+
+
+def _parse_taille(texte: str, zero_autorise: bool = False) -> int:
+    """Convertir une taille comme '512M', '2G' ou '800000' en octets."""
+    texte = texte.strip().upper().rstrip('O').rstrip('B')
+    multiplicateurs = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    if texte and texte[-1] in multiplicateurs:
+        taille = float(texte[:-1]) * multiplicateurs[texte[-1]]
+    else:
+        taille = float(texte)
+    if taille < 0 or (taille == 0 and not zero_autorise):
+        raise ValueError("Le budget mémoire doit être positif.")
+    return int(taille)
+
+
+PYARROW_DISPONIBLE = importlib.util.find_spec('pyarrow') is not None
+CSV_ENGINES = ('auto', 'pyarrow', 'c')
+
+
+def _types_colonnes(price_dtype: str = 'float64') -> Dict[str, object]:
+    """Types déclarés à la lecture des colonnes requises."""
+    return {'nom du produit': str, 'catégorie': str, 'quantité': 'int64', 'prix unitaire': price_dtype}
+
+
+def _lire_colonnes(file_path: Path, encoding: str, colonnes: List[str],
+                   price_dtype: str = 'float64', moteur: str = 'auto') -> pd.DataFrame:
+    """
+    Lire seulement les colonnes requises, avec leurs types déclarés.
+    Essaie pyarrow (si disponible et demandé) puis le moteur C; si une colonne ne respecte
+    pas son type déclaré, relit le fichier en laissant pandas inférer les types numériques.
+    """
+    types = {col: t for col, t in _types_colonnes(price_dtype).items() if col in colonnes}
+    moteurs = ['pyarrow', 'c'] if moteur == 'pyarrow' or (moteur == 'auto' and PYARROW_DISPONIBLE) else ['c']
+    for nom in moteurs:
+        try:
+            return pd.read_csv(file_path, encoding=encoding, usecols=colonnes, dtype=types, engine=nom)
+        except Exception:
+            continue  # Moteur indisponible ou valeur non conforme au type déclaré
+    texte = {col: t for col, t in types.items() if t is str}
+    return pd.read_csv(file_path, encoding=encoding, usecols=colonnes, dtype=texte)
+
+
+# Motifs de rejet d'une ligne, dans l'ordre où ils sont vérifiés
+REJECTION_REASONS = ['nom vide', 'quantité manquante', 'quantité non numérique', 'quantité négative',
+                     'quantité non entière', 'prix manquant', 'prix non numérique', 'prix négatif']
+
+
+def _valider_lignes(data: pd.DataFrame, price_dtype: str = 'float64',
+                    doublons: Optional[np.ndarray] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Valider les lignes en une passe vectorisée et convertir les colonnes numériques.
+    Retourne les lignes valides (quantité entière, prix flottant) et les lignes rejetées,
+    avec leur numéro de ligne dans le fichier et le motif du rejet. Un produit déjà vu
+    dans les lignes valides précédentes est rejeté comme doublon; pour un fichier lu par
+    morceaux, doublons donne l'index des doublons repérés sur tout le fichier.
+    """
+    nom = data['nom du produit']
+    quantite = pd.to_numeric(data['quantité'], errors='coerce')
+    prix = pd.to_numeric(data['prix unitaire'], errors='coerce')
+    cle = nom.astype(str).str.strip()
+    conditions = [
+        nom.isna() | (cle == ''),
+        data['quantité'].isna(), quantite.isna(), quantite < 0, quantite % 1 != 0,
+        data['prix unitaire'].isna(), prix.isna(), prix < 0,
+    ]
+    motif = pd.Series(np.select(conditions, REJECTION_REASONS, default=''), index=data.index)
+    valide = motif == ''
+    if doublons is None:
+        doublon = cle.where(valide).duplicated()
+    else:
+        doublon = data.index.isin(doublons)
+    motif[valide & doublon] = 'doublon'
+    valide = motif == ''
+
+    rejets = data.loc[~valide].astype(str).where(data.loc[~valide].notna(), '')
+    rejets.insert(0, 'ligne', rejets.index + 2)  # Ligne 1: l'en-tête
+    rejets['motif'] = motif[~valide]
+    if valide.all():
+        valides = data.assign(**{'quantité': quantite.astype('int64'), 'prix unitaire': prix.astype(price_dtype)})
+    else:
+        valides = data.loc[valide].assign(**{'quantité': quantite[valide].astype('int64'),
+                                             'prix unitaire': prix[valide].astype(price_dtype)})
+    return valides, rejets
+
+
+def _lire_csv(file_path: Path, required_columns: List[str], price_dtype: str = 'float64',
+              moteur: str = 'auto') -> Tuple[Optional[pd.DataFrame], List[str], Dict,
+                                             Optional[pd.DataFrame], Optional[pd.DataFrame]]:
+    """
+    Lire et valider un fichier CSV.
+    Exécutée dans un worker: l'en-tête est vérifié avant de lire les données, puis seules
+    les colonnes requises sont lues, avec leurs types déclarés, et chaque ligne est validée.
+    Retourne aussi l'entrée du manifeste (taille, mtime, hash, encodage) du fichier lu,
+    ses agrégats partiels pour le rapport et ses lignes rejetées.
+    """
+    signature = _stat_fichier(file_path)
+    signature['hash'], signature['encodage'] = _empreinte_et_encodage(file_path)
+    entete = pd.read_csv(file_path, encoding=signature['encodage'], nrows=0)
+    missing_cols = _colonnes_manquantes(entete, required_columns)
+    if missing_cols:
+        return None, missing_cols, signature, None, None
+
+    data = _lire_colonnes(file_path, signature['encodage'], required_columns, price_dtype, moteur)
+    if list(data.columns) != required_columns:
+        data = data[required_columns]  # usecols garde l'ordre du fichier
+    # Même type de prix que l'inventaire compacté pour des agrégats identiques
+    data, rejets = _valider_lignes(data, price_dtype)
+    data['Fichier Source'] = file_path.name
+    rejets['Fichier Source'] = file_path.name
+    # Compacté dans le worker: le gestionnaire ne reçoit jamais les colonnes de chaînes brutes
+    partiel = _agreger_partiel(data)
+    return _compacter(data, price_dtype), [], signature, partiel, rejets
+
+
+# Format du cache disque: Parquet (colonnes, mappable en mémoire) si pyarrow
+# est installé, sinon un pickle pandas qui reste un instantané binaire.
+CACHE_FORMAT = 'parquet' if PYARROW_DISPONIBLE else 'pickle'
+CACHE_VERSION = 1
+
+
+def _dossier_cache_defaut() -> Path:
+    """Dossier de cache utilisateur (XDG_CACHE_HOME ou ~/.cache)."""
+    base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'gestionnaire_inventaire'
+
+
+def _ecrire_atomique(path: Path, ecrire: Callable[[Path], None]) -> None:
+    """Écrire un fichier via un fichier temporaire renommé, pour ne jamais laisser de fichier à moitié écrit."""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        ecrire(tmp)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+# Colonnes stockées en catégories: peu de valeurs distinctes, répétées sur chaque ligne
+CATEGORICAL_COLUMNS = ['catégorie', 'Fichier Source']
+PRICE_DTYPES = ('float64', 'float32')
+
+
+def _compacter(data: pd.DataFrame, price_dtype: str = 'float64') -> pd.DataFrame:
+    """
+    Convertir l'inventaire vers une représentation typée et compacte:
+    catégories pour les chaînes répétées, plus petit entier sûr pour les quantités,
+    float64 ou float32 pour les prix.
+    Les colonnes sont remplacées dans `data` même, sans copie de tout l'inventaire:
+    l'appelant doit posséder le DataFrame (lu, concaténé ou validé par lui).
+    """
+    for col in CATEGORICAL_COLUMNS:
+        if col in data.columns:
+            data[col] = data[col].astype('category').cat.remove_unused_categories()
+
+    # Le nom du produit n'est mis en catégorie que s'il se répète suffisamment
+    if 'nom du produit' in data.columns and len(data) > 0:
+        noms = data['nom du produit']
+        if isinstance(noms.dtype, pd.CategoricalDtype) or noms.nunique() <= len(noms) // 2:
+            data['nom du produit'] = noms.astype('category').cat.remove_unused_categories()
+
+    if 'quantité' in data.columns and pd.api.types.is_numeric_dtype(data['quantité']):
+        quantites = data['quantité']
+        if pd.api.types.is_integer_dtype(quantites):
+            data['quantité'] = pd.to_numeric(quantites, downcast='integer')
+        elif quantites.notna().all() and (quantites % 1 == 0).all():
+            data['quantité'] = pd.to_numeric(quantites.astype('int64'), downcast='integer')
+
+    if 'prix unitaire' in data.columns and pd.api.types.is_numeric_dtype(data['prix unitaire']):
+        data['prix unitaire'] = data['prix unitaire'].astype(price_dtype)
+    return data
+
+
+def _concatener(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concaténer des DataFrames déjà compactés sans repasser par les chaînes: les colonnes
+    catégorielles sont réunies par union_categoricals (pd.concat les convertirait en objets
+    dès que leurs catégories diffèrent), les autres concaténées colonne par colonne.
+    Les lignes sont toujours renumérotées à partir de 0, comme en mode hors mémoire et depuis le cache.
+    """
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+    colonnes = {}
+    for col in frames[0].columns:
+        series = [frame[col] for frame in frames]
+        if all(isinstance(serie.dtype, pd.CategoricalDtype) for serie in series):
+            colonnes[col] = pd.Series(pd.api.types.union_categoricals(series, ignore_order=True), name=col)
+        else:
+            series = [serie.astype(_dtype_brut(serie)) if isinstance(serie.dtype, pd.CategoricalDtype) else serie
+                      for serie in series]
+            colonnes[col] = pd.concat(series, ignore_index=True)
+    return pd.DataFrame(colonnes, copy=False)
+
+
+def _dtype_brut(serie: pd.Series):
+    """Type qu'aurait la colonne sans compaction (pour le rapport mémoire)."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.categories.dtype
+    # Les types nullables (Int64...) gardent leurs valeurs manquantes
+    if isinstance(serie.dtype, np.dtype) and pd.api.types.is_integer_dtype(serie):
+        return 'int64'
+    if isinstance(serie.dtype, np.dtype) and pd.api.types.is_float_dtype(serie):
+        return 'float64'
+    return serie.dtype
+
+
+def _taille_lisible(octets: float) -> str:
+    """Formater une taille en octets (Ko, Mo, Go)."""
+    for unite in ('o', 'Ko', 'Mo'):
+        if abs(octets) < 1024:
+            return f"{octets:.1f} {unite}"
+        octets /= 1024
+    return f"{octets:.1f} Go"
+
+
+OUTPUT_FORMATS = ('table', 'csv', 'jsonl')
+DISPLAY_BATCH = 1000  # Lignes rendues à la fois
+
+
+class Selection:
+    """
+    Lignes retenues par une recherche en mémoire: l'inventaire et leurs positions.
+    Seules les lignes d'une page sont copiées (voir _paginer), quel que soit le nombre de lignes retenues.
+    """
+
+    def __init__(self, inventaire: pd.DataFrame, positions: np.ndarray):
+        self.inventaire = inventaire
+        self.positions = positions
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def lignes(self, debut: int = 0, fin: Optional[int] = None) -> pd.DataFrame:
+        """Lignes [debut, fin) de la sélection."""
+        return self.inventaire.iloc[self.positions[debut:fin]]
+
+
+def _paginer(frames: Iterable[Union[pd.DataFrame, Selection]], limite: Optional[int],
+             decalage: int) -> Iterator[pd.DataFrame]:
+    """
+    Sauter les `decalage` premières lignes puis garder au plus `limite` lignes, sur un flux de DataFrames.
+    Une Selection est découpée avant d'être matérialisée: seules les lignes gardées sont copiées.
+    """
+    a_sauter, restant = decalage, limite
+    for frame in frames:
+        if restant is not None and restant <= 0:
+            return
+        if isinstance(frame, Selection):
+            debut = min(a_sauter, len(frame))
+            frame, a_sauter = frame.lignes(debut, None if restant is None else debut + restant), a_sauter - debut
+        if a_sauter:
+            if len(frame) <= a_sauter:
+                a_sauter -= len(frame)
+                continue
+            frame, a_sauter = frame.iloc[a_sauter:], 0
+        if restant is not None:
+            frame = frame.iloc[:restant]
+            restant -= len(frame)
+        if not frame.empty:
+            yield frame
+
+
+def _rendre(frames: Iterable[pd.DataFrame], format_sortie: str = 'table',
+            lot: int = DISPLAY_BATCH) -> Iterator[str]:
+    """
+    Rendre un flux de DataFrames par lots de lignes (tableau, CSV ou JSONL).
+    En tableau, les largeurs du premier lot servent de minimum aux suivants.
+    """
+    premier = True
+    largeurs, largeur_index = None, 0
+    for frame in frames:
+        for debut in range(0, len(frame), lot):
+            batch = frame.iloc[debut:debut + lot]
+            if format_sortie == 'csv':
+                yield batch.to_csv(index=False, header=premier)
+            elif format_sortie == 'jsonl':
+                yield batch.to_json(orient='records', lines=True, force_ascii=False)
+            else:
+                if premier:
+                    largeur_index = len(str(frame.index[-1]))
+                    largeurs = {col: max(len(str(col)), int(batch[col].astype(str).str.len().max()))
+                                for col in batch.columns}
+                # L'index est aligné à part; l'en-tête est rendu à chaque lot pour
+                # garder les mêmes largeurs de colonnes, puis retiré après le premier
+                lignes = batch.to_string(index=False, col_space=largeurs).split("\n")
+                etiquettes = [""] + [str(label) for label in batch.index]
+                largeur_index = max(largeur_index, max(len(e) for e in etiquettes))
+                lignes = [e.rjust(largeur_index) + " " + ligne for e, ligne in zip(etiquettes, lignes)]
+                yield "\n".join(lignes if premier else lignes[1:])
+            premier = False
+
+
+# Formats d'export reconnus à l'extension du fichier (CSV par défaut)
+EXPORT_FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.parquet': 'parquet'}
+EXPORT_COMPRESSIONS = {'.gz': 'gzip', '.zst': 'zstd'}
+EXPORT_BATCH = 100_000  # Lignes écrites à la fois
+
+
+def _format_export(path: Path) -> Tuple[str, Optional[str]]:
+    """Format et compression d'un export d'après l'extension: .csv, .csv.gz, .csv.zst, .jsonl(.gz|.zst), .parquet."""
+    suffixes = [suffixe.lower() for suffixe in path.suffixes]
+    compression = EXPORT_COMPRESSIONS.get(suffixes[-1]) if suffixes else None
+    if compression:
+        suffixes.pop()
+    format_export = EXPORT_FORMATS.get(suffixes[-1], 'csv') if suffixes else 'csv'
+    if format_export == 'parquet' and compression:
+        raise ValueError("Un fichier Parquet est déjà compressé: retirez .gz ou .zst.")
+    if (format_export == 'parquet' or compression == 'zstd') and not PYARROW_DISPONIBLE:
+        raise ValueError("L'export Parquet ou zstd nécessite pyarrow (pip install pyarrow).")
+    return format_export, compression
+
+
+def _ecrire_parquet(frames: Iterable[pd.DataFrame], tmp: Path) -> None:
+    """Écrire les DataFrames lot par lot dans un fichier Parquet, avec un schéma commun."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    writer = None
+    try:
+        for frame in frames:
+            for debut in range(0, len(frame), EXPORT_BATCH):
+                batch = frame.iloc[debut:debut + EXPORT_BATCH]
+                # Types non compactés: les morceaux lus hors mémoire n'ont pas tous les mêmes
+                batch = batch.astype({col: _dtype_brut(batch[col]) for col in batch.columns})
+                table = pa.Table.from_pandas(batch, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp, table.schema)
+                writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        pd.DataFrame().to_parquet(tmp)
+
+
+def _exporter(frames: Iterable[pd.DataFrame], path: Path) -> int:
+    """
+    Exporter un flux de DataFrames (sans leur index) vers un fichier, lot par lot:
+    seul un lot est converti à la fois, et le fichier n'apparaît qu'une fois complet.
+    Retourne le nombre de lignes exportées.
+    """
+    format_export, compression = _format_export(path)
+    lignes = 0
+
+    def compter(frames_exportees: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        nonlocal lignes
+        for frame in frames_exportees:
+            lignes += len(frame)
+            yield frame
+
+    def ecrire(tmp: Path) -> None:
+        if format_export == 'parquet':
+            _ecrire_parquet(compter(frames), tmp)
+            return
+        if compression == 'zstd':
+            import pyarrow as pa
+            flux = pa.CompressedOutputStream(str(tmp), 'zstd')
+        else:
+            flux = gzip.open(tmp, 'wb') if compression == 'gzip' else open(tmp, 'wb')
+        with flux:
+            for partie in _rendre(compter(frames), format_export, EXPORT_BATCH):
+                flux.write((partie if partie.endswith("\n") else partie + "\n").encode('utf-8'))
+
+    _ecrire_atomique(path, ecrire)
+    return lignes
+
+
+# Comparaison d'instantanés: un produit est identifié par son nom dans son fichier source
+DIFF_KEY = ['nom du produit', 'Fichier Source']
+DIFF_STATUTS = ('modifié', 'ajouté', 'supprimé')
+
+
+def _codes_communs(avant: pd.Series, apres: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Codes entiers d'une même colonne dans deux inventaires, égaux pour des valeurs égales.
+    Deux colonnes catégorielles sont réunies par leurs catégories, sans hacher chaque ligne;
+    les autres sont factorisées ensemble, sans passer par des objets Python si leurs types concordent.
+    """
+    if isinstance(avant.dtype, pd.CategoricalDtype) and isinstance(apres.dtype, pd.CategoricalDtype):
+        codes = pd.api.types.union_categoricals([avant, apres], ignore_order=True).codes
+    else:
+        avant, apres = avant.astype(_dtype_brut(avant)), apres.astype(_dtype_brut(apres))
+        codes, _ = pd.concat([avant, apres], ignore_index=True).factorize()
+    codes = np.asarray(codes, dtype='int64')
+    return codes[:len(avant)], codes[len(avant):]
+
+
+def _comparer_inventaires(avant: pd.DataFrame, apres: pd.DataFrame) -> pd.DataFrame:
+    """
+    Lignes modifiées, ajoutées puis supprimées entre deux inventaires, avec les écarts de quantité et de prix.
+    Jointure par hachage sur (nom du produit, Fichier Source), réduits à une clé entière par ligne:
+    aucun tri, aucune boucle Python sur les lignes. Les quantités sont comparées en int64 et les prix
+    en float64, quel que soit leur type compact. Une ligne ajoutée (supprimée) compte toute sa quantité
+    en écart positif (négatif).
+    """
+    cle_avant = np.zeros(len(avant), dtype='int64')
+    cle_apres = np.zeros(len(apres), dtype='int64')
+    for colonne in DIFF_KEY:
+        codes_avant, codes_apres = _codes_communs(avant[colonne], apres[colonne])
+        base = int(max(codes_avant.max(initial=-1), codes_apres.max(initial=-1))) + 1
+        cle_avant = cle_avant * base + codes_avant
+        cle_apres = cle_apres * base + codes_apres
+    index_avant = pd.Index(cle_avant)
+    if not index_avant.is_unique:
+        raise ValueError("Un même produit apparaît deux fois dans un fichier source: comparaison impossible.")
+
+    positions = index_avant.get_indexer(cle_apres)
+    communs = positions >= 0
+    conserves = np.zeros(len(avant), dtype=bool)
+    conserves[positions[communs]] = True
+    lignes_avant, lignes_apres = positions[communs], np.flatnonzero(communs)
+
+    quantites_avant = avant['quantité'].to_numpy(dtype='int64')
+    quantites_apres = apres['quantité'].to_numpy(dtype='int64')
+    prix_avant = avant['prix unitaire'].to_numpy(dtype='float64')
+    prix_apres = apres['prix unitaire'].to_numpy(dtype='float64')
+    categories_avant, categories_apres = _codes_communs(avant['catégorie'], apres['catégorie'])
+    modifies = ((quantites_avant[lignes_avant] != quantites_apres[lignes_apres])
+                | (prix_avant[lignes_avant] != prix_apres[lignes_apres])
+                | (categories_avant[lignes_avant] != categories_apres[lignes_apres]))
+    lignes_avant, lignes_apres = lignes_avant[modifies], lignes_apres[modifies]
+    ajoutes, supprimes = np.flatnonzero(~communs), np.flatnonzero(~conserves)
+
+    def partie(statut: str, source: pd.DataFrame, lignes: np.ndarray, qte_avant: Optional[np.ndarray],
+               qte_apres: Optional[np.ndarray], px_avant: Optional[np.ndarray],
+               px_apres: Optional[np.ndarray]) -> pd.DataFrame:
+        # None: valeur absente de l'un des deux inventaires (quantité nullable, prix NaN)
+        absents = np.ones(len(lignes), dtype=bool)
+        zeros = np.zeros(len(lignes), dtype='int64')
+        partie = source[['nom du produit', 'Fichier Source', 'catégorie']].iloc[lignes]
+        partie = partie.astype({col: _dtype_brut(partie[col]) for col in partie.columns})
+        partie.insert(0, 'statut', statut)
+        for colonne, quantites in (('quantité avant', qte_avant), ('quantité après', qte_apres)):
+            partie[colonne] = (pd.arrays.IntegerArray(zeros, absents) if quantites is None
+                               else pd.arrays.IntegerArray(quantites, ~absents))
+        partie['écart quantité'] = partie['quantité après'].fillna(0) - partie['quantité avant'].fillna(0)
+        partie['prix avant'] = np.full(len(lignes), np.nan) if px_avant is None else px_avant
+        partie['prix après'] = np.full(len(lignes), np.nan) if px_apres is None else px_apres
+        partie['écart prix'] = partie['prix après'] - partie['prix avant']
+        return partie
+
+    return pd.concat([
+        partie('modifié', apres, lignes_apres, quantites_avant[lignes_avant], quantites_apres[lignes_apres],
+               prix_avant[lignes_avant], prix_apres[lignes_apres]),
+        partie('ajouté', apres, ajoutes, None, quantites_apres[ajoutes], None, prix_apres[ajoutes]),
+        partie('supprimé', avant, supprimes, quantites_avant[supprimes], None, prix_avant[supprimes], None),
+    ], ignore_index=True)
+
+
+def _executer_en_ordre(pool: futures.Executor, fonction: Callable, elements: Iterable,
+                       fenetre: int, *args) -> Iterator[Tuple[object, futures.Future]]:
+    """
+    Soumettre fonction(element, *args) au pool et rendre les résultats dans l'ordre.
+    Au plus `fenetre` tâches sont en cours à la fois pour borner la mémoire.
+    """
+    en_cours = deque()
+    for element in elements:
+        en_cours.append((element, pool.submit(fonction, element, *args)))
+        if len(en_cours) >= fenetre:
+            yield en_cours.popleft()
+    while en_cours:
+        yield en_cours.popleft()
+
+
+def _extraire_options(arg: str, options: Dict[str, bool]) -> Tuple[str, Dict[str, object]]:
+    """
+    Séparer les options '--nom [valeur]' du reste de l'argument d'une commande.
+    options associe chaque nom d'option à True si elle attend une valeur.
+    Retourne le texte restant et un dictionnaire {nom: valeur ou True}.
+    """
+    reste, trouvees = [], {}
+    tokens = arg.split()
+    i = 0
+    while i < len(tokens):
+        nom = tokens[i][2:] if tokens[i].startswith('--') else None
+        if nom in options:
+            if options[nom]:
+                if i + 1 >= len(tokens):
+                    raise ValueError(f"L'option --{nom} attend une valeur.")
+                trouvees[nom] = tokens[i + 1]
+                i += 2
+                continue
+            trouvees[nom] = True
+        else:
+            reste.append(tokens[i])
+        i += 1
+    # Sans option, l'argument est rendu tel quel (espaces compris)
+    return (" ".join(reste) if trouvees else arg), trouvees
+
+
+def _borne(valeur: float, dtype) -> float:
+    """
+    Borne d'intervalle arrondie au type d'une colonne float32, pour la comparer aux valeurs
+    telles qu'elles sont stockées: le prix 1.99 en float32 n'est pas égal à 1.99 en float64.
+    """
+    if dtype == np.float32:
+        with np.errstate(over='ignore'):
+            return np.float32(valeur)
+    return valeur
+
+
+class IndexTrie:
+    """
+    Index trié d'une colonne numérique.
+    Répond aux recherches d'intervalle par dichotomie au lieu de parcourir toute la colonne.
+    """
+
+    def __init__(self, serie: pd.Series):
+        if not pd.api.types.is_numeric_dtype(serie):
+            raise TypeError(f"La colonne '{serie.name}' n'est pas numérique.")
+        # Les float32 gardent leur type: les bornes sont arrondies comme les valeurs (voir _borne)
+        dtype = 'float32' if serie.dtype == np.float32 else 'float64'
+        valeurs = serie.to_numpy(dtype=dtype, na_value=np.nan)
+        self.ordre = np.argsort(valeurs, kind='stable')  # Les NaN sont rangés à la fin
+        self.valeurs = valeurs[self.ordre]
+
+    def bornes(self, minimum: float, maximum: float) -> Tuple[int, int]:
+        """Début et fin de la tranche triée des valeurs comprises dans [minimum, maximum]."""
+        if np.isnan(minimum) or np.isnan(maximum):
+            return 0, 0
+        debut = int(np.searchsorted(self.valeurs, _borne(minimum, self.valeurs.dtype), side='left'))
+        fin = int(np.searchsorted(self.valeurs, _borne(maximum, self.valeurs.dtype), side='right'))
+        return debut, max(debut, fin)
+
+    def compter(self, minimum: float, maximum: float) -> int:
+        """Nombre de lignes dans l'intervalle, sans les extraire."""
+        debut, fin = self.bornes(minimum, maximum)
+        return fin - debut
+
+    def positions(self, minimum: float, maximum: float) -> np.ndarray:
+        """Positions des lignes dans l'intervalle, dans l'ordre de l'inventaire."""
+        debut, fin = self.bornes(minimum, maximum)
+        return np.sort(self.ordre[debut:fin])
+
+
+# Caractères qui font d'un terme de recherche une expression régulière
+REGEX_METACHARACTERS = set('.^$*+?{}[]\\|()')
+SEARCH_MODES = ('auto', 'litteral', 'regex')
+
+
+def _replier(texte: str) -> str:
+    """
+    Replier la casse et les accents d'un texte ('Électronique' -> 'electronique').
+    Le repliement se fait caractère par caractère: si un terme est contenu dans une valeur
+    sans tenir compte de la casse, le terme replié est contenu dans la valeur repliée.
+    """
+    if texte.isascii():
+        return texte.lower()  # Ni accents ni casse spéciale: même résultat, bien plus vite
+    decompose = unicodedata.normalize('NFKD', texte.casefold())
+    return ''.join(c for c in decompose if not unicodedata.combining(c))
+
+
+def _cle_categorie(categorie: str) -> str:
+    """Clé normalisée d'une catégorie: sans casse, sans accents, espaces réduits."""
+    return ' '.join(_replier(categorie).split())
+
+
+def _choisir_libelles(valeurs: List, comptes: List[int]) -> Dict[str, str]:
+    """
+    Associer à chaque orthographe d'une catégorie son libellé canonique:
+    l'orthographe la plus fréquente parmi celles de même clé (la première en cas d'égalité).
+    valeurs est dans l'ordre d'apparition, comptes donne le nombre de lignes de chacune.
+    """
+    meilleurs: Dict[str, Tuple[int, str]] = {}
+    for valeur, compte in zip(valeurs, comptes):
+        if not isinstance(valeur, str):
+            continue
+        cle = _cle_categorie(valeur)
+        if cle not in meilleurs or compte > meilleurs[cle][0]:
+            meilleurs[cle] = (compte, valeur)
+    return {valeur: meilleurs[_cle_categorie(valeur)][1] for valeur in valeurs if isinstance(valeur, str)}
+
+
+def _normaliser_categories(serie: pd.Series) -> pd.Series:
+    """
+    Remplacer chaque catégorie par son libellé canonique ('electronique' et 'Électronique'
+    deviennent une seule catégorie). Le calcul se fait sur les valeurs distinctes.
+    """
+    codes, valeurs = pd.factorize(serie)
+    comptes = np.bincount(codes[codes >= 0], minlength=len(valeurs))
+    libelles = _choisir_libelles(list(valeurs), comptes.tolist())
+    categories = sorted(set(libelles.values()))
+    position = {libelle: i for i, libelle in enumerate(categories)}
+    # Dernière case pour le code -1 des valeurs manquantes
+    table = np.array([position.get(libelles.get(v), -1) if isinstance(v, str) else -1 for v in valeurs] + [-1],
+                     dtype=np.int64)
+    return pd.Series(pd.Categorical.from_codes(table[codes], categories=categories),
+                     index=serie.index, name=serie.name)
+
+
+# Nombre de valeurs candidates, en part des lignes, au-delà duquel les trigrammes sont peu sélectifs: un parcours
+# vectorisé (Series.str.contains) est alors plus rapide que la vérification valeur par valeur
+SEUIL_TRIGRAMMES = 0.01
+
+
+def _trigrammes(texte: str) -> set:
+    """Ensemble des trigrammes d'un texte."""
+    return {texte[i:i + 3] for i in range(len(texte) - 2)}
+
+
+def _cle_trigramme(trigramme: str, alphabet: Dict[str, int]) -> Optional[int]:
+    """Trigramme codé en entier en base len(alphabet) + 1 (None si un caractère est hors de l'alphabet)."""
+    base = len(alphabet) + 1
+    cle = 0
+    for caractere in trigramme:
+        rang = alphabet.get(caractere)
+        if rang is None:
+            return None
+        cle = cle * base + rang
+    return cle
+
+
+def _cles_trigrammes(textes: List[Optional[str]], lot: int = 16384) -> Tuple[Dict[str, int], np.ndarray, np.ndarray]:
+    """
+    Trigrammes codés (voir _cle_trigramme) de chaque texte, calculés par numpy lot par lot.
+    Retourne (alphabet, clés, numéros des textes), triés par clé puis par numéro, sans doublons.
+    Sur un petit alphabet, les clés tiennent sur 16 ou 32 bits: un ou deux tris par base suffisent.
+    """
+    caracteres = sorted(set(''.join(texte for texte in textes if texte)))
+    alphabet = {caractere: i + 1 for i, caractere in enumerate(caracteres)}  # 0: remplissage
+    points = np.array([ord(caractere) for caractere in caracteres], dtype=np.int64)
+    base = len(alphabet) + 1
+    type_cle = np.uint32 if base ** 3 < 2 ** 32 else np.int64
+    cles, numeros = [], []
+    for debut in range(0, len(textes), lot):
+        bloc = np.array([texte or '' for texte in textes[debut:debut + lot]], dtype=str)
+        largeur = bloc.dtype.itemsize // 4
+        if largeur < 3:
+            continue
+        rangs = (np.searchsorted(points, bloc.view(np.uint32).reshape(len(bloc), largeur)) + 1).astype(type_cle)
+        cle = (rangs[:, :-2] * base + rangs[:, 1:-1]) * base + rangs[:, 2:]
+        garde = np.arange(largeur - 2) < (np.char.str_len(bloc) - 2)[:, None]
+        cles.append(cle[garde])
+        numeros.append((np.nonzero(garde)[0] + debut).astype(np.int32))  # Croissants: les tris stables les gardent
+    if not cles:
+        return alphabet, np.empty(0, dtype=type_cle), np.empty(0, dtype=np.int32)
+    cles = np.concatenate(cles)
+    numeros = np.concatenate(numeros)
+    ordre = np.argsort((cles & 0xFFFF).astype(np.uint16), kind='stable')
+    for decalage in range(16, int(cles.max()).bit_length(), 16):
+        ordre = ordre[np.argsort(((cles[ordre] >> decalage) & 0xFFFF).astype(np.uint16), kind='stable')]
+    cles = cles[ordre]
+    numeros = numeros[ordre]
+    del ordre
+    nouveau = np.ones(len(cles), dtype=bool)
+    nouveau[1:] = (cles[1:] != cles[:-1]) | (numeros[1:] != numeros[:-1])
+    return alphabet, cles[nouveau], numeros[nouveau]
+
+
+class IndexTrigrammes:
+    """
+    Index de trigrammes repliés (casse et accents) d'une colonne texte.
+    Les valeurs distinctes sont indexées une seule fois; une recherche réduit d'abord
+    les candidats par les trigrammes du terme, puis vérifie chaque candidat avec la
+    même sémantique que Series.str.contains(terme, case=False). Si les valeurs candidates dépassent
+    SEUIL_TRIGRAMMES des lignes, la recherche littérale fait directement ce parcours.
+    Avec un normaliser (clés de catégorie), la recherche littérale compare directement
+    les clés normalisées et ignore donc aussi les accents.
+    Les listes de trigrammes sont construites à la première recherche qui en a besoin.
+    """
+
+    def __init__(self, serie: pd.Series, normaliser: Optional[Callable[[str], str]] = None,
+                 trigrammes: bool = True):
+        self.serie = serie
+        self.codes, valeurs = pd.factorize(serie)  # Code -1 pour les valeurs manquantes
+        self.valeurs = valeurs.tolist()
+        self.normaliser = normaliser
+        self.replis = [(normaliser or _replier)(v) if isinstance(v, str) else None for v in self.valeurs]
+        self.trigrammes = trigrammes  # Sans trigrammes, toutes les valeurs distinctes sont candidates
+        self._postings: Optional[Tuple[Dict[str, int], np.ndarray, np.ndarray, np.ndarray]] = None
+        self._comptes: Optional[np.ndarray] = None
+
+    def _liste(self, trigramme: str) -> np.ndarray:
+        """Codes des valeurs distinctes dont le repli contient le trigramme."""
+        if self._postings is None:
+            alphabet, cles, numeros = _cles_trigrammes(self.replis)
+            debuts = np.flatnonzero(np.r_[True, cles[1:] != cles[:-1]]) if len(cles) else np.empty(0, np.int64)
+            self._postings = (alphabet, cles[debuts], np.append(debuts, len(cles)), numeros)
+        alphabet, cles, debuts, numeros = self._postings
+        cle = _cle_trigramme(trigramme, alphabet)
+        i = int(np.searchsorted(cles, cle)) if cle is not None else len(cles)
+        if i == len(cles) or cles[i] != cle:
+            return np.empty(0, dtype=np.int32)
+        return numeros[debuts[i]:debuts[i + 1]]
+
+    def _candidats(self, terme_replie: str, parmi: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Valeurs distinctes pouvant contenir le terme replié (parmi les codes donnés).
+        Les listes sont intersectées de la plus courte à la plus longue; si les codes donnés
+        sont moins nombreux que la plus courte, ils sont vérifiés directement.
+        """
+        trigrammes = _trigrammes(terme_replie)
+        if not self.trigrammes or not trigrammes:
+            return np.arange(len(self.valeurs)) if parmi is None else parmi
+        listes = sorted((self._liste(t) for t in trigrammes), key=len)
+        if parmi is not None:
+            if len(parmi) <= len(listes[0]):
+                return parmi
+            listes.insert(0, parmi)
+        candidats = listes[0]
+        for liste in listes[1:]:
+            if len(candidats) == 0 or len(liste) == 0:
+                return np.empty(0, dtype=np.int64)
+            # Listes triées: recherche dichotomique des candidats, sans retrier la liste longue
+            rangs = np.minimum(np.searchsorted(liste, candidats), len(liste) - 1)
+            candidats = candidats[liste[rangs] == candidats]
+        return candidats
+
+    def _mode(self, terme: str, mode: str) -> str:
+        if mode == 'auto':
+            return 'regex' if REGEX_METACHARACTERS & set(terme) else 'litteral'
+        return mode
+
+    def comptes(self) -> np.ndarray:
+        """Nombre de lignes de chaque valeur distincte, calculé une seule fois."""
+        if self._comptes is None:
+            self._comptes = np.bincount(self.codes[self.codes >= 0], minlength=len(self.valeurs))
+        return self._comptes
+
+    def estimer(self, terme: str, mode: str = 'auto') -> int:
+        """Majorant du nombre de lignes retenues, d'après les seuls trigrammes du terme."""
+        if self._mode(terme, mode) == 'regex':
+            return len(self.codes)
+        return int(self.comptes()[self._candidats((self.normaliser or _replier)(terme))].sum())
+
+    def trouves(self, terme: str, mode: str = 'auto', parmi: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Table indexée par code des valeurs distinctes qui contiennent le terme;
+        la dernière case (code -1) reste fausse. parmi limite la vérification à ces codes.
+        """
+        mode = self._mode(terme, mode)
+        trouves = np.zeros(len(self.valeurs) + 1, dtype=bool)
+        if mode == 'litteral':
+            motif = re.compile(re.escape(terme), re.IGNORECASE)
+            terme_replie = (self.normaliser or _replier)(terme)
+            codes = self._candidats(terme_replie, parmi)
+            candidats = [i for i in codes.tolist() if self.replis[i] is not None and terme_replie in self.replis[i]]
+            if self.normaliser:
+                # La clé normalisée fait foi: pas de vérification sur la valeur d'origine
+                trouves[candidats] = True
+                return trouves
+        else:
+            motif = re.compile(terme, re.IGNORECASE)
+            codes = range(len(self.valeurs)) if parmi is None else parmi.tolist()
+            candidats = (i for i in codes if isinstance(self.valeurs[i], str))
+
+        for i in candidats:
+            if motif.search(self.valeurs[i]):
+                trouves[i] = True
+        return trouves
+
+    def _parcourir(self, terme: str, mode: str) -> bool:
+        """Vrai si un terme littéral est trop peu sélectif pour l'index (colonne non normalisée)."""
+        if self.normaliser or self._mode(terme, mode) != 'litteral':
+            return False
+        return len(self._candidats((self.normaliser or _replier)(terme))) > SEUIL_TRIGRAMMES * len(self.codes)
+
+    def masque(self, terme: str, mode: str = 'auto') -> np.ndarray:
+        """Masque booléen des lignes dont la valeur contient le terme (insensible à la casse)."""
+        if self._parcourir(terme, mode):
+            return self.serie.str.contains(terme, case=False, regex=False, na=False).to_numpy(dtype=bool)
+        return self.trouves(terme, mode)[self.codes]
+
+    def masque_positions(self, positions: np.ndarray, terme: str, mode: str = 'auto') -> np.ndarray:
+        """Masque du terme sur les seules lignes données: seules leurs valeurs distinctes sont vérifiées."""
+        if self._parcourir(terme, mode):
+            lignes = self.serie.iloc[positions]
+            return lignes.str.contains(terme, case=False, regex=False, na=False).to_numpy(dtype=bool)
+        codes = self.codes[positions]
+        parmi = np.unique(codes[codes >= 0])
+        return self.trouves(terme, mode, parmi)[codes]
+
+
+# Critères d'une requête combinée et colonne correspondante
+# Filtres de EtatInventaire qui désignent des lignes par leurs positions (voir EtatInventaire.positions)
+POSITION_FILTERS = ('filtrer_nom', 'filtrer_categorie', 'filtrer_prix', 'filtrer_quantite', 'filtrer_plages',
+                    'filtrer_requete')
+QUERY_FIELDS = {'nom': 'nom du produit', 'categorie': 'catégorie', 'prix': 'prix unitaire', 'quantite': 'quantité'}
+QUERY_ALIASES = {'catégorie': 'categorie', 'quantité': 'quantite'}
+
+
+def _analyser_requete(texte: str, mode: str = 'auto') -> Tuple[Tuple[str, tuple], ...]:
+    """
+    Analyser une requête combinée comme 'nom=chaise categorie=meuble prix=10..50 quantite=5..'.
+    Les intervalles acceptent une borne ouverte ('10..', '..50') ou une valeur seule ('prix=20').
+    Retourne des critères (champ, valeur) hashables, dans l'ordre de la requête.
+    """
+    try:
+        elements = shlex.split(texte)
+    except ValueError as e:
+        raise ValueError(f"Requête invalide: {str(e)}")
+    criteres = {}
+    for element in elements:
+        champ, egal, valeur = element.partition('=')
+        champ = QUERY_ALIASES.get(champ.strip().lower(), champ.strip().lower())
+        if not egal or champ not in QUERY_FIELDS or not valeur.strip():
+            raise ValueError(f"Critère invalide: {element} (champs: {', '.join(QUERY_FIELDS)}, ex: prix=10..50).")
+        if champ in criteres:
+            raise ValueError(f"Critère répété: {champ}")
+        if champ in ('nom', 'categorie'):
+            criteres[champ] = (valeur, mode)
+            continue
+        minimum, intervalle, maximum = valeur.partition('..')
+        try:
+            bornes = (float(minimum) if minimum.strip() else -np.inf,
+                      float(maximum) if maximum.strip() else np.inf) if intervalle else (float(valeur),) * 2
+        except ValueError:
+            raise ValueError(f"Intervalle invalide pour {champ}: {valeur} (ex: {champ}=10..50).")
+        criteres[champ] = bornes
+    if not criteres:
+        raise ValueError("Veuillez spécifier au moins un critère (ex: nom=chaise prix=10..50).")
+    return tuple(criteres.items())
+
+
+# Classements top/bas: critère -> colonne classée (la valeur du stock est calculée)
+RANKING_CRITERIA = {'quantite': 'quantité', 'prix': 'prix unitaire', 'valeur': 'valeur du stock'}
+RANKING_ALIASES = {'quantité': 'quantite'}
+
+
+def _valeurs_classement(frame: pd.DataFrame, critere: str) -> np.ndarray:
+    """Valeurs d'un critère de classement, en int64 ou float64 (valeur du stock: quantité × prix unitaire)."""
+    if critere == 'valeur':
+        return frame['quantité'].to_numpy(dtype='float64') * frame['prix unitaire'].to_numpy(dtype='float64')
+    colonne = frame[RANKING_CRITERIA[critere]]
+    return colonne.to_numpy(dtype='int64' if pd.api.types.is_integer_dtype(colonne) else 'float64')
+
+
+def _selection_partielle(valeurs: np.ndarray, rangs: np.ndarray, nombre: int, plus_grands: bool) -> np.ndarray:
+    """
+    Positions des `nombre` plus grandes (ou plus petites) valeurs, de la première à la dernière.
+    np.partition trouve la valeur limite en temps linéaire, puis seules les lignes qui l'atteignent
+    sont triées, à égalité dans l'ordre des rangs (numéros de ligne) quel que soit le découpage.
+    """
+    cles = -valeurs if plus_grands else valeurs
+    candidats = np.arange(len(cles))
+    if nombre < len(cles):
+        limite = np.partition(cles, nombre - 1)[nombre - 1]
+        candidats = np.flatnonzero(cles <= limite)
+    return candidats[np.lexsort((rangs[candidats], cles[candidats]))[:nombre]]
+
+
+def _classer(frame: pd.DataFrame, critere: str, nombre: int, plus_grands: bool,
+             par_categorie: bool = False, seuil: Optional[float] = None) -> pd.DataFrame:
+    """
+    Les `nombre` lignes de plus grande (ou plus petite) valeur du critère, avec leur valeur du stock.
+    Avec un seuil, seules les lignes au moins (au plus) égales au seuil sont classées; avec par_categorie,
+    chaque catégorie (regroupée sans casse ni accents, dans l'ordre alphabétique) a ses `nombre` lignes.
+    Reclasser la réunion de plusieurs classements (morceaux, fragments) donne le classement de l'ensemble.
+    """
+    valeurs = _valeurs_classement(frame, critere)
+    rangs = frame.index.to_numpy()
+    lignes = np.arange(len(frame))
+    if seuil is not None:
+        if critere == 'prix':
+            seuil = float(_borne(seuil, frame['prix unitaire'].dtype))
+        lignes = np.flatnonzero(valeurs >= seuil if plus_grands else valeurs <= seuil)
+
+    if not par_categorie:
+        positions = lignes[_selection_partielle(valeurs[lignes], rangs[lignes], nombre, plus_grands)]
+    else:
+        categories = frame['catégorie'].astype('category')
+        # Groupe de chaque orthographe; dernière case pour le code -1 des catégories manquantes
+        cles = [_cle_categorie(c) if isinstance(c, str) else '' for c in categories.cat.categories] + ['']
+        groupes, noms_groupes = pd.factorize(np.array(cles, dtype=object))
+        groupe_ligne = groupes[categories.cat.codes.to_numpy()[lignes]]
+        parties = [np.array([], dtype='int64')]
+        for groupe, membres in sorted(pd.Series(lignes).groupby(groupe_ligne).indices.items(),
+                                      key=lambda element: noms_groupes[element[0]]):
+            membres = lignes[membres]
+            parties.append(membres[_selection_partielle(valeurs[membres], rangs[membres], nombre, plus_grands)])
+        positions = np.concatenate(parties)
+
+    resultat = frame.iloc[positions]
+    return resultat.assign(**{'valeur du stock': _valeurs_classement(resultat, 'valeur')})
+
+
+def _analyser_classement(texte: str) -> Tuple[str, int]:
+    """Critère (quantite, prix ou valeur) et nombre de lignes d'un classement top/bas ('quantite 50')."""
+    mots = texte.split()
+    if not mots or len(mots) > 2:
+        raise ValueError(f"Usage: top|bas <{'|'.join(RANKING_CRITERIA)}> [N]")
+    critere = RANKING_ALIASES.get(mots[0].lower(), mots[0].lower())
+    if critere not in RANKING_CRITERIA:
+        raise ValueError(f"Critère inconnu: {mots[0]} (choix: {', '.join(RANKING_CRITERIA)}).")
+    try:
+        nombre = int(mots[1]) if len(mots) > 1 else 10
+    except ValueError:
+        raise ValueError(f"Nombre de produits invalide: {mots[1]}") from None
+    if nombre < 1:
+        raise ValueError("Le nombre de produits doit être positif.")
+    return critere, nombre
+
+
+_VERSIONS_INVENTAIRE = count(1)
+
+
+class EtatInventaire:
+    """
+    Inventaire et structures dérivées (index, catégories normalisées).
+    Remplacé d'un bloc à chaque chargement: les index ne sont jamais périmés,
+    et chaque état reçoit un numéro de version croissant.
+    Sans index (indexe=False, morceaux lus hors mémoire), les filtres font un
+    simple parcours mais gardent exactement la même sémantique.
+    """
+
+    def __init__(self, inventory: pd.DataFrame, indexe: bool = True):
+        self.inventory = inventory
+        self.indexe = indexe
+        self.version = next(_VERSIONS_INVENTAIRE)  # Change à chaque chargement ou rechargement
+        self._index: Dict[str, IndexTrie] = {}
+        self._index_texte: Dict[str, IndexTrigrammes] = {}
+        self._categories: Optional[pd.Series] = None
+        # Agrégats partiels par fichier source, dans l'ordre de l'inventaire
+        self.partiels: Optional[Dict[str, pd.DataFrame]] = None
+        self._rapport: Optional[pd.DataFrame] = None
+        # Fragments par fichier source (magasin): blocs de lignes, et états construits à la demande
+        self._blocs: Optional[Dict[str, List[Tuple[int, int]]]] = None
+        self._fragments: Dict[str, EtatInventaire] = {}
+
+    def index_trie(self, colonne: str) -> IndexTrie:
+        """Index trié de la colonne, construit à la première utilisation."""
+        index = self._index.get(colonne)
+        if index is None:
+            index = self._index[colonne] = IndexTrie(self.inventory[colonne])
+        return index
+
+    def index_texte(self, colonne: str) -> IndexTrigrammes:
+        """Index de trigrammes de la colonne, construit à la première utilisation."""
+        index = self._index_texte.get(colonne)
+        if index is None:
+            normaliser = _cle_categorie if colonne == 'catégorie' else None
+            index = self._index_texte[colonne] = IndexTrigrammes(self.inventory[colonne], normaliser, self.indexe)
+        return index
+
+    def _positions(self, colonne: str, minimum: float, maximum: float) -> np.ndarray:
+        """Positions des lignes dont la colonne est dans [minimum, maximum]."""
+        if self.indexe:
+            return self.index_trie(colonne).positions(minimum, maximum)
+        serie = self.inventory[colonne]
+        minimum, maximum = _borne(minimum, serie.dtype), _borne(maximum, serie.dtype)
+        return np.flatnonzero(((serie >= minimum) & (serie <= maximum)).to_numpy(dtype=bool))
+
+    def positions(self, filtre: str, *args) -> np.ndarray:
+        """Positions des lignes retenues par un filtre de POSITION_FILTERS, sans copier ces lignes."""
+        if filtre == 'filtrer_prix':
+            return self._positions('prix unitaire', *args)
+        if filtre == 'filtrer_quantite':
+            return self._positions('quantité', *args)
+        if filtre == 'filtrer_nom':
+            return np.flatnonzero(self.index_texte('nom du produit').masque(*args))
+        if filtre == 'filtrer_categorie':
+            return np.flatnonzero(self.index_texte('catégorie').masque(*args))
+        if filtre == 'filtrer_plages':
+            prix_min, prix_max, qte_min, qte_max, *categorie = args
+            criteres = (('prix', (prix_min, prix_max)), ('quantite', (qte_min, qte_max)))
+            if categorie and categorie[0]:
+                criteres += (('categorie', (categorie[0], 'auto')),)
+            return self.positions_requete(criteres)
+        if filtre == 'filtrer_requete':
+            return self.positions_requete(*args)
+        raise ValueError(f"Filtre inconnu: {filtre}")
+
+    def positions_fragment(self, nom: str, filtre: str, *args) -> np.ndarray:
+        """Positions, dans tout l'inventaire, des lignes d'un fragment retenues par un filtre."""
+        positions = self.fragment(nom).positions(filtre, *args)
+        blocs = self.blocs()[nom]
+        if len(blocs) == 1:
+            return positions + blocs[0][0]
+        return np.concatenate([np.arange(debut, fin) for debut, fin in blocs])[positions]
+
+    def filtrer_prix(self, prix_min: float, prix_max: float) -> pd.DataFrame:
+        """Produits dont le prix unitaire est dans [prix_min, prix_max]."""
+        return self.inventory.iloc[self.positions('filtrer_prix', prix_min, prix_max)]
+
+    def filtrer_quantite(self, qte_min: int, qte_max: int) -> pd.DataFrame:
+        """Produits dont la quantité est dans [qte_min, qte_max]."""
+        return self.inventory.iloc[self.positions('filtrer_quantite', qte_min, qte_max)]
+
+    def filtrer_nom(self, term: str, mode: str = 'auto') -> pd.DataFrame:
+        """Produits dont le nom contient le terme, sans tenir compte de la casse."""
+        return self.inventory.iloc[self.positions('filtrer_nom', term, mode)]
+
+    def filtrer_categorie(self, categorie: str, mode: str = 'auto') -> pd.DataFrame:
+        """Produits dont la catégorie contient le terme (clés normalisées en mode littéral)."""
+        return self.inventory.iloc[self.positions('filtrer_categorie', categorie, mode)]
+
+    def filtrer_plages(self, prix_min: float, prix_max: float, qte_min: int, qte_max: int,
+                       categorie: Optional[str] = None) -> pd.DataFrame:
+        """Produits filtrés à la fois par prix, quantité et (optionnellement) catégorie."""
+        return self.inventory.iloc[self.positions('filtrer_plages', prix_min, prix_max, qte_min, qte_max, categorie)]
+
+    def plan_requete(self, criteres: Tuple[Tuple[str, tuple], ...]) -> List[Tuple[str, Optional[int]]]:
+        """
+        Ordre d'évaluation des critères, du plus sélectif au moins sélectif, avec leur estimation:
+        nombre exact de lignes par l'index trié pour un intervalle (coût logarithmique), majorant
+        par les trigrammes pour un texte. Un texte n'est pas estimé (None, évalué en dernier)
+        si un intervalle garde déjà moins de 1% des lignes. Sans index, l'ordre de la requête est gardé.
+        """
+        if not self.indexe:
+            return [(champ, None) for champ, _ in criteres]
+        estimations = {champ: self.index_trie(QUERY_FIELDS[champ]).compter(*valeur)
+                       for champ, valeur in criteres if champ in ('prix', 'quantite')}
+        selectif = min(estimations.values(), default=len(self.inventory)) < len(self.inventory) // 100
+        for champ, valeur in criteres:
+            if champ in ('nom', 'categorie'):
+                estimations[champ] = None if selectif else self.index_texte(QUERY_FIELDS[champ]).estimer(*valeur)
+        plan = [(champ, estimations[champ]) for champ, _ in criteres]
+        return sorted(plan, key=lambda etape: (etape[1] is None, etape[1] or 0))
+
+    def filtrer_requete(self, criteres: Tuple[Tuple[str, tuple], ...]) -> pd.DataFrame:
+        """Produits qui vérifient tous les critères d'une requête combinée (voir positions_requete)."""
+        return self.inventory.iloc[self.positions_requete(criteres)]
+
+    def positions_requete(self, criteres: Tuple[Tuple[str, tuple], ...]) -> np.ndarray:
+        """
+        Positions des produits qui vérifient tous les critères d'une requête combinée.
+        Le critère le plus sélectif fournit les positions candidates (par son index);
+        les suivants ne sont évalués que sur les lignes qui restent.
+        """
+        valeurs = dict(criteres)
+        positions = None
+        for champ, _ in self.plan_requete(criteres):
+            colonne = QUERY_FIELDS[champ]
+            if positions is not None and len(positions) == 0:
+                break
+            if champ in ('nom', 'categorie'):
+                index = self.index_texte(colonne)
+                if positions is None:
+                    positions = np.flatnonzero(index.masque(*valeurs[champ]))
+                else:
+                    positions = positions[index.masque_positions(positions, *valeurs[champ])]
+            elif positions is None:
+                positions = self._positions(colonne, *valeurs[champ])
+            else:
+                serie = self.inventory[colonne].to_numpy()[positions]
+                minimum, maximum = (_borne(borne, serie.dtype) for borne in valeurs[champ])
+                positions = positions[(serie >= minimum) & (serie <= maximum)]
+        return positions
+
+    def classer(self, critere: str, nombre: int, plus_grands: bool, par_categorie: bool = False,
+                seuil: Optional[float] = None) -> pd.DataFrame:
+        """Classement top/bas par sélection partielle (voir _classer), sans trier tout l'inventaire."""
+        return _classer(self.inventory, critere, nombre, plus_grands, par_categorie, seuil)
+
+    def categories(self) -> pd.Series:
+        """Libellé canonique de la catégorie de chaque ligne, calculé une seule fois."""
+        if self._categories is None:
+            self._categories = _normaliser_categories(self.inventory['catégorie'])
+        return self._categories
+
+    def partiels_par_fichier(self, jobs: int = 1) -> Dict[str, pd.DataFrame]:
+        """
+        Agrégats partiels par fichier, recalculés depuis l'inventaire s'ils n'ont pas été fournis
+        (instantané disque, inventaire affecté directement), sur jobs processus si jobs > 1.
+        """
+        if self.partiels is None:
+            if jobs > 1 and len(self.inventory) > 0:
+                self.partiels = _agreger_partiels_paralleles(self.inventory, jobs)
+            elif 'Fichier Source' in self.inventory.columns:
+                groupes = self.inventory.groupby('Fichier Source', sort=False, observed=True)
+                self.partiels = {str(source): _agreger_partiel(groupe) for source, groupe in groupes}
+            else:
+                self.partiels = {'': _agreger_partiel(self.inventory)}
+        return self.partiels
+
+    def rapport(self, jobs: int = 1) -> pd.DataFrame:
+        """Rapport par catégorie (non arrondi), fusionné une fois depuis les agrégats partiels."""
+        if self._rapport is None:
+            self._rapport = _fusionner_partiels(self.partiels_par_fichier(jobs).values())
+        return self._rapport
+
+    def blocs(self) -> Dict[str, List[Tuple[int, int]]]:
+        """
+        Blocs [début, fin) de lignes de chaque fichier source, dans l'ordre de l'inventaire.
+        Les fichiers sont concaténés l'un après l'autre: chacun forme en général un seul bloc.
+        """
+        if self._blocs is None:
+            self._blocs = {}
+            if 'Fichier Source' in self.inventory.columns and len(self.inventory) > 0:
+                codes, noms = pd.factorize(self.inventory['Fichier Source'])
+                bornes = np.r_[0, np.flatnonzero(codes[1:] != codes[:-1]) + 1, len(codes)]
+                for debut, fin in zip(bornes[:-1].tolist(), bornes[1:].tolist()):
+                    nom = str(noms[codes[debut]]) if codes[debut] >= 0 else ''
+                    self._blocs.setdefault(nom, []).append((debut, fin))
+        return self._blocs
+
+    def choisir_fragments(self, demandes: str) -> Tuple[str, ...]:
+        """
+        Fragments désignés par une liste 'magasin1.csv,magasin2' (nom de fichier, avec ou sans .csv),
+        dans l'ordre de l'inventaire.
+        """
+        blocs = self.blocs()
+        par_nom = {}
+        for nom in blocs:
+            par_nom[nom] = nom
+            par_nom.setdefault(Path(nom).stem, nom)
+        demandes = [demande.strip() for demande in demandes.split(',') if demande.strip()]
+        inconnus = [demande for demande in demandes if demande not in par_nom]
+        if inconnus or not demandes:
+            raise ValueError(f"Magasin(s) inconnu(s): {', '.join(inconnus) or '-'} "
+                             f"(disponibles: {', '.join(blocs) or 'aucun'}).")
+        choisis = {par_nom[demande] for demande in demandes}
+        return tuple(nom for nom in blocs if nom in choisis)
+
+    def fragment(self, nom: str) -> 'EtatInventaire':
+        """
+        État limité aux lignes d'un fichier source, avec ses propres index construits
+        à la première recherche; les lignes gardent leur numéro dans l'inventaire.
+        """
+        fragment = self._fragments.get(nom)
+        if fragment is None:
+            blocs = self.blocs()[nom]
+            if len(blocs) == 1:
+                lignes = self.inventory.iloc[blocs[0][0]:blocs[0][1]]
+            else:
+                lignes = self.inventory.iloc[np.concatenate([np.arange(debut, fin) for debut, fin in blocs])]
+            fragment = EtatInventaire(lignes, self.indexe)
+            if self.partiels is not None and nom in self.partiels:
+                fragment.partiels = {nom: self.partiels[nom]}
+            fragment = self._fragments.setdefault(nom, fragment)
+        return fragment
+
+    def rapport_fragments(self, noms: Tuple[str, ...], jobs: int = 1) -> pd.DataFrame:
+        """Rapport (non arrondi) de quelques fichiers, fusionné depuis leurs seuls agrégats partiels."""
+        partiels = self.partiels_par_fichier(jobs)
+        return _fusionner_partiels(partiels[nom] for nom in noms if nom in partiels)
+
+    def rapport_complet(self) -> pd.DataFrame:
+        """Rapport recalculé par un groupby sur tout l'inventaire (non arrondi), prix en float64."""
+        inventaire = self.inventory.assign(**{'prix unitaire': self.inventory['prix unitaire'].astype(np.float64)})
+        report = inventaire.groupby(self.categories(), observed=True).agg({
+            'quantité': ['sum', 'mean', 'count'],
+            'prix unitaire': ['mean', 'min', 'max']
+        })
+        report.columns = [f"{col[0]}_{col[1]}" for col in report.columns]
+        return report
+
+    def preparer_index(self) -> None:
+        """
+        Construire à l'avance les index des colonnes numériques et les catégories normalisées.
+        Les index de trigrammes, coûteux sur des millions de noms distincts, attendent la première recherche.
+        """
+        for colonne in ('prix unitaire', 'quantité'):
+            if colonne in self.inventory.columns and pd.api.types.is_numeric_dtype(self.inventory[colonne]):
+                self.index_trie(colonne)
+        if 'catégorie' in self.inventory.columns:
+            self.categories()
+
+
+class SourceHorsMemoire:
+    """
+    Inventaire lu à la demande, morceau par morceau, pour les dossiers plus gros que la mémoire.
+    Chaque morceau est typé comme l'inventaire en mémoire et garde la même numérotation
+    des lignes, pour que les résultats soient identiques aux deux modes.
+    """
+
+    def __init__(self, fichiers: List[Tuple[Path, str]], required_columns: List[str],
+                 budget: int, price_dtype: str = 'float64'):
+        self.fichiers = fichiers  # (chemin, encodage) des fichiers valides, dans l'ordre
+        self.required_columns = required_columns
+        self.budget = budget
+        self.price_dtype = price_dtype
+        self.doublons: Dict[Path, np.ndarray] = {}  # Index des doublons de chaque fichier déjà parcouru
+
+    def _lignes_par_morceau(self, file_path: Path, encoding: str) -> int:
+        """Nombre de lignes par morceau pour tenir dans le budget, estimé sur un échantillon."""
+        echantillon = pd.read_csv(file_path, encoding=encoding, usecols=self.required_columns, nrows=1000)
+        octets_par_ligne = echantillon.memory_usage(deep=True).sum() / max(len(echantillon), 1)
+        # Marge pour les copies faites par les filtres et l'affichage
+        return max(1, int(self.budget // max(4 * octets_par_ligne, 1)))
+
+    def _lire(self, file_path: Path, encoding: str) -> Iterator[pd.DataFrame]:
+        """Morceaux bruts d'un fichier, indexés par leur numéro de ligne de données."""
+        lecteur = pd.read_csv(file_path, encoding=encoding, usecols=self.required_columns,
+                              chunksize=self._lignes_par_morceau(file_path, encoding))
+        with lecteur:
+            for morceau in lecteur:
+                yield morceau[self.required_columns]
+
+    def _doublons(self, file_path: Path, encoding: str) -> np.ndarray:
+        """
+        Index des doublons d'un fichier: mêmes rejets qu'en mémoire, en mémoire bornée.
+        Les empreintes 64 bits des noms valides sont réparties sur disque en partitions
+        qui tiennent chacune dans le budget, puis chaque partition est triée: seuls les
+        doublons trouvés restent en mémoire, quel que soit le nombre de produits distincts.
+        """
+        import tempfile  # Seul le mode hors mémoire en a besoin: pas de coût au démarrage
+        if file_path in self.doublons:
+            return self.doublons[file_path]
+        # 16 octets par ligne valide, pour au moins 6 octets par ligne de CSV
+        partitions = max(1, -(-3 * file_path.stat().st_size // self.budget))
+        enregistrement = np.dtype([('empreinte', np.uint64), ('ligne', np.int64)])
+        trouves = []
+        with tempfile.TemporaryDirectory(prefix='doublons-') as dossier:
+            chemins = [Path(dossier) / f"{numero}.bin" for numero in range(partitions)]
+            for morceau in self._lire(file_path, encoding):
+                valides, _ = _valider_lignes(morceau, self.price_dtype, np.empty(0, dtype=np.int64))
+                lignes = np.empty(len(valides), dtype=enregistrement)
+                lignes['empreinte'] = pd.util.hash_pandas_object(
+                    valides['nom du produit'].astype(str).str.strip(), index=False).to_numpy()
+                lignes['ligne'] = valides.index.to_numpy()
+                partition = lignes['empreinte'] % np.uint64(partitions)
+                for numero in np.unique(partition):
+                    with open(chemins[numero], 'ab') as sortie:
+                        lignes[partition == numero].tofile(sortie)
+            for chemin in chemins:
+                if chemin.exists():
+                    bloc = np.fromfile(chemin, dtype=enregistrement)
+                    bloc = bloc[np.argsort(bloc['empreinte'], kind='stable')]  # Lignes croissantes par nom
+                    repetes = bloc['empreinte'][1:] == bloc['empreinte'][:-1]
+                    trouves.append(bloc['ligne'][1:][repetes])
+        self.doublons[file_path] = np.sort(np.concatenate(trouves)) if trouves else np.empty(0, dtype=np.int64)
+        return self.doublons[file_path]
+
+    def rejets(self) -> Iterator[pd.DataFrame]:
+        """Lignes rejetées de chaque fichier, morceau par morceau, pour la quarantaine."""
+        for file_path, encoding in self.fichiers:
+            doublons = self._doublons(file_path, encoding)
+            for morceau in self._lire(file_path, encoding):
+                _, rejet = _valider_lignes(morceau, self.price_dtype, doublons)
+                rejet['Fichier Source'] = file_path.name
+                yield rejet
+
+    def morceaux(self) -> Iterator[pd.DataFrame]:
+        """Parcourir l'inventaire par morceaux validés et typés (lignes invalides écartées)."""
+        debut = 0
+        for file_path, encoding in self.fichiers:
+            doublons = self._doublons(file_path, encoding)
+            for morceau in self._lire(file_path, encoding):
+                morceau, _ = _valider_lignes(morceau, self.price_dtype, doublons)
+                morceau['Fichier Source'] = file_path.name
+                morceau.index = pd.RangeIndex(debut, debut + len(morceau))
+                debut += len(morceau)
+                yield _compacter(morceau, self.price_dtype)
+
+    def rapport(self) -> pd.DataFrame:
+        """Rapport fusionné depuis les agrégats partiels de chaque morceau."""
+        partiels = []
+        for morceau in self.morceaux():
+            partiels.append(_agreger_partiel(morceau))
+            if len(partiels) >= 64:
+                partiels = [_regrouper_partiels(partiels)]  # Mémoire bornée au nombre de catégories
+        return _fusionner_partiels(partiels)
+
+
+class Profileur:
+    """
+    Instrumentation optionnelle des commandes: durée de chaque commande et de ses phases,
+    lignes en entrée et en sortie, et profil cProfile si demandé.
+    Désactivé, phase() rend toujours le même contexte vide: le coût est celui d'un appel.
+    """
+
+    def __init__(self):
+        self.actif = False
+        self.traces: List[Dict] = []   # Une entrée par commande, avec ses phases imbriquées
+        self._pile: List[Dict] = []
+        self.cprofile: Optional[cProfile.Profile] = None
+
+    def activer(self, cprofile: bool = False) -> None:
+        self.actif = True
+        if cprofile and self.cprofile is None:
+            self.cprofile = cProfile.Profile()
+
+    def desactiver(self) -> None:
+        self.actif = False
+
+    def reinitialiser(self) -> None:
+        self.traces, self._pile = [], []
+        if self.cprofile is not None:
+            self.cprofile = cProfile.Profile()
+
+    def phase(self, nom: str, lignes_entree: Optional[int] = None):
+        """Contexte qui chronomètre une phase, rattachée à la phase englobante."""
+        if not self.actif:
+            return _PHASE_INACTIVE
+        return self._mesurer(nom, lignes_entree)
+
+    @contextlib.contextmanager
+    def _mesurer(self, nom: str, lignes_entree: Optional[int]) -> Iterator[Dict]:
+        entree = {'nom': nom, 'debut': time.time(), 'duree_ms': None,
+                  'lignes_entree': lignes_entree, 'lignes_sortie': None, 'phases': []}
+        (self._pile[-1]['phases'] if self._pile else self.traces).append(entree)
+        self._pile.append(entree)
+        debut = time.perf_counter()
+        profil = self.cprofile if len(self._pile) == 1 else None
+        if profil is not None:
+            profil.enable()
+        try:
+            yield entree
+        finally:
+            if profil is not None:
+                profil.disable()
+            entree['duree_ms'] = (time.perf_counter() - debut) * 1000
+            self._pile.pop()
+
+    def lignes(self, entree: Optional[int] = None, sortie: Optional[int] = None) -> None:
+        """Noter les lignes en entrée et/ou en sortie de la phase en cours."""
+        if not self._pile:
+            return
+        if entree is not None:
+            self._pile[-1]['lignes_entree'] = entree
+        if sortie is not None:
+            self._pile[-1]['lignes_sortie'] = sortie
+
+    def lignes_rapport(self) -> Iterator[str]:
+        """Une ligne par commande et par phase, indentée selon l'imbrication."""
+        def parcourir(entrees: List[Dict], niveau: int) -> Iterator[str]:
+            for e in entrees:
+                colonnes = [f"{'  ' * niveau + e['nom']:30}", f"{e['duree_ms']:10.1f} ms"]
+                if e['lignes_entree'] is not None:
+                    colonnes.append(f"entrée {e['lignes_entree']}")
+                if e['lignes_sortie'] is not None:
+                    colonnes.append(f"sortie {e['lignes_sortie']}")
+                yield "  ".join(colonnes)
+                yield from parcourir(e['phases'], niveau + 1)
+        return parcourir([e for e in self.traces if e['duree_ms'] is not None], 0)
+
+    def exporter_json(self, chemin: str) -> None:
+        _ecrire_atomique(Path(chemin), lambda tmp: tmp.write_text(
+            json.dumps(self.traces, ensure_ascii=False, indent=2), encoding='utf-8'))
+
+    def exporter_pstats(self, chemin: str) -> None:
+        if self.cprofile is None:
+            raise ValueError("Le profil cProfile n'est pas activé (profil on --cprofile).")
+        self.cprofile.dump_stats(chemin)
+
+
+_PHASE_INACTIVE = contextlib.nullcontext()
+
+
+class CacheRequetes:
+    """
+    Cache LRU des résultats de requêtes, borné en octets.
+    Chaque entrée porte la version de l'inventaire qui l'a produite: dès qu'une version
+    plus récente apparaît, les anciennes entrées sont effacées et ne sont jamais servies.
+    Partagé entre threads (lots, serveur); un budget de 0 le désactive.
+    """
+
+    def __init__(self, budget: int = 64 * 1024 ** 2):
+        self.budget = budget
+        self._entrees: OrderedDict = OrderedDict()  # clé -> (résultat, taille en octets)
+        self._version = 0
+        self._verrou = threading.Lock()
+        self.taille = 0
+        self.succes = self.echecs = self.evictions = self.invalidations = 0
+
+    def obtenir(self, cle: tuple, version: int,
+                calculer: Callable[[], Union[pd.DataFrame, np.ndarray]]) -> Union[pd.DataFrame, np.ndarray]:
+        """Résultat en cache pour cette clé et cette version, sinon calculé puis mis en cache."""
+        with self._verrou:
+            if version > self._version:
+                self._invalider(version)
+            entree = self._entrees.get(cle) if version == self._version else None
+            if entree is not None:
+                self._entrees.move_to_end(cle)
+                self.succes += 1
+                return entree[0]
+            self.echecs += 1
+
+        valeur = calculer()
+        if isinstance(valeur, np.ndarray):
+            taille = valeur.nbytes  # Positions des lignes retenues par une recherche
+        else:
+            taille = int(valeur.memory_usage(index=True, deep=True).sum())
+        with self._verrou:
+            # Un résultat d'une version déjà remplacée, ou trop gros, n'est pas gardé
+            if version == self._version and taille <= self.budget and cle not in self._entrees:
+                self._entrees[cle] = (valeur, taille)
+                self.taille += taille
+                self._reduire(self.budget)
+        return valeur
+
+    def _invalider(self, version: int) -> None:
+        if self._entrees:
+            self.invalidations += 1
+        self._entrees.clear()
+        self.taille = 0
+        self._version = version
+
+    def _reduire(self, budget: int) -> None:
+        """Évincer les entrées les moins récemment utilisées jusqu'à tenir dans le budget."""
+        while self.taille > budget:
+            _, (_, taille) = self._entrees.popitem(last=False)
+            self.taille -= taille
+            self.evictions += 1
+
+    def redimensionner(self, budget: int) -> None:
+        with self._verrou:
+            self.budget = budget
+            self._reduire(budget)
+
+    def vider(self) -> None:
+        with self._verrou:
+            self._entrees.clear()
+            self.taille = 0
+            self.succes = self.echecs = self.evictions = self.invalidations = 0
+
+    def statistiques(self) -> Dict[str, object]:
+        with self._verrou:
+            total = self.succes + self.echecs
+            return {'entrées': len(self._entrees), 'taille': _taille_lisible(self.taille),
+                    'budget': _taille_lisible(self.budget), 'succès': self.succes, 'échecs': self.echecs,
+                    'taux de succès': f"{self.succes / total:.0%}" if total else "-",
+                    'évictions': self.evictions, 'invalidations': self.invalidations,
+                    'version': self._version}
+
+
+# Commandes qui ne modifient pas l'inventaire: un lot peut les exécuter en parallèle
+READ_ONLY_COMMANDS = {'afficher', 'chercher', 'chercher_prix', 'chercher_quantite', 'chercher_categorie',
+                      'chercher_plages', 'requete', 'top', 'bas', 'rapport', 'magasins', 'instantanes', 'diff',
+                      'memoire', 'cache', 'aide'}
+ANSI_ESCAPE = re.compile(r'\x1b\[[0-9;]*m')
+
+
+def _lire_requetes(lignes: Iterable[str]) -> Iterator[Dict]:
+    """
+    Lire les requêtes d'un lot: une ligne de commande par ligne, ou un objet JSON
+    {"commande": ..., "arguments": texte ou liste, "id": ...}. Lignes vides et commentaires (#) ignorés.
+    """
+    for numero, ligne in enumerate(lignes, 1):
+        ligne = ligne.strip()
+        if not ligne or ligne.startswith('#'):
+            continue
+        requete = {'ligne': numero}
+        if ligne.startswith('{'):
+            try:
+                objet = json.loads(ligne)
+                arguments = objet.get('arguments', '')
+                if isinstance(arguments, list):
+                    arguments = " ".join(str(a) for a in arguments)
+                requete['commande'] = f"{objet['commande']} {arguments}".strip()
+                if 'id' in objet:
+                    requete['id'] = objet['id']
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                requete['invalide'] = f"Requête JSON invalide: {e}"
+                requete['commande'] = ligne
+        else:
+            requete['commande'] = ligne
+        yield requete
+
+
+class _SortieParThread:
+    """
+    Remplace sys.stdout pendant un lot: un thread qui a un tampon y écrit,
+    les autres écrivent sur la sortie d'origine.
+    """
+
+    def __init__(self, sortie):
+        self.sortie = sortie
+        self.local = threading.local()
+
+    def write(self, texte: str) -> int:
+        return (getattr(self.local, 'tampon', None) or self.sortie).write(texte)
+
+    def flush(self) -> None:
+        (getattr(self.local, 'tampon', None) or self.sortie).flush()
+
+    def __getattr__(self, nom: str):
+        return getattr(self.sortie, nom)
+
+
+class SurveillantDossier:
+    """
+    Surveille les CSV d'un dossier par scrutation (taille et date de modification) dans un thread.
+    Les rafales d'écritures sont regroupées: `rappel` reçoit les fichiers modifiés, avec
+    l'instant de leur première détection, une fois le dossier stable pendant `delai` secondes.
+    `connu` donne l'état de référence {nom: (taille, mtime_ns)}; par défaut, celui du dossier au démarrage.
+    """
+
+    def __init__(self, dossier: Path, rappel: Callable[[Dict[str, float]], None],
+                 intervalle: float = 0.5, delai: float = 1.0,
+                 connu: Optional[Dict[str, Tuple[int, int]]] = None):
+        self.dossier = dossier
+        self.rappel = rappel
+        self.intervalle = intervalle
+        self.delai = delai
+        self.connu = connu
+        self._arret = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _etat_dossier(self) -> Dict[str, Tuple[int, int]]:
+        etat = {}
+        try:
+            with os.scandir(self.dossier) as entrees:
+                for entree in entrees:
+                    if entree.name.endswith('.csv') and entree.is_file():
+                        stat = entree.stat()
+                        etat[entree.name] = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            pass  # Dossier momentanément inaccessible: on réessaie au tour suivant
+        return etat
+
+    def demarrer(self) -> None:
+        if self.connu is None:
+            self.connu = self._etat_dossier()
+        self._thread = threading.Thread(target=self._boucle, name="surveillance", daemon=True)
+        self._thread.start()
+
+    def arreter(self) -> None:
+        self._arret.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    @property
+    def actif(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _boucle(self) -> None:
+        connu = self.connu
+        en_attente: Dict[str, float] = {}
+        dernier_changement = 0.0
+        while not self._arret.wait(self.intervalle):
+            actuel = self._etat_dossier()
+            maintenant = time.monotonic()
+            modifies = {nom for nom in actuel.keys() | connu.keys() if actuel.get(nom) != connu.get(nom)}
+            if modifies:
+                for nom in modifies:
+                    en_attente.setdefault(nom, maintenant)
+                dernier_changement, connu = maintenant, actuel
+            if en_attente and maintenant - dernier_changement >= self.delai:
+                detections, en_attente = en_attente, {}
+                self.rappel(detections)
+
 
 class InventoryManager(Cmd):
     intro = "\nBienvenue dans le Gestionnaire d'Inventaire. Tapez 'aide' ou '?' pour voir les commandes disponibles.\n"
@@ -27,105 +1841,762 @@ class InventoryManager(Cmd):
 
     def __init__(self):
         super().__init__()
-        self.inventory = pd.DataFrame()  # DataFrame vide pour stocker l'inventaire
+        self._etat_courant: Optional[EtatInventaire] = None  # Inventaire vide créé au premier accès
         self.required_columns = ['nom du produit', 'catégorie', 'quantité', 'prix unitaire']
         self.logger = ColorLogger()
+        self.workers = os.cpu_count() or 1  # Nombre de workers pour le chargement
+        self.use_processes = False           # Pool de processus plutôt que de threads
+        self.jobs = 1                        # Processus pour recalculer les agrégats du rapport
+        self.manifest: Dict[str, Dict] = {}  # Taille, mtime et hash de chaque fichier chargé
+        self.manifest_directory: Optional[Path] = None
+        self.use_cache = True                # Instantané disque de l'inventaire validé
+        self.cache_dir: Optional[Path] = None  # None: dossier de cache utilisateur
+        self.price_dtype = 'float64'         # 'float32' divise par deux la mémoire des prix
+        self.csv_engine = 'auto'             # pyarrow s'il est installé, sinon le moteur C de pandas
+        self.quarantine_path: Optional[Path] = None  # None: à côté de l'instantané du dossier
+        self.memory_budget = 256 * 1024 ** 2  # Taille visée d'un morceau en mode hors mémoire
+        self.source_hors_memoire: Optional[SourceHorsMemoire] = None
+        self.output_format = 'table'         # Format par défaut des résultats
+        self.limit: Optional[int] = None     # Pagination par défaut des résultats
+        self.offset = 0
+        self.magasins: Optional[str] = None  # Magasins interrogés par défaut (None: tous)
+        self.export_path: Optional[Path] = None  # Export par défaut des résultats (CLI --exporter)
+        self.snapshots_kept = 24             # Instantanés gardés par dossier (0: aucun)
+        self.par_categorie = False           # Classements top/bas par catégorie par défaut
+        self.alertes: List[str] = []         # Classements vérifiés après chaque chargement
+        self.profileur = Profileur()         # Instrumentation, désactivée par défaut
+        self.cache_requetes = CacheRequetes()  # Résultats des recherches et du rapport, par version
+        self.interactif = True               # False: aucune question posée (mode lot)
+        self.surveillant: Optional[SurveillantDossier] = None
+        self.exports: List[threading.Thread] = []  # Exports lancés en arrière-plan
+        self._verrou_rechargement = threading.Lock()
+
+    @property
+    def inventory(self) -> pd.DataFrame:
+        return self._etat.inventory
+
+    @inventory.setter
+    def inventory(self, data: pd.DataFrame) -> None:
+        # Chaque nouvel inventaire repart avec des index vides
+        self._etat = EtatInventaire(data)
+
+    @property
+    def _etat(self) -> EtatInventaire:
+        if self._etat_courant is None:
+            self._etat_courant = EtatInventaire(pd.DataFrame())
+        return self._etat_courant
+
+    @_etat.setter
+    def _etat(self, etat: EtatInventaire) -> None:
+        self._etat_courant = etat
+
+    def onecmd(self, line: str) -> bool:
+        """Exécuter une commande, chronométrée si le profileur est actif."""
+        if not self.profileur.actif:
+            return super().onecmd(line)
+        commande = self.parseline(line)[0]
+        if not commande or commande == 'profil':
+            return super().onecmd(line)
+        entree = len(self.inventory) if self.source_hors_memoire is None else None
+        with self.profileur.phase(commande, entree):
+            return super().onecmd(line)
+
+    def copie(self) -> 'InventoryManager':
+        """
+        Nouveau gestionnaire avec la même configuration et le même inventaire.
+        Recharger la copie puis la substituer à l'original ne modifie jamais l'état
+        que d'autres threads sont en train de lire.
+        """
+        copie = InventoryManager()
+        for attribut in ('required_columns', 'workers', 'use_processes', 'jobs', 'use_cache', 'cache_dir',
+                         'price_dtype', 'csv_engine', 'quarantine_path', 'memory_budget', 'source_hors_memoire',
+                         'output_format', 'limit', 'offset', 'magasins', 'manifest_directory', 'snapshots_kept',
+                         'par_categorie'):
+            setattr(copie, attribut, getattr(self, attribut))
+        copie._etat = self._etat
+        copie.cache_requetes = self.cache_requetes  # Les versions suffisent à écarter les résultats périmés
+        copie.manifest = {nom: dict(signature) for nom, signature in self.manifest.items()}
+        copie.alertes = list(self.alertes)
+        return copie
+
+    def validate_data(self, data: pd.DataFrame) -> tuple[bool, List[str]]:
+        """valider les datas avec les bonnes colonnes."""
+        missing_columns = _colonnes_manquantes(data, self.required_columns)
+        return len(missing_columns) == 0, missing_columns
+
+    def do_charger(self, arg: str) -> None:
+        """
+        Charger les fichiers CSV du dossier spécifié.
+        Usage: charger <chemin_du_dossier> [--workers N] [--processus] [--incremental] [--no-cache]
+                       [--moteur auto|pyarrow|c] [--quarantaine chemin] [--hors-memoire [--budget 256M]]
+                       [--instantanes N]
+        Lit les fichiers CSV en parallèle (threads, ou processus avec --processus)
+        Vérifie dans chaque worker l'en-tête du fichier, puis ne lit que les colonnes requises avec
+        leurs types déclarés (moteur pyarrow s'il est installé, sinon le moteur C)
+        Valide chaque ligne (nom vide, quantité ou prix manquant, non numérique ou négatif, doublon):
+        les lignes rejetées sont écrites avec leur motif dans un fichier de quarantaine
+        Concatène tous les fichiers valides dans un seul DataFrame
+        Avec --incremental, ne relit que les fichiers nouveaux ou modifiés depuis le dernier chargement
+        Part de l'instantané disque du dossier s'il existe; --no-cache force sa reconstruction
+        L'inventaire est stocké sous forme compacte (catégories, entiers réduits, --type-prix float32)
+        Avec --hors-memoire, les fichiers sont seulement validés puis relus par morceaux à chaque commande
+        Chaque inventaire chargé qui diffère du précédent est gardé comme instantané numéroté (voir `diff`);
+        --instantanes N fixe le nombre d'instantanés conservés (0 pour n'en garder aucun)
+        """
+        try:
+            directory_path, options = _extraire_options(
+                arg, {'workers': True, 'processus': False, 'incremental': False, 'no-cache': False,
+                      'type-prix': True, 'hors-memoire': False, 'budget': True, 'moteur': True,
+                      'quarantaine': True, 'instantanes': True})
+            budget = _parse_taille(options['budget']) if 'budget' in options else self.memory_budget
+            workers = int(options.get('workers', self.workers))
+            if workers < 1:
+                raise ValueError("Le nombre de workers doit être positif.")
+            price_dtype = options.get('type-prix', self.price_dtype)
+            if price_dtype not in PRICE_DTYPES:
+                raise ValueError(f"Type de prix invalide: {price_dtype} (choix: {', '.join(PRICE_DTYPES)}).")
+            moteur = options.get('moteur', self.csv_engine)
+            if moteur not in CSV_ENGINES:
+                raise ValueError(f"Moteur invalide: {moteur} (choix: {', '.join(CSV_ENGINES)}).")
+            if moteur == 'pyarrow' and not PYARROW_DISPONIBLE:
+                raise ValueError("Le moteur pyarrow n'est pas installé (pip install pyarrow).")
+            if 'quarantaine' in options:
+                self.quarantine_path = Path(options['quarantaine'])
+            if 'instantanes' in options:
+                if int(options['instantanes']) < 0:
+                    raise ValueError("Le nombre d'instantanés doit être positif ou nul.")
+                self.snapshots_kept = int(options['instantanes'])
+        except ValueError as e:
+            self.logger.error(str(e))
+            return
+
+        directory_path = directory_path.strip()
+        if not directory_path:
+            self.logger.error("Veuillez spécifier un chemin de dossier.")
+            return
+
+        directory = Path(directory_path)
+        if not directory.is_dir():
+            self.logger.error("Dossier non trouvé.")
+            return
+
+        files = sorted(directory.glob('*.csv'))
+        if options.get('hors-memoire'):
+            self._charger_hors_memoire(directory, files, budget, price_dtype)
+            return
+
+        use_cache = self.use_cache and not options.get('no-cache', False)
+        from_cache = use_cache and self._charger_cache(directory, price_dtype)
+        incremental = from_cache or (options.get('incremental', False)
+                                     and self.manifest_directory == directory.resolve()
+                                     and not self.inventory.empty)
+
+        if incremental:
+            to_read, stale = self._fichiers_modifies(files)
+            if not to_read and not stale:
+                if from_cache:
+                    self.logger.success(f"Inventaire chargé depuis le cache ({len(self.inventory)} ligne(s)).")
+                    self._sauver_instantane(directory, cache_a_jour=True)
+                    self._verifier_alertes()
+                else:
+                    self.logger.info("Aucun changement détecté.")
+                return
+            self.logger.info(f"{len(files) - len(to_read)} fichier(s) inchangé(s), "
+                             f"{len(to_read)} à relire, {len(stale)} supprimé(s).")
+            manifest = dict(self.manifest)
+        else:
+            to_read, stale = files, set()
+            manifest = {}
+
+        start = time.perf_counter()
+        with self.profileur.phase('lecture et validation', len(to_read)):
+            all_data, signatures, partiels_lus, rejets = self._lire_fichiers(
+                to_read, workers, options.get('processus', self.use_processes), price_dtype, moteur)
+            valid_files = len(all_data)
+            total_rows = sum(len(data) for data in all_data)
+            self.profileur.lignes(sortie=total_rows)
+
+        partiels = {}
+        if incremental:
+            # Les fichiers relus mais devenus invalides perdent aussi leurs lignes
+            stale |= {f.name for f in to_read}
+            for name in stale:
+                manifest.pop(name, None)
+            all_data.insert(0, self.inventory[~self.inventory['Fichier Source'].isin(stale)])
+            partiels = {source: partiel for source, partiel in self._etat.partiels_par_fichier(self.jobs).items()
+                        if source not in stale}
+        manifest.update(signatures)
+        partiels.update(partiels_lus)
+
+        if valid_files > 0 or incremental:
+            with self.profileur.phase('concaténation'):
+                inventory = _concatener(all_data)
+                # Les morceaux ne sont plus référencés: seule la concaténation reste en mémoire
+                all_data.clear()
+            with self.profileur.phase('compaction'):
+                self.inventory = _compacter(inventory, price_dtype)
+            self.source_hors_memoire = None
+            # Agrégats du rapport mis à jour fichier par fichier, sans regroupement complet
+            if all(partiel is not None for partiel in partiels.values()):
+                self._etat.partiels = partiels
+            with self.profileur.phase('index'):
+                self._etat.preparer_index()
+            self.manifest = manifest
+            self.manifest_directory = directory.resolve()
+            self._ecrire_quarantaine(directory, rejets.values(), stale if incremental else None)
+            cache_a_jour = False
+            if self.use_cache:
+                with self.profileur.phase('cache'):
+                    cache_a_jour = self._sauver_cache(directory)
+            with self.profileur.phase('instantané'):
+                self._sauver_instantane(directory, cache_a_jour)
+            self.profileur.lignes(sortie=len(self.inventory))
+            elapsed = max(time.perf_counter() - start, 1e-9)
+            self.logger.success(f"{valid_files} fichier(s) chargé(s) avec succès.")
+            self.logger.info(f"{total_rows} ligne(s) en {elapsed:.2f}s "
+                             f"({valid_files / elapsed:.1f} fichiers/s, {total_rows / elapsed:.0f} lignes/s)")
+            self._verifier_alertes()
+        else:
+            self.logger.error("Aucun fichier valide trouvé.")
+
+    def _chemin_quarantaine(self, directory: Path) -> Path:
+        """Fichier de quarantaine du dossier: --quarantaine, sinon à côté de son instantané."""
+        if self.quarantine_path is not None:
+            return self.quarantine_path
+        return self._chemins_cache(directory)[0].parent / "quarantaine.csv"
+
+    def _ecrire_quarantaine(self, directory: Path, rejets: Iterable[pd.DataFrame],
+                            remplaces: Optional[set] = None) -> None:
+        """
+        Écrire les lignes rejetées au chargement (écriture atomique) et afficher leur nombre par motif.
+        Les rejets sont écrits au fur et à mesure, par fichier ou par morceau en mode hors mémoire.
+        En incrémental, les rejets des fichiers qui n'ont été ni relus ni supprimés sont conservés.
+        """
+        path = self._chemin_quarantaine(directory)
+        anciens = []
+        if remplaces is not None and path.exists():
+            try:
+                lus = pd.read_csv(path, dtype=str, keep_default_na=False)
+                lus['ligne'] = lus['ligne'].astype('int64')
+                anciens.append(lus[~lus['Fichier Source'].isin(remplaces)])
+            except Exception as e:
+                self.logger.error(f"Quarantaine illisible, elle sera réécrite: {str(e)}")
+        motifs: Dict[str, int] = {}
+
+        def nouveaux() -> Iterator[pd.DataFrame]:
+            for rejet in rejets:
+                for motif, nombre in rejet['motif'].value_counts().items():
+                    motifs[motif] = motifs.get(motif, 0) + int(nombre)
+                yield rejet
+
+        def ecrire(tmp: Path) -> None:
+            with open(tmp, 'w', encoding='utf-8', newline='') as sortie:
+                for rejet in chain(anciens, nouveaux()):
+                    if not rejet.empty:
+                        rejet.to_csv(sortie, index=False, header=sortie.tell() == 0)
+
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _ecrire_atomique(path, ecrire)
+            if path.stat().st_size == 0:
+                path.unlink()
+                return
+        except Exception as e:
+            self.logger.error(f"Impossible d'écrire la quarantaine: {str(e)}")
+            return
+        if motifs:
+            detail = ', '.join(f"{motif}: {nombre}" for motif, nombre in
+                               sorted(motifs.items(), key=lambda item: -item[1]))
+            self.logger.error(f"{sum(motifs.values())} ligne(s) rejetée(s) ({detail}), "
+                              f"mises en quarantaine dans {path}")
+
+    def _charger_hors_memoire(self, directory: Path, files: List[Path], budget: int, price_dtype: str) -> None:
+        """
+        Valider l'encodage et les colonnes de chaque fichier sans charger les données.
+        Les lignes sont ensuite validées morceau par morceau pour écrire la quarantaine.
+        """
+        fichiers = []
+        for file_path in files:
+            try:
+                encoding = _detecter_encodage(file_path)
+                entete = pd.read_csv(file_path, encoding=encoding, nrows=0)
+                missing_cols = _colonnes_manquantes(entete, self.required_columns)
+                if missing_cols:
+                    self.logger.error(f"Colonnes manquantes dans {file_path.name}: {missing_cols}")
+                else:
+                    fichiers.append((file_path, encoding))
+                    self.logger.success(f"Chargé: {file_path.name}")
+            except Exception as e:
+                self.logger.error(f"Erreur lors du chargement de {file_path.name}: {str(e)}")
+
+        if fichiers:
+            self.source_hors_memoire = SourceHorsMemoire(fichiers, self.required_columns, budget, price_dtype)
+            self.inventory = pd.DataFrame()  # Libère l'inventaire en mémoire éventuel
+            self.manifest, self.manifest_directory = {}, None
+            with self.profileur.phase('validation'):
+                self._ecrire_quarantaine(directory, self.source_hors_memoire.rejets())
+            self.logger.success(f"{len(fichiers)} fichier(s) en mode hors mémoire "
+                                f"(budget de {_taille_lisible(budget)} par morceau).")
+            self._verifier_alertes()
+        else:
+            self.logger.error("Aucun fichier valide trouvé.")
+
+    def _chemins_cache(self, directory: Path) -> Tuple[Path, Path]:
+        """Chemins de l'instantané et de son manifeste pour un dossier de données."""
+        cle = hashlib.blake2b(str(directory.resolve()).encode('utf-8'), digest_size=8).hexdigest()
+        dossier = (self.cache_dir or _dossier_cache_defaut()) / cle
+        extension = 'parquet' if CACHE_FORMAT == 'parquet' else 'pkl'
+        return dossier / f"inventaire.{extension}", dossier / "manifeste.json"
+
+    def _charger_cache(self, directory: Path, price_dtype: str) -> bool:
+        """
+        Charger l'instantané disque du dossier s'il existe et correspond au schéma actuel.
+        Le manifeste de l'instantané sert ensuite à détecter les CSV modifiés depuis.
+        """
+        if self.manifest_directory == directory.resolve() and not self.inventory.empty:
+            return False  # L'inventaire en mémoire est déjà celui de ce dossier
+        snapshot_path, manifest_path = self._chemins_cache(directory)
+        try:
+            with open(manifest_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            # Un cache float32 relu en float64 garderait les prix arrondis
+            if (meta.get('version') != CACHE_VERSION or meta.get('format') != CACHE_FORMAT
+                    or meta.get('colonnes') != self.required_columns or meta.get('type_prix') != price_dtype):
+                return False
+            if CACHE_FORMAT == 'parquet':
+                inventory = pd.read_parquet(snapshot_path, memory_map=True)
+            else:
+                inventory = pd.read_pickle(snapshot_path)
+        except (OSError, ValueError):
+            return False
+        except Exception as e:
+            self.logger.error(f"Cache illisible, reconstruction: {str(e)}")
+            return False
+
+        self.inventory = _compacter(inventory, price_dtype)
+        self.source_hors_memoire = None
+        self._etat.preparer_index()
+        self.manifest = meta['fichiers']
+        self.manifest_directory = directory.resolve()
+        return True
+
+    def _sauver_cache(self, directory: Path) -> bool:
+        """
+        Écrire l'instantané de l'inventaire et son manifeste (écritures atomiques).
+        Retourne True si le fichier de l'instantané correspond maintenant à l'inventaire.
+        """
+        snapshot_path, manifest_path = self._chemins_cache(directory)
+        try:
+            if self.inventory.empty:
+                snapshot_path.unlink(missing_ok=True)
+                manifest_path.unlink(missing_ok=True)
+                return False
+            snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            if CACHE_FORMAT == 'parquet':
+                _ecrire_atomique(snapshot_path, lambda tmp: self.inventory.to_parquet(tmp, index=False))
+            else:
+                _ecrire_atomique(snapshot_path, lambda tmp: self.inventory.to_pickle(tmp))
+            meta = {'version': CACHE_VERSION, 'format': CACHE_FORMAT,
+                    'colonnes': self.required_columns, 'type_prix': str(self.inventory['prix unitaire'].dtype),
+                    'dossier': str(directory.resolve()),
+                    'fichiers': self.manifest}
+            _ecrire_atomique(manifest_path, lambda tmp: tmp.write_text(json.dumps(meta), encoding='utf-8'))
+        except Exception as e:
+            self.logger.error(f"Impossible d'écrire le cache: {str(e)}")
+            return False
+        return True
+
+    def _dossier_instantanes(self, directory: Path) -> Path:
+        """Dossier des instantanés numérotés d'un dossier de données, à côté de son cache."""
+        return self._chemins_cache(directory)[0].parent / "instantanes"
+
+    @staticmethod
+    def _index_instantanes(dossier: Path) -> List[Dict]:
+        """Instantanés connus d'un dossier, du plus ancien au plus récent."""
+        try:
+            with open(dossier / "index.json", encoding='utf-8') as f:
+                return json.load(f)['instantanes']
+        except (OSError, ValueError, KeyError):
+            return []
+
+    def _sauver_instantane(self, directory: Path, cache_a_jour: bool = False) -> None:
+        """
+        Garder l'inventaire chargé comme instantané numéroté, s'il diffère du dernier (hash des fichiers sources).
+        Quand le cache vient d'être écrit au même format, l'instantané en est un lien physique: aucune copie,
+        et le cache remplacé plus tard par renommage ne le modifie pas. Seuls les plus récents sont conservés.
+        """
+        if not self.snapshots_kept or self.inventory.empty:
+            return
+        dossier = self._dossier_instantanes(directory)
+        index = self._index_instantanes(dossier)
+        sources = {nom: signature['hash'] for nom, signature in self.manifest.items()}
+        empreinte = hashlib.blake2b(json.dumps(sources, sort_keys=True).encode('utf-8'), digest_size=16).hexdigest()
+        if index and index[-1]['empreinte'] == empreinte:
+            return
+        numero = index[-1]['numero'] + 1 if index else 1
+        cache_path = self._chemins_cache(directory)[0]
+        path = dossier / f"{numero:06d}{cache_path.suffix}"
+        try:
+            dossier.mkdir(parents=True, exist_ok=True)
+            path.unlink(missing_ok=True)
+            lie = False
+            if cache_a_jour:
+                try:
+                    os.link(cache_path, path)
+                    lie = True
+                except OSError:
+                    pass  # Système de fichiers sans liens physiques: l'instantané est écrit
+            if not lie:
+                if CACHE_FORMAT == 'parquet':
+                    _ecrire_atomique(path, lambda tmp: self.inventory.to_parquet(tmp, index=False))
+                else:
+                    _ecrire_atomique(path, lambda tmp: self.inventory.to_pickle(tmp))
+            index.append({'numero': numero, 'fichier': path.name, 'date': datetime.now().isoformat(timespec='seconds'),
+                          'lignes': len(self.inventory), 'empreinte': empreinte})
+            for ancien in index[:-self.snapshots_kept]:
+                (dossier / ancien['fichier']).unlink(missing_ok=True)
+            index = index[-self.snapshots_kept:]
+            _ecrire_atomique(dossier / "index.json", lambda tmp: tmp.write_text(
+                json.dumps({'instantanes': index}), encoding='utf-8'))
+        except Exception as e:
+            self.logger.error(f"Impossible d'écrire l'instantané: {str(e)}")
+            return
+        self.logger.info(f"Instantané {numero} enregistré ({len(self.inventory)} ligne(s)).")
+
+    def _lire_instantane(self, reference: str) -> Tuple[str, pd.DataFrame]:
+        """
+        Inventaire désigné par une référence de `diff`: numéro d'instantané du dossier chargé,
+        -1 pour le dernier (-2 l'avant-dernier...), `courant` pour l'inventaire en mémoire,
+        ou chemin d'un fichier d'instantané (.parquet ou .pkl).
+        """
+        colonnes = self.required_columns + ['Fichier Source']
+        if reference == 'courant':
+            if self.source_hors_memoire is not None or self.inventory.empty:
+                raise ValueError("Aucun inventaire en mémoire à comparer.")
+            return "inventaire courant", self.inventory
+        try:
+            numero = int(reference)
+        except ValueError:
+            path = Path(reference)
+            if not path.is_file():
+                raise ValueError(f"Instantané introuvable: {reference}")
+        else:
+            if self.manifest_directory is None:
+                raise ValueError("Chargez d'abord un dossier pour désigner ses instantanés par leur numéro.")
+            dossier = self._dossier_instantanes(self.manifest_directory)
+            index = self._index_instantanes(dossier)
+            if numero < 0 and -numero <= len(index):
+                entree = index[numero]
+            else:
+                entree = next((entree for entree in index if entree['numero'] == numero), None)
+            if entree is None:
+                raise ValueError(f"Instantané {reference} introuvable (voir la commande instantanes).")
+            path, reference = dossier / entree['fichier'], f"instantané {entree['numero']} ({entree['date']})"
+        if path.suffix == '.parquet':
+            inventaire = pd.read_parquet(path, columns=colonnes)
+        else:
+            inventaire = pd.read_pickle(path)[colonnes]
+        return reference, _compacter(inventaire)
+
+    def _fichiers_modifies(self, files: List[Path]) -> Tuple[List[Path], set]:
+        """
+        Comparer les fichiers du dossier au manifeste du dernier chargement.
+        Retourne les fichiers nouveaux ou modifiés et les noms des fichiers supprimés.
+        Le hash n'est recalculé que si la taille ou la date de modification a changé.
+        """
+        to_read = []
+        for file_path in files:
+            previous = self.manifest.get(file_path.name)
+            if previous is None:
+                to_read.append(file_path)
+                continue
+            current = _stat_fichier(file_path)
+            if current['taille'] == previous['taille'] and current['mtime'] == previous['mtime']:
+                continue
+            if _hash_fichier(file_path) != previous['hash']:
+                to_read.append(file_path)
+            else:
+                # Contenu identique (fichier simplement touché): on met à jour la date
+                previous.update(current)
+        deleted = set(self.manifest) - {f.name for f in files}
+        return to_read, deleted
+
+    def _lire_fichiers(self, files: List[Path], workers: int, use_processes: bool, price_dtype: str = 'float64',
+                       moteur: str = 'auto') -> Tuple[List[pd.DataFrame], Dict[str, Dict], Dict, Dict]:
+        """
+        Lire et valider les fichiers dans un pool de workers, dans l'ordre.
+        Retourne les DataFrames valides, les entrées du manifeste, les agrégats partiels
+        et les lignes rejetées correspondants.
+        """
+        all_data = []
+        signatures = {}
+        partiels = {}
+        rejets = {}
+
+        pool_class = futures.ProcessPoolExecutor if use_processes else futures.ThreadPoolExecutor
+        with pool_class(max_workers=workers) as pool:
+            taches = _executer_en_ordre(pool, _lire_csv, files, 2 * workers,
+                                        self.required_columns, price_dtype, moteur)
+            for file_path, future in taches:
+                try:
+                    data, missing_cols, signature, partiel, rejet = future.result()
+
+                    if data is not None:
+                        all_data.append(data)
+                        signatures[file_path.name] = signature
+                        partiels[file_path.name] = partiel
+                        rejets[file_path.name] = rejet
+                        self.logger.success(f"Chargé: {file_path.name}")
+                    else:
+                        self.logger.error(f"Colonnes manquantes dans {file_path.name}: {missing_cols}")
+                except Exception as e:
+                    self.logger.error(f"Erreur lors du chargement de {file_path.name}: {str(e)}")
+
+        return all_data, signatures, partiels, rejets
+
+    def _inventaire_vide(self) -> bool:
+        """Vrai si aucune donnée n'est disponible, ni en mémoire ni hors mémoire."""
+        return self.source_hors_memoire is None and (self._etat_courant is None or self.inventory.empty)
+
+    def _resultats(self, filtre: str, *args, magasins: Optional[str] = None,
+                   etat: Optional[EtatInventaire] = None) -> Iterator[Union[pd.DataFrame, Selection]]:
+        """
+        Appliquer un filtre de EtatInventaire (l'état courant par défaut) et rendre les résultats.
+        En mémoire, un seul résultat issu des index (ou du cache des requêtes); avec magasins,
+        seuls les fragments de ces fichiers sont interrogés, en parallèle. Pour une recherche
+        (POSITION_FILTERS), c'est une Selection: seules les positions sont calculées et mises
+        en cache, les lignes ne sont copiées qu'à l'affichage, page par page (voir _paginer).
+        Hors mémoire, un DataFrame par morceau lu, jamais mis en cache car relu depuis les fichiers.
+        """
+        if self.source_hors_memoire is None:
+            etat = self._etat if etat is None else etat  # Figé: la version du cache est celle de l'état interrogé
+            if magasins is None:
+                calculer = (lambda: etat.positions(filtre, *args)) if filtre in POSITION_FILTERS \
+                    else (lambda: getattr(etat, filtre)(*args))
+                resultat = self.cache_requetes.obtenir((filtre, *args), etat.version, calculer)
+            else:
+                noms = etat.choisir_fragments(magasins)
+                resultat = self.cache_requetes.obtenir((filtre, *args, ('magasins', noms)), etat.version,
+                                                       lambda: self._chercher_fragments(etat, noms, filtre, args))
+            yield Selection(etat.inventory, resultat) if isinstance(resultat, np.ndarray) else resultat
+            return
+        if magasins is not None:
+            raise ValueError("--magasins n'est pas disponible en mode hors mémoire.")
+        for morceau in self.source_hors_memoire.morceaux():
+            yield getattr(EtatInventaire(morceau, indexe=False), filtre)(*args)
+
+    def _chercher_fragments(self, etat: EtatInventaire, noms: Tuple[str, ...], filtre: str,
+                            args: tuple) -> Union[pd.DataFrame, np.ndarray]:
+        """
+        Appliquer un filtre à chaque fragment dans un pool de threads, puis fusionner dans l'ordre.
+        Une recherche rend les positions des lignes retenues dans tout l'inventaire.
+        """
+        def chercher(nom: str) -> Union[pd.DataFrame, np.ndarray]:
+            if filtre in POSITION_FILTERS:
+                return etat.positions_fragment(nom, filtre, *args)
+            return getattr(etat.fragment(nom), filtre)(*args)
+
+        if len(noms) == 1:
+            return chercher(noms[0])
+        with futures.ThreadPoolExecutor(max_workers=min(self.workers, len(noms))) as pool:
+            resultats = list(pool.map(chercher, noms))
+        return np.concatenate(resultats) if filtre in POSITION_FILTERS else pd.concat(resultats)
 
-    def validate_data(self, data: pd.DataFrame) -> tuple[bool, List[str]]:
-        """valider les datas avec les bonnes colonnes."""
-        missing_columns = [col for col in self.required_columns if col not in data.columns]
-        return len(missing_columns) == 0, missing_columns
+    def _options_sortie(self, arg: str) -> Tuple[str, Dict]:
+        """Extraire --limit, --offset, --format, --magasins et --exporter d'un argument de commande."""
+        arg, options = _extraire_options(arg, {'limit': True, 'offset': True, 'format': True, 'magasins': True,
+                                               'exporter': True, 'arriere-plan': False})
+        sortie = {
+            'format': options.get('format', self.output_format),
+            'limite': int(options['limit']) if 'limit' in options else self.limit,
+            'decalage': int(options.get('offset', self.offset)),
+            'magasins': options.get('magasins', self.magasins),
+            'export': Path(options['exporter']) if 'exporter' in options else self.export_path,
+            'arriere_plan': options.get('arriere-plan', False),
+        }
+        if sortie['export'] is not None:
+            _format_export(sortie['export'])  # Format invalide signalé avant toute recherche
+        if sortie['format'] not in OUTPUT_FORMATS:
+            raise ValueError(f"Format invalide: {sortie['format']} (choix: {', '.join(OUTPUT_FORMATS)}).")
+        if (sortie['limite'] is not None and sortie['limite'] < 0) or sortie['decalage'] < 0:
+            raise ValueError("--limit et --offset doivent être positifs.")
+        return arg, sortie
 
-    def do_charger(self, directory_path: str) -> None:
+    def _afficher_resultats(self, frames: Iterable[pd.DataFrame], vide: str,
+                            entete: Optional[str] = None, sortie: Optional[Dict] = None) -> int:
         """
-        Charger les fichiers CSV du dossier spécifié.
-        Usage: charger <chemin_du_dossier>
-        Parcourt un dossier pour trouver des fichiers CSV
-        Vérifie que chaque fichier a les colonnes requises
-        Concatène tous les fichiers valides dans un seul DataFrame
+        Afficher les résultats au fur et à mesure qu'ils arrivent, par lots de lignes.
+        L'en-tête n'est affiché qu'avant le premier résultat; sinon le message vide.
+        En CSV et JSONL, seules les données sont écrites, sans couleur.
+        Avec --exporter, les résultats sont écrits dans le fichier au lieu d'être affichés.
+        Retourne le nombre de lignes affichées.
         """
-        directory_path = directory_path.strip()
-        if not directory_path:
-            self.logger.error("Veuillez spécifier un chemin de dossier.")
-            return
+        sortie = sortie or {'format': self.output_format, 'limite': self.limit, 'decalage': self.offset}
+        pages = _paginer(frames, sortie['limite'], sortie['decalage'])
+        if sortie.get('export') is not None:
+            return self._exporter_resultats(pages, sortie['export'], sortie.get('arriere_plan', False))
+        premier = next(pages, None)
+        tableau = sortie['format'] == 'table'
+        if premier is None:
+            if tableau:
+                self.logger.info(vide)
+            return 0
 
-        directory = Path(directory_path)
-        if not directory.is_dir():
-            self.logger.error("Dossier non trouvé.")
-            return
+        if entete and tableau:
+            self.logger.info(entete)
+        total = 0
 
-        all_data = []
-        valid_files = 0
+        def compter(frames_affichees: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+            nonlocal total
+            for frame in frames_affichees:
+                total += len(frame)
+                yield frame
+
+        if tableau:
+            sys.stdout.write("\n")
+        with self.profileur.phase('filtre et rendu'):
+            self.logger.flux(_rendre(compter(chain([premier], pages)), sortie['format']), couleur=tableau)
+        self.profileur.lignes(sortie=total)
+        return total
 
-        for file_path in directory.glob('*.csv'):
+    def _exporter_resultats(self, frames: Iterable[pd.DataFrame], path: Path, arriere_plan: bool = False) -> int:
+        """
+        Exporter des résultats vers un fichier (CSV, CSV compressé, JSONL ou Parquet).
+        En arrière-plan, l'export se poursuit dans un thread et la commande rend la main aussitôt;
+        il n'est pas profilé, la pile de phases du profileur n'appartenant qu'au thread des commandes.
+        """
+        profileur = Profileur() if arriere_plan else self.profileur  # Inactif: aucune trace partagée
+
+        def exporter() -> int:
+            debut = time.perf_counter()
             try:
-                data = pd.read_csv(file_path, encoding="latin1")
-                is_valid, missing_cols = self.validate_data(data)
-
-                if is_valid:
-                    data = data[self.required_columns]
-                    data['Fichier Source'] = file_path.name
-                    all_data.append(data)
-                    valid_files += 1
-                    self.logger.success(f"Chargé: {file_path.name}")
-                else:
-                    self.logger.error(f"Colonnes manquantes dans {file_path.name}: {missing_cols}")
+                with profileur.phase('export'):
+                    lignes = _exporter(frames, path)
+                    profileur.lignes(sortie=lignes)
             except Exception as e:
-                self.logger.error(f"Erreur lors du chargement de {file_path.name}: {str(e)}")
+                self.logger.error(f"Erreur lors de l'export vers {path}: {str(e)}")
+                return 0
+            self.logger.success(f"{lignes} ligne(s) exportée(s) vers {path} en {time.perf_counter() - debut:.2f}s")
+            return lignes
 
-        if valid_files > 0:
-            self.inventory = pd.concat(all_data, ignore_index=True)
-            self.logger.success(f"{valid_files} fichier(s) chargé(s) avec succès.")
-        else:
-            self.logger.error("Aucun fichier valide trouvé.")
+        if not arriere_plan:
+            return exporter()
+        thread = threading.Thread(target=exporter, name=f"export {path.name}")
+        self.exports = [export for export in self.exports if export.is_alive()] + [thread]
+        thread.start()
+        self.logger.info(f"Export vers {path} lancé en arrière-plan.")
+        return 0
 
     def do_afficher(self, arg: str) -> None:
         """
-        Afficher l'inventaire complet.
-        Usage: afficher
+        Afficher l'inventaire complet, par lots de lignes.
+        Usage: afficher [--limit N] [--offset N] [--format table|csv|jsonl] [--magasins M1,M2]
         """
-        if self.inventory.empty:
+        try:
+            _, sortie = self._options_sortie(arg)
+        except ValueError as e:
+            self.logger.error(str(e))
+            return
+
+        if self._inventaire_vide():
             self.logger.error("L'inventaire est vide. Chargez d'abord des données.")
             return
 
-        with pd.option_context('display.max_rows', None,
-                               'display.max_columns', None,
-                               'display.width', None):
-            self.logger.info("\n" + self.inventory.to_string())
+        try:
+            if sortie['magasins'] is not None:
+                if self.source_hors_memoire is not None:
+                    raise ValueError("--magasins n'est pas disponible en mode hors mémoire.")
+                etat = self._etat
+                frames = [etat.fragment(nom).inventory for nom in etat.choisir_fragments(sortie['magasins'])]
+            elif self.source_hors_memoire is not None:
+                frames = self.source_hors_memoire.morceaux()
+            else:
+                frames = [self.inventory]
+        except ValueError as e:
+            self.logger.error(str(e))
+            return
+        self._afficher_resultats(frames, "L'inventaire est vide.", sortie=sortie)
+
+    def _mode_recherche(self, arg: str) -> Tuple[str, str]:
+        """Extraire --litteral ou --regex d'un argument de recherche."""
+        term, options = _extraire_options(arg, {'litteral': False, 'regex': False})
+        if options.get('litteral') and options.get('regex'):
+            raise ValueError("Choisissez --litteral ou --regex, pas les deux.")
+        mode = 'litteral' if options.get('litteral') else 'regex' if options.get('regex') else 'auto'
+        return term, mode
+
+    def filtrer_nom(self, term: str, mode: str = 'auto') -> pd.DataFrame:
+        """
+        Produits dont le nom contient le terme, sans tenir compte de la casse.
+        mode 'auto' traite le terme comme une regex seulement s'il contient des métacaractères.
+        """
+        return self._etat.filtrer_nom(term, mode)
+
+    def filtrer_categorie(self, categorie: str, mode: str = 'auto') -> pd.DataFrame:
+        """
+        Produits dont la catégorie contient le terme.
+        En mode littéral, la comparaison se fait sur les clés normalisées (sans casse ni accents).
+        """
+        return self._etat.filtrer_categorie(categorie, mode)
 
-    def do_chercher(self, term: str) -> None:
+    def do_chercher(self, arg: str) -> None:
         """
         Chercher un produit par nom.
-        Usage: chercher <nom_du_produit>
-        Utiliser pandas pour filtrer les données
+        Usage: chercher <nom_du_produit> [--litteral|--regex] [--limit N] [--offset N] [--format F] [--magasins M]
+        Utilise un index de trigrammes pour réduire les candidats
         Gestion des erreurs avec try/sauf
-        Affichage formaté des résultats
+        Affichage formaté des résultats, par lots
         """
+        try:
+            arg, sortie = self._options_sortie(arg)
+            term, mode = self._mode_recherche(arg)
+        except ValueError as e:
+            self.logger.error(str(e))
+            return
+
         if not term:
             self.logger.error("Veuillez spécifier un terme de recherche.")
             return
 
-        if self.inventory.empty:
+        if self._inventaire_vide():
             self.logger.error("L'inventaire est vide. Chargez d'abord des données.")
             return
 
         try:
-            results = self.inventory[
-                self.inventory['nom du produit'].str.contains(term, case=False, na=False)
-            ]
-            if results.empty:
-                self.logger.info("Aucun produit trouvé.")
-            else:
-                self.logger.info("\n" + results.to_string())
+            resultats = self._resultats('filtrer_nom', term, mode, magasins=sortie['magasins'])
+            self._afficher_resultats(resultats, "Aucun produit trouvé.", sortie=sortie)
         except Exception as e:
             self.logger.error(f"Erreur lors de la recherche: {str(e)}")
 
+    def filtrer_prix(self, prix_min: float, prix_max: float) -> pd.DataFrame:
+        """Produits dont le prix unitaire est dans [prix_min, prix_max], via l'index trié."""
+        return self._etat.filtrer_prix(prix_min, prix_max)
+
+    def filtrer_quantite(self, qte_min: int, qte_max: int) -> pd.DataFrame:
+        """Produits dont la quantité est dans [qte_min, qte_max], via l'index trié."""
+        return self._etat.filtrer_quantite(qte_min, qte_max)
+
+    def filtrer_plages(self, prix_min: float, prix_max: float, qte_min: int, qte_max: int,
+                       categorie: Optional[str] = None) -> pd.DataFrame:
+        """Produits filtrés à la fois par prix, quantité et (optionnellement) catégorie."""
+        return self._etat.filtrer_plages(prix_min, prix_max, qte_min, qte_max, categorie)
+
+    def filtrer_requete(self, criteres: Tuple[Tuple[str, tuple], ...]) -> pd.DataFrame:
+        """Produits qui vérifient tous les critères, évalués du plus sélectif au moins sélectif."""
+        return self._etat.filtrer_requete(criteres)
+
     def do_chercher_prix(self, arg: str) -> None:
         """
         Chercher des produits par intervalle de prix.
-        Usage: chercher_prix <prix_min> <prix_max>
+        Usage: chercher_prix <prix_min> <prix_max> [--limit N] [--offset N] [--format F] [--magasins M]
         """
-        if self.inventory.empty:
+        try:
+            arg, sortie = self._options_sortie(arg)
+        except ValueError as e:
+            self.logger.error(str(e))
+            return
+
+        if self._inventaire_vide():
             self.logger.error("L'inventaire est vide. Chargez d'abord des données.")
             return
 
@@ -136,16 +2607,10 @@ class InventoryManager(Cmd):
                 return
 
             prix_min, prix_max = float(args[0]), float(args[1])
-            results = self.inventory[
-                (self.inventory['prix unitaire'] >= prix_min) &
-                (self.inventory['prix unitaire'] <= prix_max)
-            ]
-
-            if results.empty:
-                self.logger.info(f"Aucun produit trouvé entre {prix_min}€ et {prix_max}€.")
-            else:
-                self.logger.info(f"\nProduits entre {prix_min}€ et {prix_max}€:")
-                self.logger.info("\n" + results.to_string())
+            resultats = self._resultats('filtrer_prix', prix_min, prix_max, magasins=sortie['magasins'])
+            self._afficher_resultats(resultats,
+                                     f"Aucun produit trouvé entre {prix_min}€ et {prix_max}€.",
+                                     f"\nProduits entre {prix_min}€ et {prix_max}€:", sortie)
 
         except ValueError:
             self.logger.error("Les prix doivent être des nombres valides.")
@@ -155,9 +2620,15 @@ class InventoryManager(Cmd):
     def do_chercher_quantite(self, arg: str) -> None:
         """
         Chercher des produits par intervalle de quantité.
-        Usage: chercher_quantite <quantite_min> <quantite_max>
+        Usage: chercher_quantite <quantite_min> <quantite_max> [--limit N] [--offset N] [--format F] [--magasins M]
         """
-        if self.inventory.empty:
+        try:
+            arg, sortie = self._options_sortie(arg)
+        except ValueError as e:
+            self.logger.error(str(e))
+            return
+
+        if self._inventaire_vide():
             self.logger.error("L'inventaire est vide. Chargez d'abord des données.")
             return
 
@@ -168,84 +2639,743 @@ class InventoryManager(Cmd):
                 return
 
             qte_min, qte_max = int(args[0]), int(args[1])
-            results = self.inventory[
-                (self.inventory['quantité'] >= qte_min) &
-                (self.inventory['quantité'] <= qte_max)
-            ]
-
-            if results.empty:
-                self.logger.info(f"Aucun produit trouvé avec une quantité entre {qte_min} et {qte_max}.")
-            else:
-                self.logger.info(f"\nProduits avec quantité entre {qte_min} et {qte_max}:")
-                self.logger.info("\n" + results.to_string())
+            resultats = self._resultats('filtrer_quantite', qte_min, qte_max, magasins=sortie['magasins'])
+            self._afficher_resultats(resultats,
+                                     f"Aucun produit trouvé avec une quantité entre {qte_min} et {qte_max}.",
+                                     f"\nProduits avec quantité entre {qte_min} et {qte_max}:", sortie)
 
         except ValueError:
             self.logger.error("Les quantités doivent être des nombres entiers valides.")
         except Exception as e:
             self.logger.error(f"Erreur lors de la recherche: {str(e)}")
 
-    def do_chercher_categorie(self, categorie: str) -> None:
+    def do_chercher_plages(self, arg: str) -> None:
+        """
+        Chercher des produits par prix, quantité et catégorie en une seule passe.
+        Usage: chercher_plages <prix_min> <prix_max> <quantite_min> <quantite_max> [categorie]
+                               [--limit N] [--offset N] [--format F] [--magasins M]
+        """
+        try:
+            arg, sortie = self._options_sortie(arg)
+        except ValueError as e:
+            self.logger.error(str(e))
+            return
+
+        if self._inventaire_vide():
+            self.logger.error("L'inventaire est vide. Chargez d'abord des données.")
+            return
+
+        try:
+            args = arg.split(maxsplit=4)
+            if len(args) < 4:
+                self.logger.error("Usage: chercher_plages <prix_min> <prix_max> <quantite_min> <quantite_max> [categorie]")
+                return
+
+            prix_min, prix_max = float(args[0]), float(args[1])
+            qte_min, qte_max = int(args[2]), int(args[3])
+            categorie = args[4] if len(args) > 4 else None
+            resultats = self._resultats('filtrer_plages', prix_min, prix_max, qte_min, qte_max, categorie,
+                                        magasins=sortie['magasins'])
+            self._afficher_resultats(
+                resultats,
+                "Aucun produit trouvé pour ces critères.",
+                f"\nProduits entre {prix_min}€ et {prix_max}€, quantité entre {qte_min} et {qte_max}"
+                + (f", catégorie '{categorie}':" if categorie else ":"), sortie)
+
+        except ValueError:
+            self.logger.error("Les prix doivent être des nombres et les quantités des entiers valides.")
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la recherche: {str(e)}")
+
+    def do_chercher_categorie(self, arg: str) -> None:
         """
         Chercher des produits par catégorie.
-        Usage: chercher_categorie <nom_categorie>
+        Usage: chercher_categorie <nom_categorie> [--litteral|--regex]
+                                  [--limit N] [--offset N] [--format F] [--magasins M]
         """
+        try:
+            arg, sortie = self._options_sortie(arg)
+            categorie, mode = self._mode_recherche(arg)
+        except ValueError as e:
+            self.logger.error(str(e))
+            return
+
         if not categorie:
             self.logger.error("Veuillez spécifier une catégorie.")
             return
 
-        if self.inventory.empty:
+        if self._inventaire_vide():
             self.logger.error("L'inventaire est vide. Chargez d'abord des données.")
             return
 
         try:
-            results = self.inventory[
-                self.inventory['catégorie'].str.contains(categorie, case=False, na=False)
-            ]
-            if results.empty:
-                self.logger.info(f"Aucun produit trouvé dans la catégorie '{categorie}'.")
-            else:
-                self.logger.info(f"\nProduits de la catégorie '{categorie}':")
-                self.logger.info("\n" + results.to_string())
+            resultats = self._resultats('filtrer_categorie', categorie, mode, magasins=sortie['magasins'])
+            self._afficher_resultats(resultats,
+                                     f"Aucun produit trouvé dans la catégorie '{categorie}'.",
+                                     f"\nProduits de la catégorie '{categorie}':", sortie)
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la recherche: {str(e)}")
+
+    def do_requete(self, arg: str) -> None:
+        """
+        Chercher des produits selon plusieurs critères combinés, en une seule passe.
+        Usage: requete [nom=..] [categorie=..] [prix=min..max] [quantite=min..max] [--litteral|--regex]
+                       [--expliquer] [--limit N] [--offset N] [--format F] [--magasins M]
+        Les bornes d'un intervalle peuvent être omises (prix=10.., quantite=..5)
+        Le critère le plus sélectif (index triés, trigrammes) est appliqué en premier,
+        les autres seulement sur les lignes restantes; --expliquer affiche ce plan
+        """
+        try:
+            arg, sortie = self._options_sortie(arg)
+            arg, options = _extraire_options(arg, {'expliquer': False})
+            texte, mode = self._mode_recherche(arg)
+            criteres = _analyser_requete(texte, mode)
+        except ValueError as e:
+            self.logger.error(str(e))
+            return
+
+        if self._inventaire_vide():
+            self.logger.error("L'inventaire est vide. Chargez d'abord des données.")
+            return
+
+        try:
+            if options.get('expliquer') and self.source_hors_memoire is None:
+                plan = self._etat.plan_requete(criteres)
+                self.logger.info("Plan: " + " -> ".join(
+                    f"{champ} (~{estimation} ligne(s))" if estimation is not None
+                    else f"{champ} (sur les lignes restantes)" for champ, estimation in plan))
+            resultats = self._resultats('filtrer_requete', criteres, magasins=sortie['magasins'])
+            self._afficher_resultats(resultats,
+                                     "Aucun produit trouvé pour ces critères.",
+                                     f"\nProduits pour la requête '{texte.strip()}':", sortie)
         except Exception as e:
             self.logger.error(f"Erreur lors de la recherche: {str(e)}")
 
+    def _options_classement(self, arg: str) -> Tuple[Tuple[str, int, bool, Optional[float]], Dict]:
+        """Extraire le critère, le nombre, --par-categorie, --seuil et les options de sortie d'un classement."""
+        arg, sortie = self._options_sortie(arg)
+        arg, options = _extraire_options(arg, {'par-categorie': False, 'seuil': True})
+        critere, nombre = _analyser_classement(arg)
+        try:
+            seuil = float(options['seuil']) if 'seuil' in options else None
+        except ValueError:
+            raise ValueError(f"Seuil invalide: {options['seuil']}") from None
+        return (critere, nombre, bool(options.get('par-categorie', self.par_categorie)), seuil), sortie
+
+    def _classement(self, classement: Tuple[str, int, bool, Optional[float]], plus_grands: bool,
+                    magasins: Optional[str] = None, etat: Optional[EtatInventaire] = None) -> pd.DataFrame:
+        """
+        Classer l'inventaire (voir EtatInventaire.classer). Le classement de chaque morceau lu
+        hors mémoire, ou de chaque magasin, est fusionné au fur et à mesure en le reclassant:
+        seules les lignes retenues restent en mémoire.
+        """
+        retenus = None
+        for resultat in self._resultats('classer', classement[0], classement[1], plus_grands, *classement[2:],
+                                        magasins=magasins, etat=etat):
+            retenus = resultat if retenus is None else _classer(pd.concat([retenus, resultat]), classement[0],
+                                                                 classement[1], plus_grands, *classement[2:])
+        if retenus is None:
+            return pd.DataFrame()
+        if magasins is None:
+            return retenus
+        # Les classements des magasins sont concaténés: un dernier classement les départage
+        return _classer(retenus, classement[0], classement[1], plus_grands, *classement[2:])
+
+    def _afficher_classement(self, arg: str, plus_grands: bool) -> None:
+        """Commun à top et bas."""
+        try:
+            classement, sortie = self._options_classement(arg)
+        except ValueError as e:
+            self.logger.error(str(e))
+            return
+
+        if self._inventaire_vide():
+            self.logger.error("L'inventaire est vide. Chargez d'abord des données.")
+            return
+
+        critere, nombre, par_categorie, seuil = classement
+        entete = (f"\n{'Les plus grandes' if plus_grands else 'Les plus petites'} valeurs de "
+                  f"'{RANKING_CRITERIA[critere]}' ({nombre}{' par catégorie' if par_categorie else ''}):")
+        try:
+            resultat = self._classement(classement, plus_grands, sortie['magasins'])
+            self._afficher_resultats([resultat], "Aucun produit ne respecte le seuil.", entete, sortie)
+        except Exception as e:
+            self.logger.error(f"Erreur lors du classement: {str(e)}")
+
+    def do_top(self, arg: str) -> None:
+        """
+        Afficher les produits de plus grande quantité, de plus grand prix ou de plus grande valeur de stock.
+        Usage: top <quantite|prix|valeur> [N] [--par-categorie] [--seuil X] [--limit N] [--offset N]
+                   [--format F] [--magasins M] [--exporter chemin]
+        N vaut 10 par défaut; avec --par-categorie, N produits par catégorie
+        Avec --seuil, seuls les produits dont la valeur est au moins égale au seuil sont classés
+        Sélection partielle (np.partition): seules les lignes retenues sont triées
+        """
+        self._afficher_classement(arg, plus_grands=True)
+
+    def do_bas(self, arg: str) -> None:
+        """
+        Afficher les produits de plus petite quantité, de plus petit prix ou de plus petite valeur de stock.
+        Usage: bas <quantite|prix|valeur> [N] [--par-categorie] [--seuil X] [--limit N] [--offset N]
+                   [--format F] [--magasins M] [--exporter chemin]
+        N vaut 10 par défaut; avec --par-categorie, N produits par catégorie
+        Avec --seuil, seuls les produits dont la valeur est au plus égale au seuil sont classés
+        (bas quantite 50 --seuil 5: les 50 produits les moins en stock parmi ceux à 5 unités ou moins)
+        """
+        self._afficher_classement(arg, plus_grands=False)
+
+    def do_alerte(self, arg: str) -> None:
+        """
+        Gérer les alertes vérifiées après chaque chargement ou rechargement.
+        Usage: alerte | alerte top|bas <quantite|prix|valeur> [N] [--par-categorie] [--seuil X] | alerte off
+        Une alerte est un classement top ou bas, généralement avec --seuil: si des produits
+        le respectent après un chargement, ils sont affichés sous le message d'alerte
+        """
+        commande, _, reste = arg.strip().partition(' ')
+        if not commande:
+            if not self.alertes:
+                self.logger.info("Aucune alerte définie.")
+            for alerte in self.alertes:
+                self.logger.info(alerte)
+            return
+        if commande == 'off':
+            self.alertes = []
+            self.logger.success("Alertes supprimées.")
+            return
+        if commande not in ('top', 'bas'):
+            self.logger.error("Usage: alerte top|bas <critère> [N] [--par-categorie] [--seuil X] | alerte off")
+            return
+        try:
+            self._options_classement(reste)
+        except ValueError as e:
+            self.logger.error(str(e))
+            return
+        self.alertes.append(f"{commande} {' '.join(reste.split())}")
+        self.logger.success(f"Alerte ajoutée: {self.alertes[-1]}")
+
+    def _verifier_alertes(self) -> None:
+        """Évaluer les alertes sur l'inventaire qui vient d'être chargé et afficher celles qui se déclenchent."""
+        for alerte in self.alertes:
+            commande, _, reste = alerte.partition(' ')
+            try:
+                classement, sortie = self._options_classement(reste)
+                resultat = self._classement(classement, commande == 'top', sortie['magasins'])
+            except Exception as e:
+                self.logger.error(f"Alerte '{alerte}' impossible à évaluer: {str(e)}")
+                continue
+            if not resultat.empty:
+                self.logger.error(f"Alerte '{alerte}': {len(resultat)} produit(s)")
+                self._afficher_resultats([resultat], "", sortie=sortie)
+
     def do_rapport(self, export_path: Optional[str] = None) -> None:
         """
         Générer un rapport d'inventaire avec option d'export.
-        Usage: rapport [chemin_fichier]
+        Usage: rapport [chemin_fichier] [--verifier] [--format table|csv|jsonl] [--jobs N] [--magasins M1,M2]
+        Le chemin d'export choisit le format: .csv, .csv.gz, .csv.zst, .jsonl ou .parquet
+        Le rapport est fusionné depuis les agrégats maintenus au chargement, par fichier
+        (--magasins ne fusionne que ceux des fichiers choisis; hors mémoire, les agrégats de chaque morceau lu)
+        S'ils manquent (inventaire lu depuis le cache), --jobs N les calcule sur N processus
+        --verifier le recalcule entièrement et compare les deux
         """
-        if self.inventory.empty:
+        if self._inventaire_vide():
             self.logger.error("L'inventaire est vide. Chargez d'abord des données.")
             return
 
         try:
-            report = self.inventory.groupby('catégorie').agg({
-                'quantité': ['sum', 'mean', 'count'],
-                'prix unitaire': ['mean', 'min', 'max']
-            }).round(2)
+            export_path, options = _extraire_options(export_path or "", {'verifier': False, 'format': True,
+                                                                         'jobs': True, 'magasins': True})
+            export_path = export_path.strip() or None
+            format_sortie = options.get('format', self.output_format)
+            if format_sortie not in OUTPUT_FORMATS:
+                raise ValueError(f"Format invalide: {format_sortie} (choix: {', '.join(OUTPUT_FORMATS)}).")
+            jobs = int(options.get('jobs', self.jobs))
+            if jobs < 1:
+                raise ValueError("Le nombre de jobs doit être positif.")
 
-            report.columns = [f"{col[0]}_{col[1]}" for col in report.columns]
+            etat = self._etat
+            with self.profileur.phase('agrégation'):
+                report = self._donnees_rapport(etat, jobs, options.get('magasins', self.magasins))
+            self.profileur.lignes(sortie=len(report))
 
-            self.logger.info("\n=== Rapport Récapitulatif ===")
-            self.logger.info("\n" + report.to_string())
+            with self.profileur.phase('rendu', len(report)):
+                if format_sortie == 'table':
+                    self.logger.info("\n=== Rapport Récapitulatif ===")
+                    self.logger.info("\n" + report.to_string())
+                else:
+                    self.logger.flux(_rendre([report.reset_index()], format_sortie), couleur=False)
+
+            if options.get('verifier'):
+                if options.get('magasins', self.magasins) is not None:
+                    self.logger.error("La vérification porte sur tout l'inventaire: retirez --magasins.")
+                elif self.source_hors_memoire is not None:
+                    self.logger.error("La vérification n'est pas disponible en mode hors mémoire.")
+                else:
+                    with self.profileur.phase('vérification'):
+                        self._verifier_rapport(etat)
 
             if export_path:
-                report.to_csv(export_path)
+                with self.profileur.phase('export', len(report)):
+                    _exporter([report.reset_index()], Path(export_path))
                 self.logger.success(f"Rapport exporté vers {export_path}")
-            else:
+            elif self.interactif:
                 if input("Voulez-vous exporter ce rapport (o/n)? ").lower() == 'o':
                     path = input("Chemin du fichier d'export: ")
-                    report.to_csv(path)
+                    _exporter([report.reset_index()], Path(path))
                     self.logger.success(f"Rapport exporté vers {path}")
 
         except Exception as e:
             self.logger.error(f"Erreur lors de la génération du rapport: {str(e)}")
 
+    def _donnees_rapport(self, etat: EtatInventaire, jobs: Optional[int] = None,
+                         magasins: Optional[str] = None) -> pd.DataFrame:
+        """Rapport arrondi de l'inventaire (ou de quelques magasins), en mémoire ou lu par morceaux."""
+        if self.source_hors_memoire is not None:
+            if magasins is not None:
+                raise ValueError("--magasins n'est pas disponible en mode hors mémoire.")
+            return self.source_hors_memoire.rapport().round(2)
+        jobs = jobs or self.jobs
+        if magasins is None:
+            return self.cache_requetes.obtenir(('rapport',), etat.version, lambda: etat.rapport(jobs).round(2))
+        noms = etat.choisir_fragments(magasins)
+        return self.cache_requetes.obtenir(('rapport', ('magasins', noms)), etat.version,
+                                           lambda: etat.rapport_fragments(noms, jobs).round(2))
+
+    def _verifier_rapport(self, etat: EtatInventaire) -> None:
+        """Comparer le rapport maintenu au rapport recalculé par un groupby complet."""
+        attendu, obtenu = etat.rapport_complet(), etat.rapport()
+        if not attendu.index.equals(obtenu.index):
+            self.logger.error("Vérification: les catégories diffèrent du recalcul complet.")
+            return
+        differences = [
+            f"{categorie} / {col}: {obtenu.at[categorie, col]} au lieu de {attendu.at[categorie, col]}"
+            for col in REPORT_COLUMNS
+            for categorie, ok in zip(attendu.index, np.isclose(
+                obtenu[col].astype(float), attendu[col].astype(float), rtol=1e-9, equal_nan=True))
+            if not ok
+        ]
+        if differences:
+            self.logger.error("Vérification: différences avec le recalcul complet:")
+            for difference in differences:
+                self.logger.error(f"  {difference}")
+        else:
+            self.logger.success("Vérification: rapport identique au recalcul complet.")
+
+    def do_magasins(self, arg: str) -> None:
+        """
+        Lister les fragments de l'inventaire (un par fichier source) et leur nombre de lignes.
+        Usage: magasins
+        Leurs noms (avec ou sans .csv) s'utilisent avec --magasins pour limiter une recherche ou le rapport
+        """
+        if self.source_hors_memoire is not None:
+            self.logger.error("L'inventaire est lu par morceaux (mode hors mémoire).")
+            return
+        blocs = self._etat.blocs()
+        if not blocs:
+            self.logger.error("L'inventaire est vide. Chargez d'abord des données.")
+            return
+        self.logger.info("\n=== Magasins ===")
+        for nom, tranches in blocs.items():
+            self.logger.info(f"{nom:30} : {sum(fin - debut for debut, fin in tranches)} ligne(s)")
+
+    def do_instantanes(self, arg: str) -> None:
+        """
+        Lister les instantanés du dossier chargé, du plus ancien au plus récent.
+        Usage: instantanes
+        """
+        if self.manifest_directory is None:
+            self.logger.error("Chargez d'abord un dossier.")
+            return
+        dossier = self._dossier_instantanes(self.manifest_directory)
+        index = self._index_instantanes(dossier)
+        if not index:
+            self.logger.info("Aucun instantané pour ce dossier.")
+            return
+        self.logger.info(f"\n=== Instantanés de {self.manifest_directory} ===")
+        for entree in index:
+            path = dossier / entree['fichier']
+            taille = _taille_lisible(path.stat().st_size) if path.exists() else "absent"
+            self.logger.info(f"{entree['numero']:6d} : {entree['date']}  {entree['lignes']} ligne(s), {taille}")
+
+    def do_diff(self, arg: str) -> None:
+        """
+        Comparer deux instantanés de l'inventaire: produits ajoutés, supprimés et modifiés.
+        Usage: diff <A> <B> [--statut modifié,ajouté,supprimé] [--limit N] [--offset N]
+                            [--format table|csv|jsonl] [--exporter chemin]
+        A et B: numéro d'instantané (voir `instantanes`), -1 pour le dernier, -2 pour l'avant-dernier...,
+        `courant` pour l'inventaire en mémoire, ou chemin d'un fichier d'instantané
+        Les produits sont appariés sur (nom du produit, Fichier Source) par une jointure par hachage;
+        chaque écart est donné avec les quantités et prix avant et après
+        """
+        try:
+            arg, options = _extraire_options(arg, {'statut': True})
+            arg, sortie = self._options_sortie(arg)
+            references = arg.split()
+            if len(references) != 2:
+                raise ValueError("Usage: diff <A> <B> (numéros d'instantanés, -1, courant ou chemins).")
+            statuts = DIFF_STATUTS
+            if 'statut' in options:
+                demandes = {_replier(statut) for statut in options['statut'].split(',') if statut}
+                statuts = tuple(statut for statut in DIFF_STATUTS if _replier(statut) in demandes)
+                if len(statuts) != len(demandes):
+                    raise ValueError(f"Statut invalide: {options['statut']} (choix: {', '.join(DIFF_STATUTS)}).")
+            (nom_avant, avant), (nom_apres, apres) = (self._lire_instantane(reference) for reference in references)
+            with self.profileur.phase('comparaison', len(avant) + len(apres)):
+                ecarts = _comparer_inventaires(avant, apres)
+                self.profileur.lignes(sortie=len(ecarts))
+        except ValueError as e:
+            self.logger.error(str(e))
+            return
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la comparaison: {str(e)}")
+            return
+
+        comptes = ecarts['statut'].value_counts()
+        resume = ", ".join(f"{comptes.get(statut, 0)} {statut}(s)" for statut in DIFF_STATUTS)
+        if len(statuts) < len(DIFF_STATUTS):
+            ecarts = ecarts[ecarts['statut'].isin(statuts)]
+        if sortie['format'] == 'table' or sortie['export'] is not None:
+            self.logger.info(f"\n{nom_avant} -> {nom_apres} : {resume}")
+        self._afficher_resultats([ecarts], "Aucune différence.", sortie=sortie)
+
+    def do_memoire(self, arg: str) -> None:
+        """
+        Afficher la mémoire utilisée par colonne, avant et après compaction.
+        Usage: memoire
+        """
+        if self.source_hors_memoire is not None:
+            self.logger.error("L'inventaire est lu par morceaux (mode hors mémoire).")
+            return
+
+        if self.inventory.empty:
+            self.logger.error("L'inventaire est vide. Chargez d'abord des données.")
+            return
+
+        rows = []
+        # Une colonne à la fois pour ne jamais dupliquer tout l'inventaire
+        for col in self.inventory.columns:
+            serie = self.inventory[col]
+            brut = _dtype_brut(serie)
+            rows.append({
+                'colonne': col,
+                'type brut': str(brut),
+                'mémoire brute': serie.astype(brut).memory_usage(index=False, deep=True),
+                'type': str(serie.dtype),
+                'mémoire': serie.memory_usage(index=False, deep=True),
+            })
+        report = pd.DataFrame(rows).set_index('colonne')
+        total_brut, total = report['mémoire brute'].sum(), report['mémoire'].sum()
+        report['gain'] = (1 - report['mémoire'] / report['mémoire brute'].where(report['mémoire brute'] > 0)).map(
+            lambda gain: f"{gain:.0%}" if pd.notna(gain) else "-")
+        for col in ('mémoire brute', 'mémoire'):
+            report[col] = report[col].map(_taille_lisible)
+
+        self.logger.info("\n=== Mémoire de l'inventaire ===")
+        self.logger.info("\n" + report.to_string())
+        self.logger.info(f"Total: {_taille_lisible(total_brut)} -> {_taille_lisible(total)} "
+                         f"({len(self.inventory)} ligne(s))")
+
+    def do_profil(self, arg: str) -> None:
+        """
+        Mesurer la durée des commandes et de leurs phases.
+        Usage: profil on [--cprofile] | off | rapport | reset | json <chemin> | pstats <chemin>
+        on active le chronométrage des commandes suivantes (--cprofile ajoute un profil détaillé)
+        rapport affiche les durées et les lignes en entrée et en sortie
+        json écrit la trace complète, pstats le profil cProfile (lisible avec le module pstats)
+        """
+        action, options = _extraire_options(arg, {'cprofile': False})
+        action, _, chemin = action.strip().partition(" ")
+        chemin = chemin.strip()
+        try:
+            if action == 'on':
+                self.profileur.activer(options.get('cprofile', False))
+                self.logger.success("Profilage activé.")
+            elif action == 'off':
+                self.profileur.desactiver()
+                self.logger.success("Profilage désactivé.")
+            elif action == 'reset':
+                self.profileur.reinitialiser()
+                self.logger.success("Mesures effacées.")
+            elif action == 'rapport':
+                if not self.profileur.traces:
+                    self.logger.info("Aucune commande mesurée.")
+                    return
+                self.logger.info("\n=== Profil des commandes ===")
+                self.logger.flux(self.profileur.lignes_rapport())
+            elif action in ('json', 'pstats') and chemin:
+                if action == 'json':
+                    self.profileur.exporter_json(chemin)
+                else:
+                    self.profileur.exporter_pstats(chemin)
+                self.logger.success(f"Profil exporté vers {chemin}")
+            else:
+                self.logger.error("Usage: profil on [--cprofile] | off | rapport | reset | json <chemin> | pstats <chemin>")
+        except (OSError, ValueError) as e:
+            self.logger.error(str(e))
+
+    def do_cache(self, arg: str) -> None:
+        """
+        Cache des résultats de recherche et du rapport.
+        Usage: cache [stats] | vider | budget <taille>
+        stats affiche les succès, échecs, évictions et la mémoire utilisée
+        budget fixe la taille maximale (ex: 64M, 0 pour désactiver le cache)
+        """
+        action, _, valeur = arg.strip().partition(" ")
+        try:
+            if action in ('', 'stats'):
+                self.logger.info("\n=== Cache des requêtes ===")
+                for nom, stat in self.cache_requetes.statistiques().items():
+                    self.logger.info(f"{nom:16} : {stat}")
+            elif action == 'vider':
+                self.cache_requetes.vider()
+                self.logger.success("Cache des requêtes vidé.")
+            elif action == 'budget' and valeur.strip():
+                self.cache_requetes.redimensionner(_parse_taille(valeur, zero_autorise=True))
+                self.logger.success(f"Budget du cache: {_taille_lisible(self.cache_requetes.budget)}")
+            else:
+                self.logger.error("Usage: cache [stats] | vider | budget <taille>")
+        except ValueError as e:
+            self.logger.error(str(e))
+
+    def _executer_requete(self, requete: Dict, sortie: _SortieParThread) -> Dict:
+        """Exécuter une requête d'un lot en capturant sa sortie, et la décrire en un objet JSON."""
+        resultat = {k: requete[k] for k in ('ligne', 'id') if k in requete}
+        resultat.update(commande=requete['commande'], resultats=[], messages=[], erreurs=[])
+        if 'invalide' in requete:
+            resultat.update(erreurs=[requete['invalide']], duree_ms=0.0, ok=False)
+            return resultat
+
+        tampon = StringIO()
+        sortie.local.tampon = tampon
+        debut = time.perf_counter()
+        try:
+            resultat['arret'] = bool(self.onecmd(requete['commande']))
+        except Exception as e:
+            resultat['erreurs'].append(f"Erreur lors de l'exécution: {str(e)}")
+        finally:
+            sortie.local.tampon = None
+        resultat['duree_ms'] = round((time.perf_counter() - debut) * 1000, 3)
+
+        for ligne in tampon.getvalue().splitlines():
+            texte = ANSI_ESCAPE.sub('', ligne).strip()
+            if not texte:
+                continue
+            if ligne.startswith(colorama.Fore.RED):
+                resultat['erreurs'].append(texte)
+            elif texte.startswith('{'):
+                try:
+                    resultat['resultats'].append(json.loads(texte))
+                except ValueError:
+                    resultat['messages'].append(texte)
+            else:
+                resultat['messages'].append(texte)
+        resultat['ok'] = not resultat['erreurs']
+        return resultat
+
+    def executer_lot(self, lignes: Iterable[str], destination, concurrence: int = 1) -> int:
+        """
+        Exécuter un lot de requêtes sur cet inventaire et écrire un objet JSON par requête, dans l'ordre.
+        Les requêtes en lecture seule consécutives s'exécutent sur `concurrence` threads;
+        les autres commandes (charger...) attendent la fin des précédentes et passent seules.
+        Retourne le nombre de requêtes en erreur.
+        """
+        if self.profileur.actif:
+            concurrence = 1  # Les mesures du profileur supposent une commande à la fois
+        sortie = _SortieParThread(sys.stdout)
+        etat_precedent = (self.output_format, self.interactif)
+        self.output_format, self.interactif = 'jsonl', False
+        erreurs = 0
+
+        def ecrire(resultat: Dict) -> bool:
+            nonlocal erreurs
+            erreurs += not resultat['ok']
+            arret = resultat.pop('arret', False)
+            destination.write(json.dumps(resultat, ensure_ascii=False, default=str) + "\n")
+            destination.flush()
+            return arret
+
+        sys.stdout = sortie
+        try:
+            with futures.ThreadPoolExecutor(max_workers=concurrence) as pool:
+                groupe: List[Dict] = []
+
+                def vider() -> bool:
+                    taches = _executer_en_ordre(pool, self._executer_requete, groupe, 2 * concurrence, sortie)
+                    arret = any([ecrire(future.result()) for _, future in taches])
+                    groupe.clear()
+                    return arret
+
+                for requete in _lire_requetes(lignes):
+                    commande = self.parseline(requete['commande'])[0]
+                    if concurrence > 1 and commande in READ_ONLY_COMMANDS and 'invalide' not in requete:
+                        groupe.append(requete)
+                        continue
+                    # Barrière: les requêtes en attente se terminent avant une commande qui modifie l'état
+                    if vider() or ecrire(self._executer_requete(requete, sortie)):
+                        return erreurs
+                vider()
+        finally:
+            sys.stdout = sortie.sortie
+            self.output_format, self.interactif = etat_precedent
+        return erreurs
+
+    def do_lot(self, arg: str) -> None:
+        """
+        Exécuter un fichier de requêtes sur l'inventaire chargé.
+        Usage: lot <fichier|-> [--concurrence N] [--sortie fichier.jsonl]
+        Une commande par ligne (ex: chercher_prix 10 20) ou un objet JSON par ligne
+        ({"commande": "chercher", "arguments": "chaise", "id": 1}); '-' lit l'entrée standard
+        Chaque requête produit une ligne JSONL: résultats, messages, erreurs et durée
+        """
+        try:
+            chemin, options = _extraire_options(arg, {'concurrence': True, 'sortie': True})
+            concurrence = int(options.get('concurrence', 1))
+            if concurrence < 1:
+                raise ValueError("La concurrence doit être positive.")
+        except ValueError as e:
+            self.logger.error(str(e))
+            return
+
+        chemin = chemin.strip()
+        if not chemin:
+            self.logger.error("Veuillez spécifier un fichier de requêtes (ou - pour l'entrée standard).")
+            return
+
+        try:
+            with contextlib.ExitStack() as pile:
+                source = sys.stdin if chemin == '-' else pile.enter_context(open(chemin, encoding='utf-8'))
+                destination = (pile.enter_context(open(options['sortie'], 'w', encoding='utf-8'))
+                               if 'sortie' in options else sys.stdout)
+                erreurs = self.executer_lot(source, destination, concurrence)
+        except OSError as e:
+            self.logger.error(f"Erreur lors de la lecture du lot: {str(e)}")
+            return
+        if erreurs:
+            self.logger.error(f"{erreurs} requête(s) en erreur.")
+
+    def do_serveur(self, arg: str) -> None:
+        """
+        Servir l'inventaire chargé sur une API HTTP locale, jusqu'à Ctrl+C.
+        Usage: serveur [--hote 127.0.0.1] [--port 8765] [--socket chemin]
+        Routes GET: /chercher?terme=, /chercher_prix?min=&max=, /chercher_quantite?min=&max=,
+        /chercher_categorie?terme=, /chercher_plages?prix_min=&prix_max=&quantite_min=&quantite_max=[&categorie=],
+        /rapport, /sante (limit, offset et mode acceptés); POST /recharger relit le dossier en arrière-plan
+        """
+        try:
+            _, options = _extraire_options(arg, {'hote': True, 'port': True, 'socket': True})
+            port = int(options.get('port', 8765))
+        except ValueError as e:
+            self.logger.error(str(e))
+            return
+
+        if self._inventaire_vide():
+            self.logger.error("L'inventaire est vide. Chargez d'abord des données.")
+            return
+
+        serveur = ServeurInventaire(self)
+        try:
+            asyncio.run(serveur.servir(options.get('hote', '127.0.0.1'), port, options.get('socket')))
+        except KeyboardInterrupt:
+            self.logger.info("Serveur arrêté.")
+        except OSError as e:
+            self.logger.error(f"Impossible de démarrer le serveur: {str(e)}")
+
+    def _recharger_fichiers(self, detections: Dict[str, float]) -> Optional[str]:
+        """
+        Relire en arrière-plan les fichiers modifiés dans une copie du gestionnaire,
+        puis substituer son état d'un seul coup. Les commandes en cours gardent l'ancien état.
+        Seul chemin de rechargement: surveillance du dossier et POST /recharger du serveur.
+        Retourne le message d'erreur si le rechargement a échoué.
+        """
+        etat, ancien_manifeste = self._etat, self.manifest
+        copie = self.copie()
+        copie.logger = JournalMemoire()
+        copie.alertes = []  # Vérifiées une fois l'état substitué, avec l'affichage du gestionnaire
+        debut = time.monotonic()
+        try:
+            copie.do_charger(f"{self.manifest_directory} --incremental")
+        except Exception as e:
+            self.logger.error(f"Erreur lors du rechargement: {str(e)}")
+            return f"Erreur lors du rechargement: {str(e)}"
+        for niveau, message in copie.logger.messages:
+            if niveau == 'erreur':
+                self.logger.error(message)
+
+        with self._verrou_rechargement:
+            if self._etat is not etat:
+                self.logger.info("Rechargement abandonné: l'inventaire a été rechargé entre-temps.")
+                return None
+            self.manifest, self.manifest_directory = copie.manifest, copie.manifest_directory
+            self._etat = copie._etat
+        fin = time.monotonic()
+
+        relus = [nom for nom, signature in copie.manifest.items()
+                 if ancien_manifeste.get(nom, {}).get('hash') != signature['hash']]
+        retires = sorted(set(ancien_manifeste) - set(copie.manifest))
+        for nom in relus:
+            self.logger.success(f"Rechargé: {nom} ({(fin - detections.get(nom, debut)) * 1000:.0f} ms après détection)")
+        for nom in retires:
+            self.logger.info(f"Retiré: {nom} ({(fin - detections.get(nom, debut)) * 1000:.0f} ms après détection)")
+        if relus or retires:
+            self.logger.info(f"Inventaire mis à jour: {len(self.inventory)} ligne(s), "
+                             f"lecture en {(fin - debut) * 1000:.0f} ms.")
+            self._verifier_alertes()
+        return None
+
+    def do_surveiller(self, arg: str) -> None:
+        """
+        Recharger automatiquement les CSV modifiés du dossier chargé.
+        Usage: surveiller [--intervalle 0.5] [--delai 1.0] | surveiller off
+        Le dossier est scruté toutes les `intervalle` secondes; une rafale d'écritures n'est relue
+        qu'après `delai` secondes sans changement, en arrière-plan, sans bloquer les commandes
+        """
+        try:
+            action, options = _extraire_options(arg, {'intervalle': True, 'delai': True})
+            intervalle = float(options.get('intervalle', 0.5))
+            delai = float(options.get('delai', 1.0))
+            if intervalle <= 0 or delai < 0:
+                raise ValueError("L'intervalle doit être positif et le délai non négatif.")
+        except ValueError as e:
+            self.logger.error(str(e))
+            return
+
+        if action.strip() == 'off':
+            if self.surveillant is None:
+                self.logger.info("Aucune surveillance en cours.")
+            else:
+                self.surveillant.arreter()
+                self.surveillant = None
+                self.logger.success("Surveillance arrêtée.")
+            return
+
+        if self.surveillant is not None and self.surveillant.actif:
+            self.logger.info(f"Le dossier {self.surveillant.dossier} est déjà surveillé.")
+            return
+        if self.source_hors_memoire is not None:
+            self.logger.error("En mode hors mémoire, les fichiers sont déjà relus à chaque commande.")
+            return
+        if self.manifest_directory is None:
+            self.logger.error("Chargez d'abord un dossier à surveiller.")
+            return
+
+        # Référence: le manifeste du dernier chargement, pour ne rien manquer de ce qui a changé depuis
+        connu = {nom: (signature['taille'], signature['mtime']) for nom, signature in self.manifest.items()}
+        self.surveillant = SurveillantDossier(self.manifest_directory, self._recharger_fichiers,
+                                              intervalle, delai, connu)
+        self.surveillant.demarrer()
+        self.logger.success(f"Surveillance de {self.manifest_directory} (scrutation toutes les {intervalle}s).")
+
     def do_quitter(self, arg: str) -> bool:
         """
         Quitter le programme.
         Usage: quitter
         """
+        if self.surveillant is not None:
+            self.surveillant.arreter()
+        en_cours = [export for export in self.exports if export.is_alive()]
+        if en_cours:
+            self.logger.info(f"Attente de {len(en_cours)} export(s) en cours...")
+            for export in en_cours:
+                export.join()
         self.logger.info("Au revoir!")
         return True
 
@@ -258,7 +3388,21 @@ class InventoryManager(Cmd):
             'chercher_prix': 'Chercher des produits par intervalle de prix',
             'chercher_quantite': 'Chercher des produits par intervalle de quantité',
             'chercher_categorie': 'Chercher des produits par catégorie',
+            'chercher_plages': 'Chercher par prix, quantité et catégorie à la fois',
+            'requete': 'Chercher selon plusieurs critères combinés (nom, catégorie, prix, quantité)',
+            'top': 'Produits de plus grande quantité, de plus grand prix ou de plus grande valeur de stock',
+            'bas': 'Produits de plus petite quantité, de plus petit prix ou de plus petite valeur de stock',
+            'alerte': 'Classements top/bas vérifiés après chaque chargement',
             'rapport': "Générer un rapport d'inventaire",
+            'memoire': "Afficher la mémoire utilisée par colonne",
+            'magasins': "Lister les magasins (fichiers sources) de l'inventaire",
+            'instantanes': "Lister les instantanés du dossier chargé",
+            'diff': "Comparer deux instantanés (ajouts, suppressions, écarts de quantité et de prix)",
+            'cache': "Statistiques du cache des requêtes",
+            'profil': "Mesurer la durée des commandes et de leurs phases",
+            'lot': "Exécuter un fichier de requêtes (sortie JSONL)",
+            'serveur': "Servir l'inventaire sur une API HTTP locale",
+            'surveiller': "Recharger automatiquement les CSV modifiés",
             'quitter': 'Quitter le programme',
             'aide': 'Afficher cette aide'
         }
@@ -267,6 +3411,192 @@ class InventoryManager(Cmd):
         for cmd, desc in commands.items():
             self.logger.info(f"{cmd:20} : {desc}")
 
+class ServeurInventaire:
+    """
+    Serveur HTTP local (TCP ou socket Unix) au-dessus d'un inventaire résident.
+    Les requêtes s'exécutent dans un pool de threads sur l'état courant du gestionnaire, figé au
+    début de chaque requête. POST /recharger passe par le même rechargement que surveiller
+    (InventoryManager._recharger_fichiers): l'état est préparé en arrière-plan puis substitué
+    d'un seul coup, si bien qu'aucun client ne voit d'état à moitié chargé, et la version
+    servie est celle de l'état, quel que soit le rechargement qui l'a produit.
+    """
+
+    ROUTES = ('chercher', 'chercher_prix', 'chercher_quantite', 'chercher_categorie', 'chercher_plages',
+              'requete', 'top', 'bas', 'rapport')
+    STATUTS = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found',
+               405: 'Method Not Allowed', 409: 'Conflict', 500: 'Internal Server Error'}
+
+    def __init__(self, manager: InventoryManager, workers: Optional[int] = None):
+        self.manager = manager
+        self.requetes = futures.ThreadPoolExecutor(max_workers=workers or manager.workers)
+        self.chargement = futures.ThreadPoolExecutor(max_workers=1)  # Ne prend jamais un thread de requête
+        self.rechargement: Optional[asyncio.Task] = None
+        self.derniere_erreur: Optional[str] = None
+
+    async def demarrer(self, hote: str = '127.0.0.1', port: int = 8765,
+                       socket_unix: Optional[str] = None) -> asyncio.AbstractServer:
+        if socket_unix:
+            return await asyncio.start_unix_server(self._client, path=socket_unix)
+        return await asyncio.start_server(self._client, hote, port)
+
+    async def servir(self, hote: str = '127.0.0.1', port: int = 8765, socket_unix: Optional[str] = None) -> None:
+        serveur = await self.demarrer(hote, port, socket_unix)
+        adresse = socket_unix or "http://{}:{}".format(*serveur.sockets[0].getsockname()[:2])
+        self.manager.logger.success(f"Serveur à l'écoute sur {adresse}")
+        try:
+            async with serveur:
+                await serveur.serve_forever()
+        finally:
+            self.requetes.shutdown(wait=False, cancel_futures=True)
+            self.chargement.shutdown(wait=False, cancel_futures=True)
+
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Servir les requêtes d'une connexion (keep-alive en HTTP/1.1)."""
+        try:
+            while True:
+                ligne = await reader.readline()
+                if not ligne:
+                    break
+                try:
+                    methode, cible, version = ligne.decode('latin1').split()
+                except ValueError:
+                    await self._envoyer(writer, 400, {'erreur': "Requête HTTP invalide."}, fermer=True)
+                    break
+                entetes = {}
+                while True:
+                    entete = await reader.readline()
+                    if entete in (b'\r\n', b'\n', b''):
+                        break
+                    nom, _, valeur = entete.decode('latin1').partition(':')
+                    entetes[nom.strip().lower()] = valeur.strip()
+                try:
+                    longueur = int(entetes.get('content-length') or 0)
+                    if longueur < 0:
+                        raise ValueError(longueur)
+                except ValueError:
+                    await self._envoyer(writer, 400, {'erreur': "En-tête Content-Length invalide."}, fermer=True)
+                    break
+                if longueur:
+                    await reader.readexactly(longueur)  # Corps ignoré
+                garder = version == 'HTTP/1.1' and entetes.get('connection', '').lower() != 'close'
+                statut, corps = await self._traiter(methode, cible)
+                await self._envoyer(writer, statut, corps, fermer=not garder)
+                if not garder:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _envoyer(self, writer: asyncio.StreamWriter, statut: int, corps, fermer: bool = False) -> None:
+        donnees = (corps if isinstance(corps, str) else json.dumps(corps, ensure_ascii=False)).encode('utf-8')
+        entetes = (f"HTTP/1.1 {statut} {self.STATUTS[statut]}\r\n"
+                   "Content-Type: application/json; charset=utf-8\r\n"
+                   f"Content-Length: {len(donnees)}\r\n"
+                   f"Connection: {'close' if fermer else 'keep-alive'}\r\n\r\n")
+        writer.write(entetes.encode('latin1') + donnees)
+        await writer.drain()
+
+    async def _traiter(self, methode: str, cible: str) -> Tuple[int, object]:
+        url = urllib.parse.urlsplit(cible)
+        route = url.path.strip('/')
+        params = {nom: valeurs[-1] for nom, valeurs in urllib.parse.parse_qs(url.query).items()}
+        if route == 'recharger':
+            return self._lancer_rechargement() if methode == 'POST' else (405, {'erreur': "Utilisez POST."})
+        if route not in self.ROUTES and route != 'sante':
+            return 404, {'erreur': f"Route inconnue: /{route}"}
+        if methode != 'GET':
+            return 405, {'erreur': "Utilisez GET."}
+
+        etat = self.manager._etat  # Figé pour toute la requête
+        if route == 'sante':
+            return 200, {'version': etat.version, 'lignes': len(etat.inventory),
+                         'hors_memoire': self.manager.source_hors_memoire is not None,
+                         'rechargement': self.rechargement is not None and not self.rechargement.done(),
+                         'derniere_erreur': self.derniere_erreur}
+        try:
+            corps = await asyncio.get_running_loop().run_in_executor(
+                self.requetes, self._requete, etat, route, params)
+            return 200, corps
+        except ValueError as e:
+            return 400, {'erreur': str(e)}
+        except Exception as e:
+            return 500, {'erreur': f"Erreur lors de la recherche: {str(e)}"}
+
+    @staticmethod
+    def _arguments(route: str, params: Dict[str, str]) -> Tuple[str, tuple]:
+        """Filtre de EtatInventaire et arguments correspondant à une route."""
+        def valeur(nom: str, type_valeur: Callable = str):
+            if nom not in params:
+                raise ValueError(f"Paramètre manquant: {nom}")
+            try:
+                return type_valeur(params[nom])
+            except ValueError:
+                raise ValueError(f"Paramètre invalide: {nom}={params[nom]}")
+
+        mode = params.get('mode', 'auto')
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Mode invalide: {mode} (choix: {', '.join(SEARCH_MODES)}).")
+        if route == 'chercher':
+            return 'filtrer_nom', (valeur('terme'), mode)
+        if route == 'chercher_categorie':
+            return 'filtrer_categorie', (valeur('terme'), mode)
+        if route == 'chercher_prix':
+            return 'filtrer_prix', (valeur('min', float), valeur('max', float))
+        if route == 'chercher_quantite':
+            return 'filtrer_quantite', (valeur('min', int), valeur('max', int))
+        if route == 'requete':
+            texte = ' '.join(shlex.quote(f"{champ}={params[champ]}") for champ in QUERY_FIELDS if champ in params)
+            return 'filtrer_requete', (_analyser_requete(texte, mode),)
+        return 'filtrer_plages', (valeur('prix_min', float), valeur('prix_max', float),
+                                  valeur('quantite_min', int), valeur('quantite_max', int),
+                                  params.get('categorie'))
+
+    def _requete(self, etat: EtatInventaire, route: str, params: Dict[str, str]) -> str:
+        """Exécuter une requête sur un état (dans un thread du pool) et rendre le corps JSON de la réponse."""
+        manager = self.manager
+        if manager.source_hors_memoire is None and etat.inventory.empty:
+            raise ValueError("L'inventaire est vide.")
+        try:
+            limite = int(params['limit']) if 'limit' in params else None
+            decalage = int(params.get('offset', 0))
+        except ValueError:
+            raise ValueError("limit et offset doivent être des entiers.")
+        magasins = params.get('magasins', manager.magasins)
+        if route == 'rapport':
+            frames = [manager._donnees_rapport(etat, magasins=magasins).reset_index()]
+        elif route in ('top', 'bas'):
+            critere, nombre = _analyser_classement(f"{params.get('critere', '')} {params.get('nombre', '')}")
+            try:
+                seuil = float(params['seuil']) if 'seuil' in params else None
+            except ValueError:
+                raise ValueError(f"Paramètre invalide: seuil={params['seuil']}")
+            par_categorie = params.get('par_categorie', '').lower() in ('1', 'true', 'oui')
+            frames = [manager._classement((critere, nombre, par_categorie, seuil), route == 'top', magasins, etat)]
+        else:
+            filtre, arguments = self._arguments(route, params)
+            frames = manager._resultats(filtre, *arguments, magasins=magasins, etat=etat)
+        lignes = [ligne for bloc in _rendre(_paginer(frames, limite, decalage), 'jsonl')
+                  for ligne in bloc.splitlines()]
+        return f'{{"version": {etat.version}, "nombre": {len(lignes)}, "resultats": [{",".join(lignes)}]}}'
+
+    def _lancer_rechargement(self) -> Tuple[int, Dict]:
+        if self.rechargement is not None and not self.rechargement.done():
+            return 409, {'erreur': "Un rechargement est déjà en cours."}
+        manager = self.manager
+        if manager.source_hors_memoire is not None:
+            return 409, {'erreur': "En mode hors mémoire, les fichiers sont relus à chaque requête."}
+        if manager.manifest_directory is None:
+            return 409, {'erreur': "Aucun dossier chargé à recharger."}
+        self.rechargement = asyncio.get_running_loop().create_task(self._recharger())
+        return 202, {'rechargement': 'lancé'}
+
+    async def _recharger(self) -> None:
+        """Recharger hors de la boucle, par le même chemin que la surveillance du dossier."""
+        self.derniere_erreur = await asyncio.get_running_loop().run_in_executor(
+            self.chargement, self.manager._recharger_fichiers, {})
+
+
 def main():
     parser = argparse.ArgumentParser(description="Gestionnaire d'Inventaire CLI")
     parser.add_argument("--charger", help="Charger les fichiers CSV d'un dossier")
@@ -274,29 +3604,142 @@ def main():
     parser.add_argument("--chercher-prix", nargs=2, type=float, help="Chercher par intervalle de prix (min max)")
     parser.add_argument("--chercher-quantite", nargs=2, type=int, help="Chercher par intervalle de quantité (min max)")
     parser.add_argument("--chercher-categorie", help="Chercher par catégorie")
+    parser.add_argument("--chercher-plages", nargs=4, metavar=("PRIX_MIN", "PRIX_MAX", "QTE_MIN", "QTE_MAX"),
+                        help="Chercher par intervalle de prix et de quantité à la fois")
+    parser.add_argument("--requete", metavar="CRITERES",
+                        help="Chercher selon plusieurs critères combinés (ex: \"nom=chaise prix=10..50\")")
+    parser.add_argument("--top", nargs='+', metavar="CRITERE",
+                        help="Produits de plus grande quantité, prix ou valeur de stock (ex: --top valeur 20)")
+    parser.add_argument("--bas", nargs='+', metavar="CRITERE",
+                        help="Produits de plus petite quantité, prix ou valeur de stock (ex: --bas quantite 50)")
+    parser.add_argument("--par-categorie", action="store_true", help="Classements top/bas par catégorie")
+    parser.add_argument("--seuil", type=float, help="Seuil des classements top/bas (au moins / au plus)")
+    parser.add_argument("--alerte", action="append", metavar="CLASSEMENT",
+                        help="Classement vérifié après chaque chargement (ex: \"bas quantite 50 --seuil 5\")")
     parser.add_argument("--rapport", help="Générer et sauvegarder un rapport (chemin du fichier)")
+    parser.add_argument("--verifier", action="store_true", help="Vérifier le rapport par un recalcul complet")
+    parser.add_argument("--jobs", type=int, help="Processus utilisés pour calculer le rapport")
     parser.add_argument("--afficher", action="store_true", help="Afficher l'inventaire complet")
+    parser.add_argument("--limit", type=int, help="Nombre maximum de lignes affichées par commande")
+    parser.add_argument("--offset", type=int, help="Nombre de lignes à sauter avant l'affichage")
+    parser.add_argument("--magasins", metavar="M1,M2",
+                        help="Limiter les recherches et le rapport à ces magasins (fichiers sources)")
+    parser.add_argument("--exporter", metavar="CHEMIN",
+                        help="Exporter les résultats de recherche (.csv, .csv.gz, .csv.zst, .jsonl, .parquet)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, help="Format des résultats (table, csv, jsonl)")
+    parser.add_argument("--workers", type=int, help="Nombre de workers pour le chargement des CSV")
+    parser.add_argument("--processus", action="store_true", help="Charger les CSV avec un pool de processus")
+    parser.add_argument("--no-cache", action="store_true", help="Ignorer et reconstruire le cache disque de l'inventaire")
+    parser.add_argument("--cache-dir", help="Dossier du cache disque de l'inventaire")
+    parser.add_argument("--type-prix", choices=PRICE_DTYPES, help="Type de stockage des prix unitaires")
+    parser.add_argument("--moteur", choices=CSV_ENGINES, help="Moteur de lecture des CSV (auto: pyarrow s'il est installé)")
+    parser.add_argument("--quarantaine", help="Fichier CSV des lignes rejetées au chargement")
+    parser.add_argument("--cache-requetes", metavar="TAILLE",
+                        help="Budget du cache des résultats de requêtes (ex: 64M, 0 pour le désactiver)")
+    parser.add_argument("--instantanes", type=int, metavar="N",
+                        help="Nombre d'instantanés de l'inventaire conservés par dossier (0: aucun)")
+    parser.add_argument("--diff", nargs=2, metavar=("A", "B"),
+                        help="Comparer deux instantanés (numéros, -1 pour le dernier, courant ou chemins)")
+    parser.add_argument("--memoire", action="store_true", help="Afficher la mémoire utilisée par colonne")
+    parser.add_argument("--hors-memoire", action="store_true", help="Lire les CSV par morceaux à chaque commande")
+    parser.add_argument("--budget", help="Taille visée d'un morceau en mode hors mémoire (ex: 256M)")
+    parser.add_argument("--lot", metavar="FICHIER", help="Exécuter un fichier de requêtes ('-' pour l'entrée standard)")
+    parser.add_argument("--concurrence", type=int, help="Requêtes en lecture seule exécutées en parallèle dans un lot")
+    parser.add_argument("--serveur", action="store_true", help="Servir l'inventaire sur une API HTTP locale")
+    parser.add_argument("--hote", help="Adresse d'écoute du serveur (défaut: 127.0.0.1)")
+    parser.add_argument("--port", type=int, help="Port du serveur (défaut: 8765)")
+    parser.add_argument("--socket", help="Écouter sur une socket Unix plutôt qu'en TCP")
+    parser.add_argument("--surveiller", action="store_true",
+                        help="Recharger automatiquement les CSV modifiés du dossier chargé")
+    parser.add_argument("--profile", nargs='?', const='', metavar="CHEMIN",
+                        help="Chronométrer les commandes; CHEMIN.json écrit la trace, tout autre CHEMIN un profil pstats")
 
     args = parser.parse_args()
+    colorama.init(autoreset=True)
     manager = InventoryManager()
+    if args.workers:
+        manager.workers = args.workers
+    if args.jobs:
+        manager.jobs = args.jobs
+    manager.use_processes = args.processus
+    if args.cache_dir:
+        manager.cache_dir = Path(args.cache_dir)
+    if args.type_prix:
+        manager.price_dtype = args.type_prix
+    if args.moteur:
+        manager.csv_engine = args.moteur
+    if args.quarantaine:
+        manager.quarantine_path = Path(args.quarantaine)
+    if args.instantanes is not None:
+        manager.snapshots_kept = args.instantanes
+    manager.par_categorie = args.par_categorie
+    for alerte in args.alerte or []:
+        manager.onecmd(f"alerte {alerte}")
+    if args.cache_requetes:
+        manager.cache_requetes.budget = _parse_taille(args.cache_requetes, zero_autorise=True)
+    if args.format:
+        manager.output_format = args.format
+    manager.limit = args.limit
+    manager.magasins = args.magasins
+    if args.exporter:
+        manager.export_path = Path(args.exporter)
+    manager.offset = args.offset or 0
+    if args.profile is not None:
+        manager.profileur.activer(cprofile=bool(args.profile) and not args.profile.endswith('.json'))
 
-    if any(vars(args).values()):
+    # Les options de configuration seules ne déclenchent pas le mode non interactif
+    options_config = {'workers', 'processus', 'no_cache', 'cache_dir', 'type_prix', 'moteur', 'quarantaine',
+                      'instantanes', 'par_categorie', 'seuil', 'alerte', 'cache_requetes', 'verifier', 'jobs',
+                      'hors_memoire', 'budget', 'limit', 'offset', 'magasins', 'exporter', 'format', 'profile',
+                      'concurrence', 'hote', 'port', 'socket', 'surveiller'}
+    if any(value for key, value in vars(args).items() if key not in options_config):
+        # Passe par onecmd pour que le profileur chronomètre chaque commande
         if args.charger:
-            manager.do_charger(args.charger)
+            manager.onecmd("charger " + args.charger + (" --no-cache" if args.no_cache else "")
+                           + (" --hors-memoire" if args.hors_memoire else "")
+                           + (f" --budget {args.budget}" if args.budget else ""))
+            if args.surveiller:
+                manager.onecmd("surveiller")
         if args.chercher:
-            manager.do_chercher(args.chercher)
+            manager.onecmd(f"chercher {args.chercher}")
         if args.chercher_prix:
-            manager.do_chercher_prix(f"{args.chercher_prix[0]} {args.chercher_prix[1]}")
+            manager.onecmd(f"chercher_prix {args.chercher_prix[0]} {args.chercher_prix[1]}")
         if args.chercher_quantite:
-            manager.do_chercher_quantite(f"{args.chercher_quantite[0]} {args.chercher_quantite[1]}")
+            manager.onecmd(f"chercher_quantite {args.chercher_quantite[0]} {args.chercher_quantite[1]}")
         if args.chercher_categorie:
-            manager.do_chercher_categorie(args.chercher_categorie)
+            manager.onecmd(f"chercher_categorie {args.chercher_categorie}")
+        if args.chercher_plages:
+            manager.onecmd("chercher_plages " + " ".join(args.chercher_plages))
+        if args.requete:
+            manager.onecmd(f"requete {args.requete}")
+        seuil = f" --seuil {args.seuil}" if args.seuil is not None else ""
+        if args.top:
+            manager.onecmd("top " + " ".join(args.top) + seuil)
+        if args.bas:
+            manager.onecmd("bas " + " ".join(args.bas) + seuil)
         if args.rapport:
-            manager.do_rapport(args.rapport)
+            manager.onecmd(f"rapport {args.rapport}" + (" --verifier" if args.verifier else ""))
         if args.afficher:
-            manager.do_afficher("")
+            manager.onecmd("afficher")
+        if args.diff:
+            manager.onecmd("diff " + " ".join(args.diff))
+        if args.memoire:
+            manager.onecmd("memoire")
+        if args.lot:
+            manager.onecmd(f"lot {args.lot}" + (f" --concurrence {args.concurrence}" if args.concurrence else ""))
+        if args.serveur:
+            manager.onecmd("serveur" + (f" --hote {args.hote}" if args.hote else "")
+                           + (f" --port {args.port}" if args.port is not None else "")
+                           + (f" --socket {args.socket}" if args.socket else ""))
+        elif args.surveiller and manager.surveillant is not None:
+            manager.cmdloop()  # La surveillance n'a de sens qu'avec un inventaire qui reste en mémoire
     else:
         manager.cmdloop()
 
+    if args.profile is not None:
+        manager.onecmd("profil rapport")
+        if args.profile:
+            manager.onecmd(("profil json " if args.profile.endswith('.json') else "profil pstats ") + args.profile)
+
 if __name__ == "__main__":
     main()
@@ -1,8 +1,18 @@
 import unittest
 import pandas as pd
+import numpy as np
 from unittest.mock import patch
 from io import StringIO
 import tempfile
+import shutil
+import json
+import asyncio
+import threading
+import time
+import http.client
+import contextlib
+import socket
+import subprocess
 from pathlib import Path
 import sys
 import os
@@ -11,7 +21,8 @@ import os
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
 
-from inventaire_gestionnaire import InventoryManager, ColorLogger
+from inventaire_gestionnaire import (InventoryManager, ColorLogger, ServeurInventaire, _compacter,
+                                     _comparer_inventaires, _paginer, Selection)
 
 
 class TestColorLogger(unittest.TestCase):
@@ -26,11 +37,22 @@ class TestColorLogger(unittest.TestCase):
         self.assertEqual(mock_print.call_count, 3)
 
 
+class TestDemarrage(unittest.TestCase):
+    def test_import_does_not_load_pandas(self):
+        # pandas n'est importé qu'à la première commande qui manipule des données
+        sortie = subprocess.run(
+            [sys.executable, '-c', "import sys, inventaire_gestionnaire; print('pandas' in sys.modules)"],
+            cwd=current_dir, capture_output=True, text=True).stdout
+        self.assertEqual(sortie.strip(), 'False')
+
+
 class TestInventoryManager(unittest.TestCase):
     def setUp(self):
         """Configuration initiale pour chaque test"""
         self.manager = InventoryManager()
         self.test_dir = tempfile.mkdtemp()
+        self.cache_dir = tempfile.mkdtemp()
+        self.manager.cache_dir = Path(self.cache_dir)
 
         # Données de test valides
         self.valid_data = pd.DataFrame({
@@ -52,6 +74,7 @@ class TestInventoryManager(unittest.TestCase):
         for file in Path(self.test_dir).glob('*.csv'):
             file.unlink()
         os.rmdir(self.test_dir)
+        shutil.rmtree(self.cache_dir)
 
     def create_test_csv(self, data, filename):
         """Crée un fichier CSV de test"""
@@ -92,6 +115,297 @@ class TestInventoryManager(unittest.TestCase):
 
         self.assertEqual(len(self.manager.inventory), 2)
 
+    def test_charger_parallel_workers(self):
+        for i in range(5):
+            self.create_test_csv(self.valid_data, f'magasin{i}.csv')
+
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_charger(f"{self.test_dir} --workers 3")
+        output = mock_stdout.getvalue()
+
+        self.assertEqual(len(self.manager.inventory), 10)
+        self.assertIn("Chargé: magasin0.csv", output)
+        self.assertIn("fichiers/s", output)
+        self.assertIn("lignes/s", output)
+        # Les fichiers gardent l'ordre du dossier
+        self.assertEqual(list(self.manager.inventory['Fichier Source'].unique()),
+                         [f'magasin{i}.csv' for i in range(5)])
+
+    def test_charger_invalid_workers(self):
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_charger(f"{self.test_dir} --workers 0")
+        self.assertIn("Le nombre de workers doit être positif", mock_stdout.getvalue())
+
+    def test_charger_incremental(self):
+        self.create_test_csv(self.valid_data, 'garde.csv')
+        self.create_test_csv(self.valid_data, 'modifie.csv')
+        self.create_test_csv(self.valid_data, 'supprime.csv')
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_charger(self.test_dir)
+        self.assertEqual(len(self.manager.inventory), 6)
+
+        nouvelles = pd.DataFrame({
+            'nom du produit': ['Produit3', 'Produit4', 'Produit5'],
+            'catégorie': ['Cat3', 'Cat3', 'Cat3'],
+            'quantité': [1, 2, 3],
+            'prix unitaire': [1.0, 2.0, 3.0]
+        })
+        self.create_test_csv(nouvelles, 'modifie.csv')
+        self.create_test_csv(self.valid_data, 'nouveau.csv')
+        (Path(self.test_dir) / 'supprime.csv').unlink()
+
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_charger(f"{self.test_dir} --incremental")
+        output = mock_stdout.getvalue()
+
+        self.assertNotIn("Chargé: garde.csv", output)
+        self.assertIn("Chargé: modifie.csv", output)
+        self.assertIn("Chargé: nouveau.csv", output)
+        counts = self.manager.inventory['Fichier Source'].value_counts()
+        self.assertEqual(counts.to_dict(), {'garde.csv': 2, 'modifie.csv': 3, 'nouveau.csv': 2})
+        self.assertEqual(set(self.manager.manifest), {'garde.csv', 'modifie.csv', 'nouveau.csv'})
+
+    def test_charger_incremental_no_change(self):
+        self.create_test_csv(self.valid_data, 'valid.csv')
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_charger(self.test_dir)
+
+        # Un fichier simplement touché n'est pas relu
+        os.utime(Path(self.test_dir) / 'valid.csv', ns=(1, 1))
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_charger(f"{self.test_dir} --incremental")
+        self.assertIn("Aucun changement détecté", mock_stdout.getvalue())
+        self.assertEqual(len(self.manager.inventory), 2)
+
+    def test_charger_from_cache(self):
+        self.create_test_csv(self.valid_data, 'valid.csv')
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_charger(self.test_dir)
+
+        # Une nouvelle instance repart de l'instantané sans relire les CSV
+        manager = InventoryManager()
+        manager.cache_dir = Path(self.cache_dir)
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            manager.do_charger(self.test_dir)
+        output = mock_stdout.getvalue()
+        self.assertIn("Inventaire chargé depuis le cache", output)
+        self.assertNotIn("Chargé: valid.csv", output)
+        pd.testing.assert_frame_equal(manager.inventory, self.manager.inventory)
+
+    def test_charger_cache_invalidated(self):
+        self.create_test_csv(self.valid_data, 'valid.csv')
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_charger(self.test_dir)
+        self.create_test_csv(self.valid_data, 'autre.csv')
+
+        manager = InventoryManager()
+        manager.cache_dir = Path(self.cache_dir)
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            manager.do_charger(self.test_dir)
+        output = mock_stdout.getvalue()
+        self.assertIn("Chargé: autre.csv", output)
+        self.assertNotIn("Chargé: valid.csv", output)
+        self.assertEqual(len(manager.inventory), 4)
+
+    def test_charger_no_cache(self):
+        self.create_test_csv(self.valid_data, 'valid.csv')
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_charger(self.test_dir)
+
+        manager = InventoryManager()
+        manager.cache_dir = Path(self.cache_dir)
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            manager.do_charger(f"{self.test_dir} --no-cache")
+        self.assertIn("Chargé: valid.csv", mock_stdout.getvalue())
+
+    def test_charger_compact_dtypes(self):
+        self.create_test_csv(self.valid_data, 'valid.csv')
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_charger(f"{self.test_dir} --type-prix float32")
+
+        inventory = self.manager.inventory
+        self.assertIsInstance(inventory['catégorie'].dtype, pd.CategoricalDtype)
+        self.assertIsInstance(inventory['Fichier Source'].dtype, pd.CategoricalDtype)
+        self.assertEqual(inventory['quantité'].dtype, 'int8')
+        self.assertEqual(inventory['prix unitaire'].dtype, 'float32')
+
+    def test_charger_invalid_price_dtype(self):
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_charger(f"{self.test_dir} --type-prix decimal")
+        self.assertIn("Type de prix invalide", mock_stdout.getvalue())
+
+    def test_memoire(self):
+        self.create_test_csv(self.valid_data, 'valid.csv')
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_charger(self.test_dir)
+            self.manager.do_memoire("")
+        output = mock_stdout.getvalue()
+        self.assertIn("Mémoire de l'inventaire", output)
+        self.assertIn("category", output)
+        self.assertIn("Total:", output)
+
+    def test_memoire_empty_inventory(self):
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_memoire("")
+        self.assertIn("L'inventaire est vide", mock_stdout.getvalue())
+
+    def test_charger_detects_encoding(self):
+        data = pd.DataFrame({
+            'nom du produit': ['Télévision', 'Écran'],
+            'catégorie': ['Électronique', 'Électronique'],
+            'quantité': [1, 2],
+            'prix unitaire': [1.0, 2.0]
+        })
+        data.to_csv(Path(self.test_dir) / 'utf8.csv', index=False, encoding='utf-8')
+        data.to_csv(Path(self.test_dir) / 'cp1252.csv', index=False, encoding='cp1252')
+
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_charger(self.test_dir)
+
+        self.assertEqual(len(self.manager.inventory), 4)
+        self.assertEqual(set(self.manager.inventory['nom du produit']), {'Télévision', 'Écran'})
+        self.assertEqual(self.manager.manifest['utf8.csv']['encodage'], 'utf-8-sig')
+        self.assertEqual(self.manager.manifest['cp1252.csv']['encodage'], 'cp1252')
+
+    def _create_store_files(self):
+        """Crée quelques fichiers de magasins plus volumineux pour les tests hors mémoire"""
+        for i in range(3):
+            data = pd.DataFrame({
+                'nom du produit': [f'Produit{j}' for j in range(40)],
+                'catégorie': ['Électronique', 'electronique', 'Cat2', 'Cat3'] * 10,
+                'quantité': [(j * (i + 3)) % 17 for j in range(40)],
+                'prix unitaire': [float((j * 7) % 23) + 0.5 for j in range(40)]
+            })
+            self.create_test_csv(data, f'magasin{i}.csv')
+
+    def test_charger_hors_memoire_matches_in_memory(self):
+        self._create_store_files()
+        en_memoire = InventoryManager()
+        en_memoire.cache_dir = Path(self.cache_dir)
+        with patch('sys.stdout', new=StringIO()):
+            en_memoire.do_charger(self.test_dir)
+            self.manager.do_charger(f"{self.test_dir} --hors-memoire --budget 4K")
+
+        self.assertTrue(self.manager.inventory.empty)
+        self.assertGreater(self.manager.source_hors_memoire._lignes_par_morceau(
+            *self.manager.source_hors_memoire.fichiers[0]), 0)
+        self.assertGreater(len(list(self.manager.source_hors_memoire.morceaux())), 3)
+
+        requetes = [('filtrer_nom', 'produit1', 'auto'), ('filtrer_prix', 2.0, 10.0),
+                    ('filtrer_quantite', 3, 9), ('filtrer_categorie', 'electronique', 'auto'),
+                    ('filtrer_plages', 1.0, 15.0, 2, 12, 'cat'),
+                    ('filtrer_requete', (('nom', ('produit', 'auto')), ('prix', (2.0, 10.0))))]
+        for filtre, *args in requetes:
+            attendu = pd.concat(_paginer(en_memoire._resultats(filtre, *args), None, 0))
+            obtenu = pd.concat(_paginer(self.manager._resultats(filtre, *args), None, 0))
+            pd.testing.assert_frame_equal(obtenu, attendu, check_dtype=False,
+                                          check_categorical=False, obj=filtre)
+
+        pd.testing.assert_frame_equal(self.manager.source_hors_memoire.rapport(), en_memoire._etat.rapport())
+
+    def test_rejected_row_numbering_same_for_every_load_path(self):
+        data = pd.DataFrame({
+            'nom du produit': ['Produit1', None, 'Produit3', 'Produit4'],
+            'catégorie': ['Cat1', 'Cat1', 'Cat2', 'Cat2'],
+            'quantité': [5, 6, 7, 8],
+            'prix unitaire': [10.0, 20.0, 30.0, 40.0]
+        })
+        self.create_test_csv(data, "test1.csv")
+        depuis_cache = InventoryManager()
+        depuis_cache.cache_dir = Path(self.cache_dir)
+        hors_memoire = InventoryManager()
+        hors_memoire.cache_dir = Path(self.cache_dir)
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_charger(self.test_dir)
+            depuis_cache.do_charger(self.test_dir)
+            hors_memoire.do_charger(f"{self.test_dir} --hors-memoire")
+
+        self.assertEqual(self.manager.inventory.index.tolist(), [0, 1, 2])
+        for autre in (depuis_cache, hors_memoire):
+            attendu = pd.concat(_paginer(self.manager._resultats('filtrer_prix', 0.0, 100.0), None, 0))
+            obtenu = pd.concat(_paginer(autre._resultats('filtrer_prix', 0.0, 100.0), None, 0))
+            pd.testing.assert_frame_equal(obtenu, attendu, check_dtype=False, check_categorical=False)
+
+    def test_requete_matches_chained_filters(self):
+        self._create_store_files()
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_charger(self.test_dir)
+        etat = self.manager._etat
+        attendu = etat.inventory
+        for filtre in (etat.filtrer_nom('produit1'), etat.filtrer_categorie('electronique'),
+                       etat.filtrer_prix(2.0, 15.0), etat.filtrer_quantite(3, 12)):
+            attendu = attendu.loc[attendu.index.intersection(filtre.index)]
+        self.assertGreater(len(attendu), 0)
+
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_requete("nom=produit1 catégorie=electronique prix=2..15 quantite=3..12 "
+                                    "--expliquer --format csv")
+        output = mock_stdout.getvalue()
+        self.assertIn("Plan: ", output)
+        obtenu = pd.read_csv(StringIO(output.split("\n", 1)[1]))
+        self.assertEqual(obtenu['nom du produit'].tolist(), attendu['nom du produit'].tolist())
+
+        # Bornes ouvertes et valeur seule
+        ouverte = etat.filtrer_requete((('prix', (-np.inf, 15.0)), ('quantite', (3.0, 3.0))))
+        quantite = etat.filtrer_quantite(3, 3)
+        pd.testing.assert_frame_equal(ouverte, quantite[quantite['prix unitaire'] <= 15.0])
+
+    def test_magasins_limit_searches_to_their_shards(self):
+        self._create_store_files()
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_charger(self.test_dir)
+        etat = self.manager._etat
+        self.assertEqual(etat.blocs(), {'magasin0.csv': [(0, 40)], 'magasin1.csv': [(40, 80)],
+                                        'magasin2.csv': [(80, 120)]})
+
+        requetes = [('filtrer_nom', 'produit1', 'auto'), ('filtrer_prix', 2.0, 10.0),
+                    ('filtrer_categorie', 'electronique', 'auto'),
+                    ('filtrer_requete', (('nom', ('produit', 'auto')), ('quantite', (3.0, 9.0))))]
+        for filtre, *args in requetes:
+            complet = getattr(etat, filtre)(*args)
+            attendu = complet[complet['Fichier Source'].isin(['magasin0.csv', 'magasin2.csv'])]
+            obtenu = pd.concat(_paginer(self.manager._resultats(filtre, *args, magasins='magasin2.csv,magasin0'), None, 0))
+            pd.testing.assert_frame_equal(obtenu, attendu, obj=filtre)
+        self.assertNotIn('magasin1.csv', etat._fragments)  # Fragment jamais construit
+
+        rapport = self.manager._donnees_rapport(etat, magasins='magasin1')
+        seul = InventoryManager()
+        seul.inventory = etat.inventory.iloc[40:80]
+        pd.testing.assert_frame_equal(rapport, seul._donnees_rapport(seul._etat), check_dtype=False)
+
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_magasins("")
+            self.manager.do_chercher("produit --magasins inconnu")
+        output = mock_stdout.getvalue()
+        self.assertIn("magasin1.csv", output)
+        self.assertIn("Magasin(s) inconnu(s): inconnu", output)
+
+    def test_requete_invalid_criteria(self):
+        self.manager.inventory = self.valid_data
+        for requete, message in (("couleur=rouge", "Critère invalide"), ("prix=a..b", "Intervalle invalide"),
+                                 ("prix=1..2 prix=3..4", "Critère répété"), ("", "au moins un critère")):
+            with patch('sys.stdout', new=StringIO()) as mock_stdout:
+                self.manager.do_requete(requete)
+            self.assertIn(message, mock_stdout.getvalue())
+
+    def test_rapport_hors_memoire(self):
+        self._create_store_files()
+        export_path = Path(self.cache_dir) / "rapport.csv"
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_charger(f"{self.test_dir} --hors-memoire --budget 2K")
+            self.manager.do_rapport(str(export_path))
+            self.manager.do_chercher("Produit39")
+        output = mock_stdout.getvalue()
+        self.assertIn("Rapport Récapitulatif", output)
+        self.assertIn("Produit39", output)
+        report = pd.read_csv(export_path)
+        self.assertEqual(report['quantité_count'].sum(), 120)
+
+    def test_charger_invalid_budget(self):
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_charger(f"{self.test_dir} --hors-memoire --budget -5M")
+        self.assertIn("Le budget mémoire doit être positif", mock_stdout.getvalue())
+
     def test_charger_directory_not_found(self):
         with patch('sys.stdout', new=StringIO()) as mock_stdout:
             self.manager.do_charger("/chemin/inexistant")
@@ -117,6 +431,72 @@ class TestInventoryManager(unittest.TestCase):
         self.assertIn("Produit1", output)
         self.assertIn("Produit2", output)
 
+    def test_afficher_pagination(self):
+        self.manager.inventory = pd.DataFrame({
+            'nom du produit': [f'Article{i:04d}' for i in range(2500)],
+            'catégorie': ['Cat1'] * 2500,
+            'quantité': range(2500),
+            'prix unitaire': [1.0] * 2500
+        })
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_afficher("--offset 998 --limit 4")
+        output = mock_stdout.getvalue()
+        self.assertNotIn("Article0997", output)
+        for i in range(998, 1002):
+            self.assertIn(f"Article{i:04d}", output)
+        self.assertNotIn("Article1002", output)
+
+    def test_chercher_pagination_copies_only_the_page(self):
+        self.manager.inventory = pd.DataFrame({
+            'nom du produit': [f'Article{i:04d}' for i in range(2500)],
+            'catégorie': ['Cat1'] * 2500,
+            'quantité': range(2500),
+            'prix unitaire': [1.0] * 2500
+        })
+        with patch.object(Selection, 'lignes', autospec=True, side_effect=Selection.lignes) as lignes:
+            with patch('sys.stdout', new=StringIO()) as mock_stdout:
+                self.manager.do_chercher("article --offset 998 --limit 4 --format csv")
+        self.assertEqual(pd.read_csv(StringIO(mock_stdout.getvalue()))['quantité'].tolist(), [998, 999, 1000, 1001])
+        lignes.assert_called_once()
+        self.assertEqual(lignes.call_args.args[1:], (998, 1002))  # Seule la page est copiée
+        # Le cache garde les positions des lignes retenues, pas les lignes
+        (positions, taille), = self.manager.cache_requetes._entrees.values()
+        self.assertIsInstance(positions, np.ndarray)
+        self.assertEqual(taille, positions.nbytes)
+
+    def test_afficher_streams_batches(self):
+        self.manager.inventory = pd.DataFrame({
+            'nom du produit': [f'Article{i}' for i in range(2500)],
+            'catégorie': ['Cat1'] * 2500,
+            'quantité': range(2500),
+            'prix unitaire': [1.0] * 2500
+        })
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_afficher("")
+        lines = [line for line in mock_stdout.getvalue().splitlines() if 'Article' in line]
+        self.assertEqual(len(lines), 2500)
+        # Les lots suivants gardent l'alignement du premier
+        self.assertEqual(lines[999].index('Article'), lines[1000].index('Article') + 1)
+
+    def test_chercher_formats(self):
+        self.manager.inventory = self.valid_data
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_chercher("Produit --format csv")
+        self.assertEqual(mock_stdout.getvalue().splitlines()[0],
+                         "nom du produit,catégorie,quantité,prix unitaire")
+
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_chercher_prix("50 250 --format jsonl --limit 1")
+        lines = mock_stdout.getvalue().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])['nom du produit'], 'Produit1')
+
+    def test_chercher_invalid_format(self):
+        self.manager.inventory = self.valid_data
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_chercher("Produit --format xml")
+        self.assertIn("Format invalide", mock_stdout.getvalue())
+
     def test_chercher_empty_term(self):
         with patch('sys.stdout', new=StringIO()) as mock_stdout:
             self.manager.do_chercher("")
@@ -161,6 +541,63 @@ class TestInventoryManager(unittest.TestCase):
             self.manager.do_chercher("produit1")
         self.assertIn("Produit1", mock_stdout.getvalue())
 
+    def test_chercher_index_matches_str_contains(self):
+        noms = ['Pâtes', 'PATES fraîches', 'Riz', 'Télévision', 'television', None,
+                'Casque audio', 'Chaise', 'chaise haute', 'Écran 4K']
+        data = pd.DataFrame({
+            'nom du produit': noms,
+            'catégorie': ['Cat1'] * len(noms),
+            'quantité': range(len(noms)),
+            'prix unitaire': [1.0] * len(noms)
+        })
+        self.manager.inventory = data
+        for term in ['pâtes', 'PAT', 'té', 'vision', 'chaise', 'a', 'écran', 'ri[zs]', '^c', 'xyz']:
+            expected = data[data['nom du produit'].str.contains(term, case=False, na=False)]
+            pd.testing.assert_frame_equal(self.manager.filtrer_nom(term), expected, obj=term)
+
+    def test_chercher_builds_name_index_lazily_and_scans_common_terms(self):
+        noms = [f"Produit {i}" for i in range(1000)] + ['Pâtes', 'PATES fraîches', None]
+        data = pd.DataFrame({
+            'nom du produit': noms,
+            'catégorie': ['Cat1'] * len(noms),
+            'quantité': range(len(noms)),
+            'prix unitaire': [1.0] * len(noms)
+        })
+        self.create_test_csv(data, "test1.csv")
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_charger(self.test_dir)
+        self.assertNotIn('nom du produit', self.manager._etat._index_texte)
+
+        inventaire = self.manager.inventory
+        # Sélectifs (index) et peu sélectifs (parcours de la colonne)
+        for term in ['Produit 123', '999', 'pâtes', 'produit', 'duit 1', 'a', '9', 'xyz']:
+            expected = inventaire[inventaire['nom du produit'].str.contains(term, case=False, regex=False, na=False)]
+            pd.testing.assert_frame_equal(self.manager.filtrer_nom(term), expected, obj=term)
+        self.assertIn('nom du produit', self.manager._etat._index_texte)
+
+    def test_chercher_litteral_and_regex_modes(self):
+        data = pd.DataFrame({
+            'nom du produit': ['Vis 3.5mm', 'Vis 345mm'],
+            'catégorie': ['Cat1', 'Cat1'],
+            'quantité': [1, 2],
+            'prix unitaire': [1.0, 2.0]
+        })
+        self.manager.inventory = data
+        self.assertEqual(len(self.manager.filtrer_nom('3.5', 'regex')), 2)
+        self.assertEqual(len(self.manager.filtrer_nom('3.5', 'litteral')), 1)
+
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_chercher("3.5 --litteral")
+        output = mock_stdout.getvalue()
+        self.assertIn("Vis 3.5mm", output)
+        self.assertNotIn("Vis 345mm", output)
+
+    def test_chercher_conflicting_modes(self):
+        self.manager.inventory = self.valid_data
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_chercher("Produit --litteral --regex")
+        self.assertIn("Choisissez --litteral ou --regex", mock_stdout.getvalue())
+
     def test_chercher_prix_empty_inventory(self):
         with patch('sys.stdout', new=StringIO()) as mock_stdout:
             self.manager.do_chercher_prix("100 200")
@@ -187,6 +624,46 @@ class TestInventoryManager(unittest.TestCase):
         self.assertIn("Produit1", output)
         self.assertNotIn("Produit2", output)
 
+    def test_chercher_prix_index_matches_mask(self):
+        data = pd.DataFrame({
+            'nom du produit': [f'P{i}' for i in range(50)],
+            'catégorie': ['Cat1', 'Cat2'] * 25,
+            'quantité': [(i * 7) % 13 for i in range(50)],
+            'prix unitaire': [float((i * 11) % 17) for i in range(50)]
+        })
+        self.manager.inventory = data
+        expected = data[(data['prix unitaire'] >= 3) & (data['prix unitaire'] <= 9)]
+        pd.testing.assert_frame_equal(self.manager.filtrer_prix(3, 9), expected)
+        expected = data[(data['quantité'] >= 2) & (data['quantité'] <= 5)]
+        pd.testing.assert_frame_equal(self.manager.filtrer_quantite(2, 5), expected)
+
+    def test_index_rebuilt_on_new_inventory(self):
+        self.manager.inventory = self.valid_data
+        self.assertEqual(len(self.manager.filtrer_prix(50, 150)), 1)
+        self.manager.inventory = self.valid_data.assign(**{'prix unitaire': [300.0, 400.0]})
+        self.assertTrue(self.manager.filtrer_prix(50, 150).empty)
+
+    def test_chercher_plages(self):
+        data = pd.DataFrame({
+            'nom du produit': ['Produit1', 'Produit2', 'Produit3'],
+            'catégorie': ['Cat1', 'Cat2', 'Cat1'],
+            'quantité': [10, 20, 30],
+            'prix unitaire': [100.0, 200.0, 150.0]
+        })
+        self.manager.inventory = data
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_chercher_plages("50 160 5 35 cat1")
+        output = mock_stdout.getvalue()
+        self.assertIn("Produit1", output)
+        self.assertIn("Produit3", output)
+        self.assertNotIn("Produit2", output)
+
+    def test_chercher_plages_usage(self):
+        self.manager.inventory = self.valid_data
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_chercher_plages("50 160")
+        self.assertIn("Usage: chercher_plages", mock_stdout.getvalue())
+
     # Nouveaux tests pour chercher_categorie
     def test_chercher_categorie_empty_term(self):
         with patch('sys.stdout', new=StringIO()) as mock_stdout:
@@ -212,6 +689,109 @@ class TestInventoryManager(unittest.TestCase):
             self.manager.do_chercher_categorie("CatInexistante")
         self.assertIn("Aucun produit trouvé dans la catégorie", mock_stdout.getvalue())
 
+    def test_chercher_categorie_ignores_accents(self):
+        self.manager.inventory = pd.DataFrame({
+            'nom du produit': ['Telephone', 'Ordinateur', 'Pates'],
+            'catégorie': ['electronique', 'Électronique', 'Alimentaire'],
+            'quantité': [1, 2, 3],
+            'prix unitaire': [1.0, 2.0, 3.0]
+        })
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_chercher_categorie("ÉLECTRONIQUE")
+        output = mock_stdout.getvalue()
+        self.assertIn("Telephone", output)
+        self.assertIn("Ordinateur", output)
+        self.assertNotIn("Pates", output)
+
+    def test_rapport_groups_normalized_categories(self):
+        self.manager.inventory = pd.DataFrame({
+            'nom du produit': ['Telephone', 'Ordinateur', 'Casque'],
+            'catégorie': ['electronique', 'Électronique', ' Électronique '],
+            'quantité': [50, 30, 100],
+            'prix unitaire': [699.99, 1199.49, 49.99]
+        })
+        export_path = Path(self.test_dir) / "rapport.csv"
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_rapport(str(export_path))
+
+        report = pd.read_csv(export_path)
+        self.assertEqual(len(report), 1)
+        self.assertEqual(report['quantité_count'].iloc[0], 3)
+        self.assertEqual(report['quantité_sum'].iloc[0], 180)
+
+    def test_rapport_jobs_matches_single_process(self):
+        inventaire = pd.DataFrame({
+            'nom du produit': [f'Produit{i}' for i in range(40)],
+            'catégorie': ['electronique', 'Électronique', 'Jardin', None] * 10,
+            'quantité': list(range(40)),
+            'prix unitaire': [float(i) * 1.5 for i in range(40)],
+            'Fichier Source': ['a.csv'] * 25 + ['b.csv'] * 15,
+        })
+        self.manager.inventory = inventaire
+        attendu = self.manager._etat.rapport()
+        partiels = self.manager._etat.partiels
+
+        self.manager.inventory = inventaire
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            with patch('builtins.input', return_value='n'):
+                self.manager.do_rapport("--format csv --jobs 3")
+        self.assertEqual(list(self.manager._etat.partiels), ['a.csv', 'b.csv'])
+        for source, partiel in partiels.items():
+            pd.testing.assert_frame_equal(self.manager._etat.partiels[source], partiel)
+        pd.testing.assert_frame_equal(self.manager._etat.rapport(), attendu)
+        self.assertIn("electronique,370,18.5,20", mock_stdout.getvalue())
+
+    def test_rapport_verifier(self):
+        self.manager.inventory = self.valid_data
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            with patch('builtins.input', return_value='n'):
+                self.manager.do_rapport("--verifier")
+        self.assertIn("rapport identique au recalcul complet", mock_stdout.getvalue())
+
+    def test_rapport_verifier_float32_prices(self):
+        rng = np.random.default_rng(0)
+        for i in range(2):
+            prix = np.round(rng.uniform(0.5, 1999.0, 3000), 2)
+            prix[0] = 1999.98
+            self.create_test_csv(pd.DataFrame({
+                'nom du produit': [f'Produit{j}' for j in range(3000)],
+                'catégorie': ['Cat1', 'Cat2', 'Cat3'] * 1000,
+                'quantité': rng.integers(0, 100, 3000),
+                'prix unitaire': prix,
+            }), f'magasin{i}.csv')
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_charger(f"{self.test_dir} --type-prix float32")
+        for jobs in (1, 2):
+            self.manager._etat.partiels = None
+            self.manager._etat._rapport = None
+            self.manager.cache_requetes.vider()
+            with patch('sys.stdout', new=StringIO()) as mock_stdout:
+                with patch('builtins.input', return_value='n'):
+                    self.manager.do_rapport(f"--verifier --format csv --jobs {jobs}")
+            output = mock_stdout.getvalue()
+            self.assertIn("rapport identique au recalcul complet", output)
+            self.assertIn(",1999.98", output)
+            self.assertNotIn("1999.97", output)
+
+    def test_rapport_aggregates_follow_incremental_reload(self):
+        self.create_test_csv(self.valid_data, 'a.csv')
+        self.create_test_csv(self.valid_data, 'b.csv')
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_charger(self.test_dir)
+        self.assertEqual(self.manager._etat.rapport().loc['Cat1', 'quantité_sum'], 20)
+
+        self.create_test_csv(self.valid_data.assign(**{'quantité': [5, 6]}), 'b.csv')
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_charger(f"{self.test_dir} --incremental")
+
+        etat = self.manager._etat
+        self.assertEqual(list(etat.partiels), ['a.csv', 'b.csv'])
+        maintenu, complet = etat.rapport(), etat.rapport_complet()
+        self.assertEqual(list(maintenu.index), list(complet.index))
+        pd.testing.assert_frame_equal(maintenu.reset_index(drop=True), complet.reset_index(drop=True),
+                                      check_dtype=False)
+        self.assertEqual(etat.rapport().loc['Cat1', 'quantité_sum'], 15)
+
     def test_rapport_empty_inventory(self):
         with patch('sys.stdout', new=StringIO()) as mock_stdout:
             self.manager.do_rapport()
@@ -240,6 +820,255 @@ class TestInventoryManager(unittest.TestCase):
         exported_data = pd.read_csv(export_path)
         self.assertGreater(len(exported_data), 0)
 
+    def test_charger_concatenates_compacted_files(self):
+        self.create_test_csv(self.valid_data, "test1.csv")
+        self.create_test_csv(self.valid_data.assign(**{'catégorie': ['Cat3', 'Cat1'], 'quantité': [1000, 2]}), "test2.csv")
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_charger(self.test_dir)
+        inventaire = self.manager.inventory
+        # Catégories différentes d'un fichier à l'autre: réunies sans repasser par des objets
+        for col in ('catégorie', 'Fichier Source', 'nom du produit'):
+            self.assertIsInstance(inventaire[col].dtype, pd.CategoricalDtype, col)
+        self.assertEqual(inventaire['catégorie'].tolist(), ['Cat1', 'Cat2', 'Cat3', 'Cat1'])
+        self.assertEqual(str(inventaire['quantité'].dtype), 'int16')
+        self.assertEqual(inventaire['quantité'].tolist(), [10, 20, 1000, 2])
+
+    def test_cache_not_reused_with_another_price_type(self):
+        self.create_test_csv(self.valid_data.assign(**{'prix unitaire': [1.99, 200.0]}), "test1.csv")
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_charger(f"{self.test_dir} --type-prix float32")
+        manager = InventoryManager()
+        manager.cache_dir = Path(self.cache_dir)
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            manager.do_charger(self.test_dir)
+        self.assertNotIn("depuis le cache", mock_stdout.getvalue())
+        self.assertEqual(str(manager.inventory['prix unitaire'].dtype), 'float64')
+        self.assertEqual(manager.filtrer_prix(1.99, 1.99)['nom du produit'].tolist(), ['Produit1'])
+
+    def test_float32_prices_match_exact_bounds(self):
+        self.create_test_csv(self.valid_data.assign(**{'prix unitaire': [1.99, 0.1]}), "test1.csv")
+        hors_memoire = InventoryManager()
+        hors_memoire.cache_dir = Path(self.cache_dir)
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_charger(f"{self.test_dir} --type-prix float32 --no-cache")
+            hors_memoire.do_charger(f"{self.test_dir} --type-prix float32 --hors-memoire")
+        self.assertEqual(str(self.manager.inventory['prix unitaire'].dtype), 'float32')
+        self.assertEqual(self.manager.filtrer_prix(1.99, 1.99)['nom du produit'].tolist(), ['Produit1'])
+        self.assertEqual(self.manager.filtrer_prix(0.1, 1.99)['nom du produit'].tolist(), ['Produit1', 'Produit2'])
+        # La quantité, plus sélective, passe en premier: le prix est vérifié sur les lignes restantes
+        self.assertEqual(len(self.manager.filtrer_requete((('quantite', (20, 20)), ('prix', (0.1, 0.1))))), 1)
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            hors_memoire.do_chercher_prix("1.99 1.99 --format csv")
+            self.manager.do_top("prix --seuil 1.99 --format csv")
+        self.assertEqual(mock_stdout.getvalue().count("Produit1"), 2)
+
+    def test_hors_memoire_rejects_duplicates_across_chunks(self):
+        # Doublons de part et d'autre des limites de morceaux (quelques lignes par morceau avec --budget 2K)
+        noms = [f'Produit{j}' for j in range(30)] + ['Produit1', 'Produit12', 'Produit29', 'Produit12']
+        data = pd.DataFrame({
+            'nom du produit': noms,
+            'catégorie': ['Cat1', 'Cat2'] * 17,
+            'quantité': list(range(34)),
+            'prix unitaire': [float(j % 7) + 0.5 for j in range(34)]
+        })
+        self.create_test_csv(data, 'doublons.csv')
+        hors_memoire = InventoryManager()
+        hors_memoire.cache_dir = Path(self.cache_dir)
+        sorties = []
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_charger(self.test_dir)
+            hors_memoire.do_charger(f"{self.test_dir} --hors-memoire --budget 2K")
+        self.assertLess(hors_memoire.source_hors_memoire._lignes_par_morceau(
+            Path(self.test_dir) / 'doublons.csv', 'latin1'), 30)
+        for manager in (self.manager, hors_memoire):
+            with patch('sys.stdout', new=StringIO()) as mock_stdout:
+                manager.do_afficher("--format csv")
+                manager.do_rapport("--format csv")
+                manager.do_bas("quantite 3 --par-categorie --format csv")
+            sorties.append(mock_stdout.getvalue())
+        self.assertEqual(len(self.manager.inventory), 30)
+        self.assertEqual(sorties[0], sorties[1])
+
+    def test_hors_memoire_writes_same_quarantine(self):
+        # Lignes invalides et doublons répartis sur plusieurs morceaux et plusieurs partitions
+        noms = [f'Produit{j}' for j in range(30)] + ['Produit1', '', 'Produit29', 'Produit12']
+        data = pd.DataFrame({
+            'nom du produit': noms,
+            'catégorie': ['Cat1', 'Cat2'] * 17,
+            'quantité': [str(j) for j in range(33)] + ['-1'],
+            'prix unitaire': [f'{j % 7}.5' for j in range(20)] + ['cher'] + [f'{j}.5' for j in range(13)]
+        })
+        self.create_test_csv(data, 'rejets.csv')
+        quarantaines = [Path(self.cache_dir) / 'memoire.csv', Path(self.cache_dir) / 'hors_memoire.csv']
+        hors_memoire = InventoryManager()
+        hors_memoire.cache_dir = Path(self.cache_dir)
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_charger(f"{self.test_dir} --quarantaine {quarantaines[0]}")
+            hors_memoire.do_charger(f"{self.test_dir} --hors-memoire --budget 2K --quarantaine {quarantaines[1]}")
+        self.assertEqual(mock_stdout.getvalue().count("5 ligne(s) rejetée(s)"), 2)
+        attendu = pd.read_csv(quarantaines[0])
+        self.assertEqual(attendu['motif'].tolist().count('doublon'), 2)
+        pd.testing.assert_frame_equal(pd.read_csv(quarantaines[1]), attendu)
+        # Seuls les doublons trouvés restent en mémoire, pas les noms déjà vus
+        self.assertEqual(hors_memoire.source_hors_memoire.doublons[Path(self.test_dir) / 'rejets.csv'].tolist(),
+                         [30, 32])
+
+    def test_exporter_search_results_in_every_format(self):
+        self._create_store_files()
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_charger(self.test_dir)
+        attendu = self.manager.filtrer_prix(2.0, 10.0).reset_index(drop=True)
+        lecteurs = {'res.csv': pd.read_csv, 'res.csv.gz': pd.read_csv,
+                    'res.jsonl': lambda path: pd.read_json(path, lines=True), 'res.parquet': pd.read_parquet}
+        for nom, lire in lecteurs.items():
+            path = Path(self.cache_dir) / nom
+            with patch('sys.stdout', new=StringIO()) as mock_stdout:
+                self.manager.do_chercher_prix(f"2 10 --exporter {path}")
+            self.assertIn(f"{len(attendu)} ligne(s) exportée(s)", mock_stdout.getvalue())
+            exporte = lire(path)
+            self.assertEqual(exporte['nom du produit'].tolist(), attendu['nom du produit'].tolist(), nom)
+            self.assertEqual(exporte['prix unitaire'].tolist(), attendu['prix unitaire'].tolist(), nom)
+        self.assertEqual(sorted(p.name for p in Path(self.cache_dir).glob('.*.tmp')), [])
+
+        # Rapport et export en arrière-plan, attendu par quitter
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_rapport(str(Path(self.cache_dir) / "rapport.parquet"))
+            self.manager.do_afficher(f"--exporter {Path(self.cache_dir) / 'tout.csv.gz'} --arriere-plan")
+            self.manager.do_quitter("")
+        self.assertEqual(len(pd.read_parquet(Path(self.cache_dir) / "rapport.parquet")), 3)
+        self.assertEqual(len(pd.read_csv(Path(self.cache_dir) / "tout.csv.gz")), 120)
+
+    def test_instantanes_et_diff(self):
+        self._create_store_files()
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_charger(self.test_dir)
+            self.manager.do_charger(self.test_dir)  # Inchangé: pas de nouvel instantané
+        data = pd.read_csv(Path(self.test_dir) / 'magasin0.csv', encoding='latin1')
+        data.loc[data['nom du produit'] == 'Produit1', 'quantité'] = 500
+        data.loc[data['nom du produit'] == 'Produit2', 'prix unitaire'] = 99.5
+        data = data[data['nom du produit'] != 'Produit3']
+        data.loc[len(data) + 1] = ['ProduitX', 'Cat2', 4, 1.5]
+        data.to_csv(Path(self.test_dir) / 'magasin0.csv', index=False, encoding='latin1')
+        (Path(self.test_dir) / 'magasin2.csv').unlink()
+
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_charger(self.test_dir)
+            self.manager.do_instantanes("")
+        self.assertIn("Instantané 2 enregistré", mock_stdout.getvalue())
+        self.assertNotIn("     3 :", mock_stdout.getvalue())
+
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_diff("1 -1 --format csv")
+        ecarts = pd.read_csv(StringIO(mock_stdout.getvalue()))
+        self.assertEqual(ecarts['statut'].value_counts().to_dict(), {'supprimé': 41, 'modifié': 2, 'ajouté': 1})
+        modifies = ecarts[ecarts['statut'] == 'modifié'].set_index('nom du produit')
+        self.assertEqual(modifies.loc['Produit1', 'quantité avant'], 3)
+        self.assertEqual(modifies.loc['Produit1', 'écart quantité'], 497)
+        self.assertEqual(modifies.loc['Produit2', 'écart prix'], 99.5 - 14.5)
+        ajoute = ecarts[ecarts['statut'] == 'ajouté'].iloc[0]
+        self.assertEqual((ajoute['nom du produit'], ajoute['écart quantité']), ('ProduitX', 4))
+
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_diff("-1 courant")
+            self.manager.do_diff("1 courant --statut ajoute --format jsonl")
+            self.manager.do_diff("1 7")
+        sortie = mock_stdout.getvalue().splitlines()
+        self.assertIn("0 modifié(s), 0 ajouté(s), 0 supprimé(s)", sortie[1])
+        self.assertEqual(sum('"statut":"ajouté"' in ligne for ligne in sortie), 1)
+        self.assertIn("Instantané 7 introuvable", sortie[-1])
+
+    def test_comparer_inventaires_types_compacts(self):
+        avant = _compacter(pd.DataFrame({'nom du produit': ['a', 'b'], 'catégorie': ['x', 'x'],
+                                         'quantité': [127, 5], 'prix unitaire': [1.0, 2.0],
+                                         'Fichier Source': ['m.csv', 'm.csv']}))
+        apres = _compacter(pd.DataFrame({'nom du produit': ['b', 'a'], 'catégorie': ['y', 'x'],
+                                         'quantité': [5, 30000], 'prix unitaire': [2.0, 1.0],
+                                         'Fichier Source': ['m.csv', 'm.csv']}), 'float32')
+        self.assertEqual(str(avant['quantité'].dtype), 'int8')
+        ecarts = _comparer_inventaires(avant, apres).set_index('nom du produit')
+        self.assertEqual(ecarts.loc['a', 'écart quantité'], 29873)
+        self.assertEqual(ecarts.loc['b', 'catégorie'], 'y')
+        self.assertEqual(ecarts['statut'].tolist(), ['modifié', 'modifié'])
+
+    def test_top_bas_partial_selection(self):
+        self._create_store_files()
+        hors_memoire = InventoryManager()
+        hors_memoire.cache_dir = Path(self.cache_dir)
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_charger(self.test_dir)
+            hors_memoire.do_charger(f"{self.test_dir} --hors-memoire --budget 2K")
+        inventaire = self.manager.inventory
+        valeur = inventaire['quantité'] * inventaire['prix unitaire']
+        prix = inventaire['prix unitaire']
+        for commande, attendu in (("top valeur 7", valeur.nlargest(7)),
+                                  ("bas quantite 12", inventaire['quantité'].nsmallest(12)),
+                                  ("top prix 5 --seuil 22", prix[prix >= 22].nlargest(5))):
+            resultats = []
+            for manager in (self.manager, hors_memoire):
+                with patch('sys.stdout', new=StringIO()) as mock_stdout:
+                    manager.onecmd(commande + " --format csv")
+                resultats.append(pd.read_csv(StringIO(mock_stdout.getvalue())))
+            self.assertEqual(len(resultats[0]), len(attendu), commande)
+            self.assertEqual(resultats[0].values.tolist(), resultats[1].values.tolist(), commande)
+            self.assertEqual(resultats[0]['nom du produit'].tolist(),
+                             inventaire.loc[attendu.index, 'nom du produit'].tolist(), commande)
+
+        # Par catégorie: 'Électronique' et 'electronique' forment une seule catégorie
+        classement = self.manager._classement(('quantite', 2, True, None), False)
+        self.assertEqual(len(classement), 6)
+        self.assertEqual(classement['catégorie'].map(str.lower).tolist()[:4], ['cat2', 'cat2', 'cat3', 'cat3'])
+        # Par magasin: les classements des fragments sont départagés
+        self.assertEqual(self.manager._classement(('valeur', 3, False, None), True, 'magasin1,magasin2').index.tolist(),
+                         valeur[inventaire['Fichier Source'] != 'magasin0.csv'].nlargest(3).index.tolist())
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_top("stock")
+            self.manager.do_bas("quantite 0")
+        self.assertIn("Critère inconnu: stock", mock_stdout.getvalue())
+        self.assertIn("Le nombre de produits doit être positif", mock_stdout.getvalue())
+
+    def test_alertes_after_reload(self):
+        self.create_test_csv(self.valid_data, "test1.csv")
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_alerte("bas quantite 5 --seuil 15")
+            self.manager.do_alerte("top stock")
+            self.manager.do_charger(self.test_dir)
+        self.assertEqual(self.manager.alertes, ["bas quantite 5 --seuil 15"])
+        self.assertIn("Alerte 'bas quantite 5 --seuil 15': 1 produit(s)", mock_stdout.getvalue())
+
+        self.create_test_csv(self.valid_data.assign(**{'quantité': [30, 40]}), "test1.csv")
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_charger(f"{self.test_dir} --incremental")
+            self.manager.do_alerte("off")
+        self.assertNotIn("Alerte 'bas", mock_stdout.getvalue())
+        self.assertEqual(self.manager.alertes, [])
+
+    def test_exporter_arriere_plan_not_profiled(self):
+        self._create_store_files()
+        path = Path(self.cache_dir) / "tout.jsonl"
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_charger(self.test_dir)
+            self.manager.do_profil("on")
+            self.manager.onecmd(f"afficher --exporter {path} --arriere-plan")
+            self.manager.onecmd("chercher_prix 0 5")
+            for export in self.manager.exports:
+                export.join()
+        self.assertEqual(len(pd.read_json(path, lines=True)), 120)
+
+        def noms(entrees):
+            for entree in entrees:
+                yield entree['nom']
+                yield from noms(entree['phases'])
+        self.assertEqual([e['nom'] for e in self.manager.profileur.traces], ['afficher', 'chercher_prix'])
+        self.assertNotIn('export', list(noms(self.manager.profileur.traces)))
+
+    def test_exporter_hors_memoire_parquet(self):
+        self._create_store_files()
+        path = Path(self.cache_dir) / "tout.parquet"
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_charger(f"{self.test_dir} --hors-memoire --budget 2K")
+            self.manager.do_afficher(f"--exporter {path}")
+        self.assertEqual(len(pd.read_parquet(path)), 120)
+
     def test_rapport_interactive_export(self):
         self.manager.inventory = self.valid_data
         export_path = Path(self.test_dir) / "rapport_interactif.csv"
@@ -272,6 +1101,280 @@ class TestInventoryManager(unittest.TestCase):
         self.assertIn("rapport", output)
         self.assertIn("quitter", output)
 
+    def test_profil_disabled_records_nothing(self):
+        self.manager.inventory = self.valid_data
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.onecmd("chercher Produit")
+
+        self.assertEqual(self.manager.profileur.traces, [])
+        self.assertIs(self.manager.profileur.phase('a'), self.manager.profileur.phase('b'))
+
+    def test_profil_records_commands_and_phases(self):
+        self.create_test_csv(self.valid_data, "test1.csv")
+        trace_path = Path(self.cache_dir) / "trace.json"
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.onecmd("profil on")
+            self.manager.onecmd(f"charger {self.test_dir}")
+            self.manager.onecmd("chercher Produit1")
+            self.manager.onecmd("profil rapport")
+            self.manager.onecmd(f"profil json {trace_path}")
+
+        commandes = self.manager.profileur.traces
+        self.assertEqual([c['nom'] for c in commandes], ['charger', 'chercher'])
+        self.assertIn('lecture et validation', [p['nom'] for p in commandes[0]['phases']])
+        self.assertEqual(commandes[0]['lignes_sortie'], 2)
+        self.assertEqual((commandes[1]['lignes_entree'], commandes[1]['lignes_sortie']), (2, 1))
+        self.assertIn("Profil des commandes", mock_stdout.getvalue())
+        self.assertEqual(json.loads(trace_path.read_text(encoding='utf-8'))[1]['nom'], 'chercher')
+
+    def test_lot_jsonl_results(self):
+        self.create_test_csv(self.valid_data, "test1.csv")
+        lignes = [
+            "# commentaire",
+            f"charger {self.test_dir}",
+            "chercher Produit1",
+            '{"commande": "chercher_prix", "arguments": [150, 250], "id": "q2"}',
+            "chercher_quantite a b",
+            "{invalide",
+        ]
+        sortie = StringIO()
+        with patch('sys.stdout', new=StringIO()):
+            erreurs = self.manager.executer_lot(lignes, sortie)
+
+        resultats = [json.loads(ligne) for ligne in sortie.getvalue().splitlines()]
+        self.assertEqual(erreurs, 2)
+        self.assertEqual([r['ligne'] for r in resultats], [2, 3, 4, 5, 6])
+        self.assertTrue(resultats[0]['ok'])
+        self.assertEqual([p['nom du produit'] for p in resultats[1]['resultats']], ['Produit1'])
+        self.assertEqual(resultats[2]['id'], 'q2')
+        self.assertEqual(resultats[2]['resultats'][0]['prix unitaire'], 200.0)
+        self.assertFalse(resultats[3]['ok'])
+        self.assertFalse(resultats[4]['ok'])
+        self.assertEqual(self.manager.output_format, 'table')
+
+    def test_lot_concurrent_matches_sequential(self):
+        self.manager.inventory = self.valid_data
+        lignes = ["chercher Produit", "chercher_prix 0 150", "chercher_categorie cat2", "rapport"] * 5
+
+        def executer(concurrence):
+            sortie = StringIO()
+            with patch('sys.stdout', new=StringIO()):
+                self.manager.executer_lot(lignes, sortie, concurrence)
+            return [{k: v for k, v in json.loads(ligne).items() if k != 'duree_ms'}
+                    for ligne in sortie.getvalue().splitlines()]
+
+        self.assertEqual(executer(1), executer(4))
+
+    @contextlib.contextmanager
+    def _serveur(self):
+        """Démarre un ServeurInventaire sur un port libre; rend (port, requete)."""
+        serveur = ServeurInventaire(self.manager, workers=2)
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        ecoute = asyncio.run_coroutine_threadsafe(serveur.demarrer('127.0.0.1', 0), loop).result(5)
+        port = ecoute.sockets[0].getsockname()[1]
+
+        def requete(methode, cible):
+            connexion = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            connexion.request(methode, cible, headers={'Connection': 'close'})
+            reponse = connexion.getresponse()
+            corps = json.loads(reponse.read().decode('utf-8'))
+            connexion.close()
+            return reponse.status, corps
+
+        try:
+            yield port, requete
+        finally:
+            ecoute.close()
+            asyncio.run_coroutine_threadsafe(ecoute.wait_closed(), loop).result(5)
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(5)
+            loop.close()
+
+    def test_serveur_queries_and_atomic_reload(self):
+        self.create_test_csv(self.valid_data, "test1.csv")
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_charger(self.test_dir)
+            etat_initial = self.manager._etat
+            with self._serveur() as (port, requete):
+                statut, corps = requete('GET', '/chercher_prix?min=150&max=250')
+                self.assertEqual(statut, 200)
+                self.assertEqual([p['nom du produit'] for p in corps['resultats']], ['Produit2'])
+                self.assertEqual(requete('GET', '/chercher_prix?min=a&max=2')[0], 400)
+                self.assertEqual(requete('GET', '/inconnue')[0], 404)
+                for longueur in ('abc', '-1'):
+                    with socket.create_connection(('127.0.0.1', port), timeout=5) as brut:
+                        brut.sendall(f"POST /recharger HTTP/1.1\r\nContent-Length: {longueur}\r\n\r\n".encode())
+                        self.assertTrue(brut.makefile('rb').readline().startswith(b'HTTP/1.1 400'))
+                self.assertEqual(requete('GET', '/rapport')[1]['nombre'], 2)
+                self.assertEqual(requete('GET', '/requete?nom=produit&prix=150..')[1]['nombre'], 1)
+                bas = requete('GET', '/bas?critere=quantite&nombre=1')[1]['resultats']
+                self.assertEqual([p['nom du produit'] for p in bas], ['Produit1'])
+
+                self.create_test_csv(self.valid_data.assign(**{'nom du produit': ['Produit3', 'Produit4']}),
+                                     "test2.csv")
+                self.assertEqual(requete('POST', '/recharger')[0], 202)
+                for _ in range(100):
+                    sante = requete('GET', '/sante')[1]
+                    if sante['version'] != etat_initial.version:
+                        break
+                    time.sleep(0.05)
+                self.assertEqual(sante['lignes'], 4)
+                self.assertEqual(sante['version'], self.manager._etat.version)
+                self.assertEqual(len(etat_initial.inventory), 2)  # L'ancien état n'est jamais modifié
+                self.assertEqual(requete('GET', '/chercher?terme=Produit3')[1]['nombre'], 1)
+
+    def test_serveur_sees_watcher_reloads(self):
+        self.create_test_csv(self.valid_data, "test1.csv")
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_charger(self.test_dir)
+            with self._serveur() as (_, requete):
+                self.create_test_csv(self.valid_data.assign(**{'nom du produit': ['Produit3', 'Produit4']}),
+                                     "test2.csv")
+                self.assertEqual(requete('POST', '/recharger')[0], 202)
+                for _ in range(100):
+                    if requete('GET', '/sante')[1]['lignes'] == 4:
+                        break
+                    time.sleep(0.05)
+                # Après un rechargement HTTP, ceux de la surveillance atteignent toujours le serveur
+                self.manager.do_surveiller("--intervalle 0.02 --delai 0.1")
+                try:
+                    self.create_test_csv(self.valid_data.assign(**{'nom du produit': ['Produit5', 'Produit6']}),
+                                         "test3.csv")
+                    for _ in range(250):
+                        sante = requete('GET', '/sante')[1]
+                        if sante['lignes'] == 6:
+                            break
+                        time.sleep(0.02)
+                finally:
+                    self.manager.do_surveiller("off")
+                self.assertEqual(sante['version'], self.manager._etat.version)
+                self.assertEqual(requete('GET', '/chercher?terme=Produit5')[1]['nombre'], 1)
+                rapport = requete('GET', '/rapport')[1]['resultats']
+                self.assertEqual(sum(ligne['quantité_count'] for ligne in rapport), 6)
+
+    def test_surveiller_reloads_changed_files(self):
+        self.create_test_csv(self.valid_data, "test1.csv")
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_charger(self.test_dir)
+            etat_initial = self.manager._etat
+            self.manager.do_surveiller("--intervalle 0.02 --delai 0.1")
+            try:
+                self.create_test_csv(self.valid_data.assign(**{'nom du produit': ['Produit3', 'Produit4']}),
+                                     "test2.csv")
+                for _ in range(250):
+                    if len(self.manager.inventory) == 4:
+                        break
+                    time.sleep(0.02)
+            finally:
+                self.manager.do_surveiller("off")
+
+        self.assertEqual(len(self.manager.inventory), 4)
+        self.assertEqual(len(etat_initial.inventory), 2)  # L'ancien état n'est jamais modifié
+        self.assertIn("Rechargé: test2.csv", mock_stdout.getvalue())
+        self.assertIn("ms après détection", mock_stdout.getvalue())
+        self.assertEqual(len(self.manager.filtrer_nom("Produit3")), 1)
+
+    def test_surveiller_requires_loaded_directory(self):
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_surveiller("")
+        self.assertIn("Chargez d'abord un dossier", mock_stdout.getvalue())
+        self.assertIsNone(self.manager.surveillant)
+
+    def test_charger_prunes_columns_with_declared_types(self):
+        large = self.valid_data.assign(**{f'extra {i}': ['x', 'y'] for i in range(5)})
+        self.create_test_csv(large[['extra 0'] + list(large.columns[:-1])], 'large.csv')
+        for moteur in ('c', 'auto'):
+            with patch('sys.stdout', new=StringIO()):
+                self.manager.do_charger(f"{self.test_dir} --no-cache --moteur {moteur}")
+
+            self.assertEqual(list(self.manager.inventory.columns),
+                             self.manager.required_columns + ['Fichier Source'])
+            self.assertTrue(pd.api.types.is_integer_dtype(self.manager.inventory['quantité']))
+            self.assertEqual(self.manager.inventory['prix unitaire'].tolist(), [100.0, 200.0])
+
+    def test_charger_quarantines_invalid_rows(self):
+        data = pd.DataFrame({
+            'nom du produit': ['Produit1', '', 'Produit3', 'Produit4', 'Produit5', 'Produit1'],
+            'catégorie': ['Cat1'] * 6,
+            'quantité': ['10', '5', 'beaucoup', '-2', '3', '7'],
+            'prix unitaire': ['100.0', '1.0', '2.0', '3.0', 'cher', '4.0']
+        })
+        self.create_test_csv(data, 'texte.csv')
+        quarantaine = Path(self.cache_dir) / 'rejets.csv'
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_charger(f"{self.test_dir} --quarantaine {quarantaine}")
+
+        # Seule la première ligne est valide; les colonnes numériques restent natives
+        self.assertEqual(self.manager.inventory['nom du produit'].tolist(), ['Produit1'])
+        self.assertTrue(pd.api.types.is_integer_dtype(self.manager.inventory['quantité']))
+        self.assertTrue(pd.api.types.is_float_dtype(self.manager.inventory['prix unitaire']))
+        self.assertIn("5 ligne(s) rejetée(s)", mock_stdout.getvalue())
+
+        rejets = pd.read_csv(quarantaine)
+        self.assertEqual(rejets['ligne'].tolist(), [3, 4, 5, 6, 7])
+        self.assertEqual(rejets['motif'].tolist(), ['nom vide', 'quantité non numérique', 'quantité négative',
+                                                    'prix non numérique', 'doublon'])
+        self.assertEqual(set(rejets['Fichier Source']), {'texte.csv'})
+
+    def test_charger_incremental_keeps_quarantine_of_unchanged_files(self):
+        self.create_test_csv(self.valid_data.assign(**{'quantité': [10, -1]}), 'a.csv')
+        self.create_test_csv(self.valid_data.assign(**{'prix unitaire': [1.0, -1.0]}), 'b.csv')
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_charger(self.test_dir)
+        quarantaine = self.manager._chemin_quarantaine(Path(self.test_dir))
+        self.assertEqual(len(pd.read_csv(quarantaine)), 2)
+
+        time.sleep(0.01)
+        self.create_test_csv(self.valid_data, 'b.csv')  # b.csv corrigé
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_charger(f"{self.test_dir} --incremental")
+        self.assertEqual(pd.read_csv(quarantaine)['Fichier Source'].tolist(), ['a.csv'])
+        self.assertEqual(len(self.manager.inventory), 3)
+
+        self.create_test_csv(self.valid_data, 'a.csv')
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_charger(f"{self.test_dir} --incremental")
+        self.assertFalse(quarantaine.exists())
+
+    def test_charger_invalid_engine(self):
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_charger(f"{self.test_dir} --moteur rapide")
+        self.assertIn("Moteur invalide", mock_stdout.getvalue())
+
+    def test_cache_requetes_hits_and_invalidation(self):
+        self.create_test_csv(self.valid_data, 'test.csv')
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_charger(self.test_dir)
+            self.manager.do_chercher("Produit --format csv")
+            self.manager.do_chercher("Produit --format jsonl --limit 1")  # Même requête, autre rendu
+            self.manager.do_rapport("--format csv")
+            self.manager.do_rapport("--format csv")
+        stats = self.manager.cache_requetes.statistiques()
+        self.assertEqual((stats['succès'], stats['échecs']), (2, 2))
+
+        # Un rechargement change la version: les anciens résultats ne sont jamais servis
+        time.sleep(0.01)
+        self.create_test_csv(self.valid_data.assign(**{'nom du produit': ['Produit1', 'Autre']}), 'test.csv')
+        with patch('sys.stdout', new=StringIO()):
+            self.manager.do_charger(f"{self.test_dir} --incremental")
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_chercher("Produit --format csv")
+        self.assertNotIn("Produit2", mock_stdout.getvalue())
+        stats = self.manager.cache_requetes.statistiques()
+        self.assertEqual((stats['échecs'], stats['invalidations']), (3, 1))
+
+    def test_cache_requetes_budget(self):
+        self.manager.inventory = self.valid_data
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.manager.do_cache("budget 1")
+            self.manager.do_chercher_prix("0 1000 --format csv")
+            self.manager.do_chercher_prix("0 1000 --format csv")
+            self.manager.do_cache("")
+        self.assertEqual(self.manager.cache_requetes.succes, 0)  # Résultat plus gros que le budget
+        self.assertIn("taux de succès", mock_stdout.getvalue())
+
     def test_rapport_huge_numbers(self):
         huge_data = pd.DataFrame({
             'nom du produit': ['Produit1', 'Produit2'],